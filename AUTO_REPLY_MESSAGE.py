@@ -1,50 +1,26 @@
-import os
-import time
-import shutil
 import re
+import time
 import threading
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import WebDriverException, NoSuchElementException
+from selenium.common.exceptions import WebDriverException
+
+from campaign.browser import DEFAULT_USER_DATA_DIR, find_chrome, make_driver
+from campaign.cleaner import shared_cleaner
+from campaign.conversations import ConversationStore, chat_key, message_key
+from campaign.intents import IntentMatcher
+from campaign.suppression import SuppressionList
+from campaign.watcher import ChatWatcher
 
 # ---------------- Chrome Driver Setup ---------------- #
 def _setup_driver():
-    chrome_path = None
-
-    possible_paths = [
-        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-        os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe")
-    ]
-
-    for path in possible_paths:
-        if os.path.exists(path):
-            chrome_path = path
-            break
-
-    if not chrome_path:
-        chrome_path = shutil.which("chrome") or shutil.which("chrome.exe")
-
+    chrome_path = find_chrome()
     if not chrome_path:
         print("❌ ERROR: Chrome browser not found. Please install Google Chrome.")
         return None
 
     print(f"✅ Chrome found at: {chrome_path}")
 
-    options = webdriver.ChromeOptions()
-    options.binary_location = chrome_path
-    options.add_argument("--user-data-dir=" + os.path.expanduser("~") + "\\AppData\\Local\\Google\\Chrome\\User Data")
-    options.add_argument("--profile-directory=Default")
-    options.add_experimental_option("detach", True)
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--start-maximized")
-
     try:
-        service = Service(shutil.which("chromedriver") or "./chromedriver.exe")
-        driver = webdriver.Chrome(service=service, options=options)
+        driver = make_driver(user_data_dir=DEFAULT_USER_DATA_DIR, detach=True)
         driver.get("https://web.whatsapp.com")
         print("🌐 WhatsApp Web launched — please wait for chats to load...")
         time.sleep(10)
@@ -56,57 +32,77 @@ def _setup_driver():
 
 
 # ---------------- Auto-Reply Logic ---------------- #
-FOLLOWUP_MESSAGE = (
-    "Awesome! 🎓✨\n\n"
-    "Here’s what I’ll need to help you with your NRF bursary application:\n\n"
-    "📄 Please send:\n"
-    "1️⃣ Certified copy of your ID\n"
-    "2️⃣ Proof of funding (if any)\n"
-    "3️⃣ Academic record\n"
-    "4️⃣ Intended institution\n"
-    "5️⃣ Degree you want to pursue\n"
-    "6️⃣ Your email address & cellphone number\n\n"
-    "💰 Application support fee: *R60* (covers admin & verification)\n\n"
-    "Once I receive your documents, I’ll help you complete and submit your NRF application.\n\n"
-    "Let’s get you funded! 🚀\n"
-    "— Ronewa | NRF Application Support\n"
-    "📱 Save my number & share with others who might need help 💚"
-)
-
-def _auto_reply(driver):
-    print("🤖 Auto-reply system running. Listening for 'Yes' messages...")
-
-    while True:
-        try:
-            # Find unread chats
-            unread_chats = driver.find_elements(By.XPATH, '//span[@aria-label and contains(@aria-label, "unread message")]')
-            for chat in unread_chats:
-                chat.click()
-                time.sleep(2)
-
-                # Find the latest message
-                messages = driver.find_elements(By.CSS_SELECTOR, "div._21Ahp span.selectable-text")
-                if not messages:
-                    continue
+# Intents (yes / no / price / documents / stop, several languages) and their
+# replies are configured in intents.json.
+MATCHER = IntentMatcher.from_file()
+# Senders matching this intent go on the opt-out list in campaign.db, which the
+# cleaner and the send loops of both campaign GUIs check before every send.
+OPT_OUT_INTENT = "stop"
+# A chat title that is nothing but a number ("+27 82 123 4567"); a saved
+# contact's name may contain digits and must not be read as its number.
+BARE_NUMBER = re.compile(r"\(?\+?[0-9][0-9 \-().\u00a0]*")
+
+
+def _opt_out(watcher, suppression, event, chat, text):
+    # the number shown in the chat itself (message ids, contact info panel)
+    # comes first; chat is "+<phone>" when the message id carries it, else
+    # the chat title, which is only used when it is a bare number
+    cleaner = shared_cleaner()
+    phone = watcher.chat_phone(event["chat"])
+    number = cleaner.lookup(phone) if phone else None
+    if number is None and BARE_NUMBER.fullmatch(chat.strip()):
+        number = cleaner.lookup(chat)
+    if number is None:
+        print(f"⚠️ Opt-out from '{chat}' but no phone number found; add it with `python -m campaign optout add -n <number>`.")
+        return
+    if suppression.add(number, reason=text[:200], source="auto-reply"):
+        print(f"🚫 {number} opted out — removed from future campaigns.")
 
-                last_msg = messages[-1].text.strip().lower()
-                print(f"💬 New message detected: {last_msg}")
 
-                if re.search(r"\b(yes|yeah|yep|yebo|sure|okay|ok)\b", last_msg):
-                    print("✅ Sending follow-up message...")
-                    msg_box = driver.find_element(By.XPATH, '//div[@title="Type a message"]')
-                    msg_box.click()
-                    msg_box.send_keys(FOLLOWUP_MESSAGE)
-                    send_btn = driver.find_element(By.XPATH, '//button[@aria-label="Send"]')
-                    send_btn.click()
-                    print("📤 Follow-up message sent successfully!")
+def _auto_reply(driver):
+    print(f"🤖 Auto-reply system running. Listening for: {', '.join(i.name for i in MATCHER.intents)}")
+    watcher = ChatWatcher(driver)
+    state = ConversationStore()
+    suppression = SuppressionList()
+
+    def handle(event):
+        if event["type"] == "unread":
+            # opening the chat makes the observer report its new messages
+            watcher.open_chat(event["key"])
+            return
+        chat = chat_key(event)
+        msg_id = message_key(event)
+        if not state.is_new(chat, msg_id):
+            return  # already handled (chat re-marked unread, re-rendered, ...)
+        last_msg = event["text"].strip().lower()
+        print(f"💬 New message detected: {last_msg}")
+
+        intent = MATCHER.match(last_msg)
+        if intent and intent.name == OPT_OUT_INTENT:
+            _opt_out(watcher, suppression, event, chat, last_msg)
+        if intent and intent.reply:
+            if state.already_replied(chat, intent.name):
+                print(f"↩️ '{intent.name}' reply already sent to {chat}, skipping.")
+            else:
+                print(f"✅ Intent '{intent.name}' — sending reply...")
+                if not watcher.reply(event["chat"], intent.reply):
+                    # left unclaimed, so the message is handled again when it shows up again
+                    print(f"⚠️ Could not open the chat '{event['chat']}'; reply not sent.")
+                    return
+                state.mark_replied(chat, intent.name)
+                print("📤 Reply sent successfully!")
+        state.claim(chat, msg_id)
 
-            time.sleep(5)
-        except NoSuchElementException:
-            pass
-        except Exception as e:
-            print("⚠️ Error in auto-reply loop:", e)
-            time.sleep(5)
+    try:
+        while True:
+            try:
+                watcher.run(handle)
+            except Exception as e:
+                print("⚠️ Error in auto-reply loop:", e)
+                time.sleep(5)
+    finally:
+        state.close()
+        suppression.close()
 
 
 # ---------------- Main Runner ---------------- #
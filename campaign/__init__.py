@@ -0,0 +1,4 @@
+"""Shared campaign engine used by the GUIs (cleaning, ingestion, sending)."""
+from campaign.cleaner import CleanResult, NumberCleaner, normalize_and_validate, shared_cleaner
+
+__all__ = ["CleanResult", "NumberCleaner", "normalize_and_validate", "shared_cleaner"]
@@ -0,0 +1,50 @@
+"""Chrome / WebDriver setup shared by the sender and the auto-replier."""
+import os
+import shutil
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+CHROME_PATHS = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"),
+]
+DEFAULT_USER_DATA_DIR = os.path.join(os.path.expanduser("~"), "AppData", "Local", "Google", "Chrome", "User Data")
+# Each parallel send session needs its own Chrome profile (scan the QR code once per profile).
+SESSION_PROFILES_DIR = os.path.join(os.path.expanduser("~"), ".proitech_campaign", "sessions")
+
+
+def find_chrome():
+    for path in CHROME_PATHS:
+        if os.path.exists(path):
+            return path
+    return shutil.which("chrome") or shutil.which("chrome.exe") or shutil.which("google-chrome")
+
+
+def make_driver(user_data_dir=DEFAULT_USER_DATA_DIR, profile="Default", headless=False, detach=False):
+    """Start Chrome with a persistent profile so WhatsApp Web stays logged in."""
+    options = webdriver.ChromeOptions()
+    chrome_path = find_chrome()
+    if chrome_path:
+        options.binary_location = chrome_path
+    if user_data_dir:
+        options.add_argument("--user-data-dir=" + user_data_dir)
+        options.add_argument("--profile-directory=" + profile)
+    if detach:
+        options.add_experimental_option("detach", True)
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--start-maximized")
+    service = Service(shutil.which("chromedriver") or "./chromedriver.exe")
+    return webdriver.Chrome(service=service, options=options)
+
+
+def session_driver(index, headless=False):
+    """Driver for parallel send session `index`, each with its own profile dir."""
+    path = os.path.join(SESSION_PROFILES_DIR, f"session-{index}")
+    os.makedirs(path, exist_ok=True)
+    return make_driver(user_data_dir=path, headless=headless)
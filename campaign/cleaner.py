@@ -0,0 +1,249 @@
+"""Phone-number cleaning engine: cached parse/validate plus ordered dedupe."""
+import os
+import re
+import threading
+from collections import OrderedDict
+from itertools import repeat
+from dataclasses import dataclass, field
+
+import phonenumbers
+
+from campaign.fastpath import fast_path
+
+DEFAULT_REGION = "ZA"
+# Enough for a few 150k-row lists to stay warm between Clean / Re-clean.
+DEFAULT_CACHE_SIZE = 500_000
+# Keys per worker task; big enough to amortize pickling, small enough to balance.
+DEFAULT_CHUNK_SIZE = 5_000
+
+_NON_DIGIT = re.compile(r"\D")
+_PLUS_LEAD = re.compile(r"^[^\d]*\+")
+# Entries made only of digits and the separators phonenumbers ignores parse
+# the same as their bare digits, so they share one cache key. Anything else
+# (extensions, vanity letters, stray symbols) is parsed as written.
+_PLAIN_NUMBER = re.compile(r"\(?\+?[0-9 \-.()/\u00a0]*")
+_DIGIT_KEY = re.compile(r"\+?[0-9]+")
+_E164 = phonenumbers.PhoneNumberFormat.E164
+
+
+def normalize_key(raw):
+    """Cache key for a raw number: its digits (keeping a leading '+') when that
+    cannot change the parse, otherwise the stripped entry itself ("ext 12")."""
+    s = str(raw).strip().replace("\u200b", "")
+    digits = _NON_DIGIT.sub("", s)
+    if not digits:
+        return ""
+    if not _PLAIN_NUMBER.fullmatch(s):
+        return s
+    return "+" + digits if _PLUS_LEAD.match(s) else digits
+
+
+def resolve_key(key, default_region=DEFAULT_REGION):
+    """Parse + validate a normalized key. Returns the E.164 string or None.
+
+    Valid numbers of the hot regions (campaign.fastpath) are answered from
+    precomputed prefix tables; everything else goes through phonenumbers.
+    """
+    if not key:
+        return None
+    if _DIGIT_KEY.fullmatch(key):
+        number = fast_path().resolve(key, default_region)
+        if number is not None:
+            return number
+    return parse_key(key, default_region)
+
+
+def parse_key(key, default_region=DEFAULT_REGION):
+    """resolve_key() without the fast path: always parses with phonenumbers."""
+    if not key:
+        return None
+    try:
+        parsed = phonenumbers.parse(key, None if key.startswith("+") else default_region)
+        if phonenumbers.is_valid_number(parsed):
+            return phonenumbers.format_number(parsed, _E164)
+        return None
+    except Exception:
+        pass
+    # "+0722..." style entries: retry as a local South African number
+    digits = _NON_DIGIT.sub("", key)
+    if len(digits) >= 9 and digits.startswith("0"):
+        try:
+            parsed = phonenumbers.parse(digits, "ZA")
+            if phonenumbers.is_valid_number(parsed):
+                return phonenumbers.format_number(parsed, _E164)
+        except Exception:
+            pass
+    return None
+
+
+def _resolve_chunk(keys, default_region):
+    """Worker entry point: resolve a chunk of keys, results in input order."""
+    return [resolve_key(k, default_region) for k in keys]
+
+
+class ParseCache:
+    """Bounded LRU of normalized key -> E.164 (or None for invalid)."""
+
+    _MISS = object()
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key, self._MISS)
+            if value is self._MISS:
+                self.misses += 1
+                return self._MISS
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+@dataclass
+class CleanResult:
+    valid: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    duplicates: int = 0
+    suppressed: int = 0
+
+    def __iter__(self):
+        # keeps `valid, removed = cleaner.clean(...)` working
+        return iter((self.valid, self.removed))
+
+
+class NumberCleaner:
+    """Cleans raw number lists into unique, insertion-ordered E.164 numbers.
+
+    `workers` > 1 switches clean() to the multi-process mode, which fans the
+    uncached keys out to a ProcessPoolExecutor in `chunk_size` pieces.
+    With a `suppression` list (campaign.suppression), opted-out numbers are
+    moved to `removed` instead of `valid`.
+    """
+
+    def __init__(self, default_region=DEFAULT_REGION, cache_size=DEFAULT_CACHE_SIZE,
+                 workers=1, chunk_size=DEFAULT_CHUNK_SIZE, suppression=None):
+        self.default_region = default_region
+        self.cache = ParseCache(cache_size)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.suppression = suppression
+
+    def lookup(self, raw, default_region=None):
+        """E.164 for a single raw entry, or None if it is not a valid number."""
+        region = default_region or self.default_region
+        key = normalize_key(raw)
+        cache_key = (key, region)
+        value = self.cache.get(cache_key)
+        if value is ParseCache._MISS:
+            value = resolve_key(key, region)
+            self.cache.put(cache_key, value)
+        return value
+
+    def clean(self, numbers_list, default_region=None, workers=None):
+        workers = self.workers if workers is None else workers
+        if workers is not None and workers > 1:
+            return self.clean_parallel(numbers_list, default_region, workers)
+        region = default_region or self.default_region
+        return self._suppress(self._collect(numbers_list, lambda s: self.lookup(s, region)))
+
+    def clean_parallel(self, numbers_list, default_region=None, workers=None, chunk_size=None):
+        """Same output as clean(), with parsing spread over worker processes."""
+        region = default_region or self.default_region
+        workers = workers or os.cpu_count() or 1
+        chunk_size = chunk_size or self.chunk_size
+        entries = list(numbers_list)
+        pending = {}
+        for raw in entries:
+            key = normalize_key(raw)
+            if key not in pending and self.cache.get((key, region)) is ParseCache._MISS:
+                pending[key] = None
+        keys = list(pending)
+        if len(keys) <= chunk_size or workers <= 1:
+            results = _resolve_chunk(keys, region)
+        else:
+            chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+            from concurrent.futures import ProcessPoolExecutor
+            results = []
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+                # map() yields in submission order, so results line up with keys
+                for part in pool.map(_resolve_chunk, chunks, repeat(region)):
+                    results.extend(part)
+        resolved = dict(zip(keys, results))
+        for key, value in resolved.items():
+            self.cache.put((key, region), value)
+
+        def resolve(s):
+            key = normalize_key(s)
+            if key in resolved:
+                return resolved[key]
+            return self.lookup(s, region)
+
+        return self._suppress(self._collect(entries, resolve))
+
+    def _suppress(self, result):
+        if self.suppression is not None and result.valid:
+            result.valid, opted_out = self.suppression.exclude(result.valid)
+            result.suppressed = len(opted_out)
+            result.removed += [f"{n} (opted out)" for n in opted_out]
+        return result
+
+    @staticmethod
+    def _collect(numbers_list, resolve):
+        index = {}  # insertion-ordered hash index of E.164 numbers
+        removed = []
+        duplicates = 0
+        for raw in numbers_list:
+            s = str(raw).strip()
+            if not s:
+                continue
+            s = s.replace("\u200b", "")
+            e164 = resolve(s)
+            if e164 is None:
+                removed.append(s)
+            elif e164 in index:
+                duplicates += 1
+            else:
+                index[e164] = None
+        return CleanResult(list(index), removed, duplicates)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_cleaner():
+    """Process-wide cleaner so repeated cleans reuse one parse cache.
+
+    It drops numbers on the shared opt-out list (campaign.db).
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            from campaign.suppression import shared_suppression
+            _shared = NumberCleaner(suppression=shared_suppression())
+        return _shared
+
+
+def normalize_and_validate(numbers_list, default_region=DEFAULT_REGION):
+    result = shared_cleaner().clean(numbers_list, default_region)
+    return result.valid, result.removed
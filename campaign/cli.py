@@ -0,0 +1,359 @@
+"""Headless entry point: python -m campaign <command>.
+
+  clean   clean numbers from files (xlsx/csv/txt/...) or stdin, print E.164
+  send    send a message to a numbers file through WhatsApp Web
+  resume  continue an unfinished campaign from the send journal
+  optout  list, add or remove numbers on the opt-out (STOP) list
+  stats   send-log and journal statistics
+
+Commands import what they need when they run, so `clean` never loads
+pandas, selenium or Tk unless a spreadsheet is actually being read.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from campaign.cleaner import DEFAULT_REGION
+
+DEFAULT_DELAY = 6
+DEFAULT_SESSIONS = 1
+TOP_REPEATED = 10
+
+
+def _say(text):
+    print(text, file=sys.stderr, flush=True)
+
+
+# ---------- input ----------
+def iter_input_candidates(paths):
+    """Phone candidates from files; "-" (or no paths) reads stdin."""
+    from campaign.ingest import iter_candidates
+    from campaign.tokenizer import iter_tokens
+    for path in paths or ["-"]:
+        if path == "-":
+            yield from iter_tokens(sys.stdin)
+        elif path.lower().endswith((".xlsx", ".xls", ".csv", ".txt")):
+            yield from iter_candidates(path)
+        else:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                yield from iter_tokens(f)
+
+
+def read_message(args):
+    if args.text:
+        return args.text
+    if args.message == "-":
+        return sys.stdin.read().strip()
+    from campaign.messages import extract_message
+    return extract_message(args.message).strip()
+
+
+def clean_input(paths, region=DEFAULT_REGION, workers=1, skip_recent=None, keep_opted_out=False):
+    """CleanResult for the given inputs, minus opted-out numbers and numbers
+    contacted in the last `skip_recent` days."""
+    from campaign.cleaner import NumberCleaner
+    from campaign.suppression import shared_suppression
+    suppression = None if keep_opted_out else shared_suppression()
+    result = NumberCleaner(default_region=region, workers=workers,
+                           suppression=suppression).clean(iter_input_candidates(paths))
+    if skip_recent:
+        from campaign.sendlog import SendLogIndex
+        index = SendLogIndex()
+        try:
+            index.ingest()
+            result.valid, recent = index.exclude_recent(result.valid, skip_recent)
+        finally:
+            index.close()
+        result.removed += [f"{n} (contacted in last {skip_recent}d)" for n in recent]
+    return result
+
+
+def load_fields(paths):
+    from campaign.cleaner import shared_cleaner
+    from campaign.ingest import SPREADSHEET_TYPES
+    from campaign.templates import FieldTable
+    table = FieldTable()
+    for path in paths or ():
+        if path.lower().endswith(SPREADSHEET_TYPES):
+            table.add_file(path, shared_cleaner().lookup)
+    return table
+
+
+def prepare_message(message, numbers, data_paths, hint=""):
+    """render(number) for the message template; warns about fields without data."""
+    from campaign.templates import Template
+    template = Template(message)
+    if template.is_static:
+        return template.bind()
+    table = load_fields(data_paths)
+    render = template.bind(table)
+    warning = template.unknown_warning(table)
+    if warning:
+        _say(f"Warning: {warning}{hint}")
+    for field, n in template.blanks(table, numbers).items():
+        _say(f"Warning: {n} recipients have no {{{field}}} value")
+    return render
+
+
+def _write_lines(path, lines):
+    if path in (None, "-"):
+        for line in lines:
+            print(line)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(line + "\n")
+
+
+# ---------- commands ----------
+def cmd_clean(args):
+    result = clean_input(args.inputs, args.region, args.workers, args.skip_recent, args.keep_opted_out)
+    _write_lines(args.out, result.valid)
+    if args.removed:
+        _write_lines(args.removed, result.removed)
+    _say(f"{len(result.valid)} valid • {len(result.removed)} removed ({result.suppressed} opted out) • "
+         f"{result.duplicates} duplicates collapsed")
+    return 0
+
+
+def _make_scheduler(args):
+    from campaign.scheduler import RateScheduler, next_occurrence
+    start_at = None
+    if args.at:
+        hh, mm = (int(p) for p in args.at.split(":"))
+        start_at = next_occurrence(hh % 24, mm % 60)
+    return RateScheduler.from_delay(args.delay, jitter=args.jitter, hourly_cap=args.hourly_cap,
+                                    daily_cap=args.daily_cap, start_at=start_at)
+
+
+def run_campaign(journal, campaign, numbers, message, args):
+    """Send `message` (text or render callable) to `numbers`, journaling every attempt.
+
+    Returns the number sent.
+    """
+    from campaign.browser import session_driver
+    from campaign.retry import RetryPolicy, classify
+    from campaign.scheduler import format_duration
+    from campaign.sender import WHATSAPP_SEND_URL, SendEngine, fake_whatsapp_url, open_sessions
+    from campaign.suppression import shared_suppression
+
+    scheduler = _make_scheduler(args)
+    total = len(numbers)
+    _say(f"Campaign {campaign}: {total} to send • estimated {format_duration(scheduler.eta(total))}")
+    if scheduler.start_at:
+        _say(f"Waiting until {time.strftime('%H:%M', time.localtime(scheduler.start_at))}")
+    base_url = fake_whatsapp_url() if args.fake else WHATSAPP_SEND_URL
+    sessions = open_sessions(args.sessions, lambda i: session_driver(i, headless=args.headless), base_url)
+    done = {"n": 0, "sent": 0}
+    lock = threading.Lock()
+
+    def on_start(session_name, num):
+        journal.mark_sending(campaign, num)
+
+    def on_retry(session_name, num, err, attempt, delay):
+        journal.mark_retry(campaign, num, err)
+        _say(f"[RETRY {attempt}/{args.retries} in {delay:.0f}s] {num} -> {err}")
+
+    def on_result(session_name, num, ok, err):
+        if ok:
+            journal.mark_sent(campaign, num)
+            status = "SENT"
+        else:
+            cause = classify(err)[0]
+            journal.mark_failed(campaign, num, f"{cause}: {err}", cause)
+            status = f"ERR ({cause}) {err}"
+        with lock:
+            done["n"] += 1
+            done["sent"] += ok
+            idx = done["n"]
+        _say(f"[{idx}/{total}] {num} {status} ({session_name})")
+
+    retry = RetryPolicy(args.retries + 1, args.retry_delay) if args.retries else None
+    engine = SendEngine(sessions, on_result=on_result, scheduler=scheduler, on_start=on_start,
+                        retry=retry, on_retry=on_retry, suppression=shared_suppression())
+    try:
+        engine.run(numbers, message)
+    except KeyboardInterrupt:
+        engine.stop()
+        _say("Interrupted; run `python -m campaign resume` to continue.")
+    finally:
+        for s in sessions:
+            s.close()
+        journal.flush()
+    if not journal.pending(campaign):
+        journal.finish(campaign)
+    _say(f"Finished. Sent {done['sent']}/{total}")
+    _say(engine.report.summary())
+    return done["sent"]
+
+
+def cmd_send(args):
+    from campaign.journal import SendJournal, campaign_id
+    message = read_message(args)
+    if not message:
+        _say("Message is empty.")
+        return 2
+    result = clean_input(args.numbers, args.region, 1, args.skip_recent)
+    if not result.valid:
+        _say("No valid numbers to send to.")
+        return 2
+    render = prepare_message(message, result.valid, args.numbers)
+    journal = SendJournal()
+    try:
+        campaign = journal.start(campaign_id(message, result.valid), result.valid, message)
+        pending = journal.pending(campaign)
+        if len(pending) < len(result.valid):
+            _say(f"{len(result.valid) - len(pending)} already sent in an earlier run.")
+        sent = run_campaign(journal, campaign, pending, render, args)
+    finally:
+        journal.close()
+    return 0 if sent == len(pending) else 1
+
+
+def cmd_resume(args):
+    from campaign.journal import SendJournal
+    journal = SendJournal()
+    try:
+        campaign = args.campaign or journal.latest_unfinished()
+        message = journal.message(campaign) if campaign else None
+        if message is None:
+            _say("No unfinished campaign found.")
+            return 1
+        pending = journal.pending(campaign)
+        if not pending:
+            journal.finish(campaign)
+            _say(f"Campaign {campaign} has nothing left to send.")
+            return 0
+        hint = "" if args.data else " Pass the original spreadsheet with --data."
+        render = prepare_message(message, pending, args.data, hint)
+        sent = run_campaign(journal, campaign, pending, render, args)
+    finally:
+        journal.close()
+    return 0 if sent == len(pending) else 1
+
+
+def cmd_stats(args):
+    from datetime import datetime
+    from campaign.journal import SendJournal
+    from campaign.sendlog import SendLogIndex
+
+    index = SendLogIndex()
+    try:
+        added = index.ingest()
+        volume = index.daily_volume(args.days)
+        repeated = index.duplicate_sends(days=args.days)
+    finally:
+        index.close()
+    print(f"Send log: {added} new entries indexed")
+    print(f"Sends in the last {args.days} days: {sum(n for _, n in volume)}")
+    for day, n in volume:
+        print(f"  {day}  {n}")
+    print(f"Numbers messaged more than once: {len(repeated)}")
+    for phone, n in repeated[:TOP_REPEATED]:
+        print(f"  {phone}  x{n}")
+
+    journal = SendJournal()
+    try:
+        rows = journal.campaigns(args.campaigns)
+        if rows:
+            print("Campaigns:")
+        for cid, total, created, finished in rows:
+            s = journal.summary(cid)
+            state = "finished" if finished else "open"
+            print(f"  {cid}  {datetime.fromtimestamp(created):%Y-%m-%d %H:%M}  {state}  "
+                  f"{s['sent']}/{total} sent • {s['failed']} failed")
+    finally:
+        journal.close()
+    return 0
+
+
+def cmd_optout(args):
+    from campaign.cleaner import NumberCleaner
+    from campaign.suppression import shared_suppression
+    suppression = shared_suppression()
+    if args.action == "list":
+        rows = suppression.entries(args.limit)
+        for phone, added_at, source, reason in rows:
+            print(f"{phone}  {time.strftime('%Y-%m-%d %H:%M', time.localtime(added_at))}  {source or '-'}  {reason or ''}")
+        _say(f"{len(suppression)} opted-out numbers")
+        return 0
+    cleaner = NumberCleaner(default_region=args.region)
+    raw = args.text or iter_input_candidates(args.numbers)
+    numbers = [n for n in map(cleaner.lookup, raw) if n]
+    if args.action == "add":
+        added = suppression.add_many(numbers, reason=args.reason or "", source="cli")
+        _say(f"{added} numbers opted out ({len(numbers) - added} already were)")
+    else:
+        removed = sum(suppression.remove(n) for n in numbers)
+        _say(f"{removed} numbers removed from the opt-out list")
+    suppression.close()
+    return 0
+
+
+# ---------- parser ----------
+def _send_options(p):
+    p.add_argument("--delay", type=float, default=DEFAULT_DELAY, help="seconds between sends (sustained rate)")
+    p.add_argument("--jitter", type=float, default=2.0, help="random extra delay per send, seconds")
+    p.add_argument("--hourly-cap", type=int, help="max sends per clock hour")
+    p.add_argument("--daily-cap", type=int, help="max sends per day")
+    p.add_argument("--at", metavar="HH:MM", help="start at this local time")
+    p.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="parallel WhatsApp Web sessions")
+    p.add_argument("--headless", action="store_true", help="run Chrome headless (profile must be logged in)")
+    p.add_argument("--fake", action="store_true", help="send to the bundled offline WhatsApp page")
+    p.add_argument("--retries", type=int, default=2, help="retries per recipient for transient failures")
+    p.add_argument("--retry-delay", type=float, default=30.0, help="seconds before the first retry (doubles each time)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="campaign", description="ProItech WhatsApp campaign tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("clean", help="clean and dedupe numbers")
+    p.add_argument("inputs", nargs="*", help="numbers files; '-' or nothing reads stdin")
+    p.add_argument("-o", "--out", help="write valid numbers here (default stdout)")
+    p.add_argument("--removed", help="write removed entries here")
+    p.add_argument("--region", default=DEFAULT_REGION, help="region for numbers without a country code")
+    p.add_argument("--workers", type=int, default=1, help="worker processes (0 = all cores)")
+    p.add_argument("--skip-recent", type=int, metavar="DAYS", help="drop numbers contacted in the last DAYS days")
+    p.add_argument("--keep-opted-out", action="store_true", help="do not drop numbers that replied STOP")
+    p.set_defaults(func=cmd_clean)
+
+    p = sub.add_parser("send", help="send a campaign")
+    p.add_argument("numbers", nargs="+", help="numbers files ('-' reads stdin)")
+    msg = p.add_mutually_exclusive_group(required=True)
+    msg.add_argument("-m", "--message", help="message file (.txt/.docx/.pdf, '-' reads stdin)")
+    msg.add_argument("-t", "--text", help="message text")
+    p.add_argument("--region", default=DEFAULT_REGION)
+    p.add_argument("--skip-recent", type=int, metavar="DAYS")
+    _send_options(p)
+    p.set_defaults(func=cmd_send)
+
+    p = sub.add_parser("resume", help="resume an unfinished campaign")
+    p.add_argument("campaign", nargs="?", help="campaign id (default: latest unfinished)")
+    p.add_argument("--data", nargs="+", metavar="FILE", help="spreadsheets with the template's {field} columns")
+    _send_options(p)
+    p.set_defaults(func=cmd_resume)
+
+    p = sub.add_parser("optout", help="show or edit the opt-out (STOP) list")
+    p.add_argument("action", choices=("list", "add", "remove"))
+    p.add_argument("numbers", nargs="*", help="numbers files for add/remove ('-' reads stdin)")
+    p.add_argument("-n", "--number", dest="text", action="append", help="a number to add/remove (repeatable)")
+    p.add_argument("--reason", help="note stored with added numbers")
+    p.add_argument("--region", default=DEFAULT_REGION)
+    p.add_argument("--limit", type=int, default=50, help="entries to list")
+    p.set_defaults(func=cmd_optout)
+
+    p = sub.add_parser("stats", help="send-log and campaign statistics")
+    p.add_argument("--days", type=int, default=30)
+    p.add_argument("--campaigns", type=int, default=10, help="recent campaigns to list")
+    p.set_defaults(func=cmd_stats)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, "workers", 1) == 0:
+        args.workers = os.cpu_count() or 1
+    return args.func(args)
@@ -0,0 +1,146 @@
+"""Per-chat conversation state for the auto-replier.
+
+Keeps, for every chat (phone number when WhatsApp exposes it, chat title
+otherwise), a short window of recently processed message ids and when each
+intent was last answered. A message is claimed only once it has been
+handled (its reply sent), so a failed reply is retried when the message
+shows up again; an intent is not answered twice within `reply_ttl`. State
+lives in a dict for O(1) lookups and is snapshotted to campaign.db (only
+changed chats, one transaction) every `snapshot_interval` seconds and on
+close().
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import deque
+
+from campaign.journal import DEFAULT_DB, connect
+
+SNAPSHOT_INTERVAL = 30.0
+RECENT_IDS = 64             # processed message ids remembered per chat
+REPLY_TTL = 24 * 3600.0     # seconds before the same intent is answered again in a chat
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversation_state (
+    chat TEXT PRIMARY KEY,
+    recent_ids TEXT,
+    replied TEXT,
+    updated_at REAL
+);
+"""
+
+# WhatsApp message ids look like "false_27721234567@c.us_3EB0..."
+_PHONE_IN_ID = re.compile(r"^(?:true|false)_(\d{6,15})@")
+
+
+def chat_key(event):
+    """Stable key for a watcher event: +phone if the message id has one."""
+    m = _PHONE_IN_ID.match(event.get("id") or "")
+    if m:
+        return "+" + m.group(1)
+    return event.get("chat") or ""
+
+
+def message_key(event):
+    """Message id, or a content hash for messages without one."""
+    if event.get("id"):
+        return event["id"]
+    raw = f"{event.get('chat')}\0{event.get('text')}".encode("utf-8")
+    return "h:" + hashlib.sha1(raw).hexdigest()[:16]
+
+
+class ChatState:
+    __slots__ = ("recent", "recent_set", "replied", "updated")
+
+    def __init__(self, recent=(), replied=None, updated=0.0):
+        self.recent = deque(recent, maxlen=RECENT_IDS)
+        self.recent_set = set(self.recent)
+        self.replied = dict(replied or {})     # intent -> time of the last reply
+        self.updated = updated
+
+
+class ConversationStore:
+    def __init__(self, path=DEFAULT_DB, snapshot_interval=SNAPSHOT_INTERVAL, reply_ttl=REPLY_TTL):
+        self.snapshot_interval = snapshot_interval
+        self.reply_ttl = reply_ttl
+        self._conn = connect(path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._chats = {}
+        self._dirty = set()
+        self._snapshot_at = time.time()
+        for chat, recent, replied, updated in self._conn.execute(
+                "SELECT chat, recent_ids, replied, updated_at FROM conversation_state"):
+            self._chats[chat] = ChatState(json.loads(recent or "[]"), json.loads(replied or "{}"),
+                                          updated or 0.0)
+
+    def __len__(self):
+        return len(self._chats)
+
+    def is_new(self, chat, message_id):
+        """True until claim() has recorded this (chat, message) as handled."""
+        state = self._chats.get(chat)
+        return state is None or message_id not in state.recent_set
+
+    def claim(self, chat, message_id):
+        """Record a message as handled; call it once its reply (if any) went out.
+
+        Returns False if it was already claimed.
+        """
+        with self._lock:
+            state = self._chats.get(chat)
+            if state is None:
+                state = self._chats[chat] = ChatState()
+            if message_id in state.recent_set:
+                return False
+            if len(state.recent) == state.recent.maxlen:
+                state.recent_set.discard(state.recent[0])
+            state.recent.append(message_id)
+            state.recent_set.add(message_id)
+            state.updated = time.time()
+            self._dirty.add(chat)
+        self.maybe_snapshot()
+        return True
+
+    def already_replied(self, chat, intent):
+        """True if `intent` was answered in this chat within reply_ttl."""
+        state = self._chats.get(chat)
+        at = state.replied.get(intent) if state is not None else None
+        return at is not None and time.time() - at < self.reply_ttl
+
+    def mark_replied(self, chat, intent):
+        with self._lock:
+            state = self._chats.get(chat)
+            if state is None:
+                state = self._chats[chat] = ChatState()
+            state.updated = state.replied[intent] = time.time()
+            self._dirty.add(chat)
+        self.maybe_snapshot()
+
+    def maybe_snapshot(self):
+        if time.time() - self._snapshot_at >= self.snapshot_interval:
+            self.snapshot()
+
+    def snapshot(self):
+        """Write changed chats to SQLite in one transaction."""
+        with self._lock:
+            self._snapshot_at = time.time()
+            if not self._dirty:
+                return
+            rows = []
+            for chat in self._dirty:
+                st = self._chats[chat]
+                rows.append((chat, json.dumps(list(st.recent)),
+                             json.dumps(st.replied, sort_keys=True), st.updated))
+            self._dirty.clear()
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO conversation_state (chat, recent_ids, replied, updated_at) "
+                "VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        self.snapshot()
+        self._conn.close()
@@ -0,0 +1,260 @@
+"""Prefix-table fast path for validating numbers from a few hot regions.
+
+Nearly every number a campaign sees is South African (or Botswanan), and
+parsing each one through phonenumbers costs tens of microseconds. At first
+use, FastPath expands the phonenumbers metadata of the hot regions into
+tables of national-number prefixes per length: every number-type pattern
+(mobile, fixed line, toll free, ...) is unrolled into digit-set sequences,
+the trailing "any digit" positions are dropped and the remaining head is
+spelled out. Validating a national number is then a length lookup plus a
+few string slices and set probes.
+
+resolve() mirrors how phonenumbers.parse() finds the country code and
+strips the national prefix for the input shapes it understands ("+27...",
+"0027...", "27...", "0...", bare national numbers). It only ever answers
+with a valid E.164 number; anything it cannot decide (other regions,
+"+0...", patterns too complex to unroll, invalid numbers) returns None and
+the caller falls back to phonenumbers.
+
+The patterns are read with the interpreter's private regex parser
+(re._parser), which may change between Python releases: if it is missing
+or building a region's tables fails for any reason, that region simply
+takes the slow path. tests/test_fastpath.py checks the answers against
+phonenumbers on generated numbers.
+"""
+import re
+import threading
+from itertools import product
+
+import phonenumbers
+from phonenumbers.phonemetadata import PhoneMetadata
+
+try:
+    from re import _parser as sre_parse     # Python 3.11+
+    from re import _constants as sre_constants
+except ImportError:                          # pragma: no cover
+    try:
+        import sre_constants
+        import sre_parse
+    except ImportError:
+        sre_constants = sre_parse = None     # no tables: every number takes the slow path
+
+HOT_REGIONS = ("ZA", "BW")
+MAX_SEQUENCES = 20_000      # unrolled alternatives per pattern before giving up on it
+MAX_PREFIXES = 1_000        # concrete prefixes per alternative before giving up on it
+
+# Number types that make is_valid_number() true (everything but UNKNOWN).
+_TYPE_DESCS = ("premium_rate", "toll_free", "shared_cost", "voip", "personal_number",
+               "pager", "uan", "voicemail", "fixed_line", "mobile")
+_DIGITS = frozenset("0123456789")
+
+
+class _TooComplex(Exception):
+    pass
+
+
+# ---------- pattern unrolling ----------
+def _digit_set(items):
+    chars = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(chr(av))
+        elif op is sre_constants.RANGE:
+            chars.update(chr(c) for c in range(av[0], av[1] + 1))
+        elif op is sre_constants.CATEGORY and av is sre_constants.CATEGORY_DIGIT:
+            chars.update(_DIGITS)
+        else:
+            raise _TooComplex(op)
+    return frozenset(chars & _DIGITS)
+
+
+def _unroll(pattern):
+    """Every alternative of a regex as a tuple of digit sets, one per position."""
+    if sre_parse is None:
+        raise _TooComplex("no regex parser")
+
+    def sequence(items):
+        results = [()]
+        for op, av in items:
+            options = node(op, av)
+            results = [r + o for r in results for o in options]
+            if len(results) > MAX_SEQUENCES:
+                raise _TooComplex("too many alternatives")
+        return results
+
+    def node(op, av):
+        if op is sre_constants.LITERAL:
+            return [(frozenset(chr(av)),)]
+        if op is sre_constants.IN:
+            return [(_digit_set(av),)]
+        if op is sre_constants.SUBPATTERN:
+            return sequence(av[-1])
+        if op is sre_constants.BRANCH:
+            return [s for branch in av[1] for s in sequence(branch)]
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, sub = av
+            if high == sre_constants.MAXREPEAT:
+                raise _TooComplex("unbounded repeat")
+            once = sequence(sub)
+            out = []
+            for count in range(low, high + 1):
+                out.extend(sum(combo, ()) for combo in product(once, repeat=count))
+            return out
+        raise _TooComplex(op)
+
+    return sequence(sre_parse.parse(pattern))
+
+
+def _covers(outer, inner):
+    return all(i <= o for i, o in zip(inner, outer))
+
+
+def _desc_sequences(desc, general):
+    """Alternatives of a type pattern that the general pattern also accepts."""
+    if desc is None or not desc.national_number_pattern:
+        return []
+    lengths = set(desc.possible_length) - set(desc.possible_length_local_only)
+    kept = []
+    for seq in _unroll(desc.national_number_pattern):
+        if len(seq) in lengths and any(_covers(g, seq) for g in general.get(len(seq), ())):
+            kept.append(seq)
+    return kept
+
+
+def _prefix_table(metadata):
+    """{length: [(head_length, {prefix, ...}), ...]} of valid national numbers."""
+    gd = metadata.general_desc
+    general_lengths = set(gd.possible_length) - set(gd.possible_length_local_only)
+    general = {}
+    for seq in _unroll(gd.national_number_pattern):
+        if len(seq) in general_lengths:
+            general.setdefault(len(seq), []).append(seq)
+
+    heads = {}
+    for name in _TYPE_DESCS:
+        try:
+            sequences = _desc_sequences(getattr(metadata, name), general)
+        except _TooComplex:
+            continue        # numbers of this type just take the slow path
+        for seq in sequences:
+            end = len(seq)
+            while end and seq[end - 1] == _DIGITS:
+                end -= 1
+            head = seq[:end]
+            count = 1
+            for digits in head:
+                count *= len(digits)
+            if count > MAX_PREFIXES:
+                continue
+            prefixes = heads.setdefault(len(seq), {}).setdefault(end, set())
+            prefixes.update("".join(p) for p in product(*(sorted(d) for d in head)))
+    return {length: sorted(by_head.items()) for length, by_head in heads.items()}
+
+
+# ---------- per-region rules ----------
+class _Region:
+    def __init__(self, region):
+        metadata = PhoneMetadata.metadata_for_region(region)
+        if metadata is None:
+            raise ValueError(f"Unknown region: {region}")
+        cc = metadata.country_code
+        if phonenumbers.COUNTRY_CODE_TO_REGION_CODE.get(cc) != (region,):
+            raise ValueError(f"{region}: country code {cc} is shared with other regions")
+        prefix = metadata.national_prefix_for_parsing
+        if metadata.national_prefix_transform_rule or (prefix and not prefix.isdigit()):
+            raise ValueError(f"{region}: national prefix rule is not a plain digit string")
+        self.region = region
+        self.cc = str(cc)
+        self.prefix = prefix or ""
+        if self.prefix and (self.cc.startswith(self.prefix) or self.prefix.startswith(self.cc)):
+            raise ValueError(f"{region}: national prefix overlaps the country code")
+        self.idd = re.compile(metadata.international_prefix or "NonMatch")
+        self.general = re.compile(metadata.general_desc.national_number_pattern)
+        gd = metadata.general_desc
+        self.local_lengths = set(gd.possible_length_local_only)
+        self.max_length = max(gd.possible_length)
+        self.table = _prefix_table(metadata)
+
+    def valid(self, nsn):
+        for head, prefixes in self.table.get(len(nsn), ()):
+            if nsn[:head] in prefixes:
+                return True
+        return False
+
+    def national(self, rest):
+        """Validated national number for digits after the country code, or None."""
+        if self.prefix and rest.startswith(self.prefix):
+            # the prefix is stripped whenever the remainder is a viable number
+            rest = rest[len(self.prefix):]
+        return rest if self.valid(rest) else None
+
+    def too_long(self, digits):
+        return len(digits) not in self.local_lengths and len(digits) > self.max_length
+
+
+class FastPath:
+    """Validates hot-region numbers from prefix tables; None means "ask phonenumbers"."""
+
+    def __init__(self, regions=HOT_REGIONS):
+        self.regions = {}
+        for region in regions:
+            try:
+                self.regions[region] = _Region(region)
+            except Exception:
+                # a region the tables cannot model (or a regex parser this
+                # code does not understand) always takes the slow path
+                continue
+        self._by_cc = {r.cc: r for r in self.regions.values()}
+
+    def _international(self, digits):
+        """Number after '+' or an IDD: country code, then a national number."""
+        if not digits or digits[0] == "0":
+            return None
+        # same 1-3 digit scan as phonenumbers' _extract_country_code
+        for i in range(1, min(4, len(digits) + 1)):
+            if int(digits[:i]) in phonenumbers.COUNTRY_CODE_TO_REGION_CODE:
+                region = self._by_cc.get(digits[:i])
+                if region is None:
+                    return None
+                nsn = region.national(digits[i:])
+                return "+" + region.cc + nsn if nsn else None
+        return None
+
+    def resolve(self, key, default_region):
+        """E.164 for a normalized key when it is certainly valid, else None."""
+        if key.startswith("+"):
+            return self._international(key[1:])
+
+        region = self.regions.get(default_region)
+        if region is None:
+            return None
+        idd = region.idd.match(key)
+        if idd:
+            # phonenumbers keeps "00" + "0..." as a national number
+            rest = key[idd.end():]
+            return None if rest.startswith("0") else self._international(rest)
+        if key.startswith(region.cc):
+            potential = key[len(region.cc):]
+            if region.prefix and potential.startswith(region.prefix):
+                return None
+            if not region.general.fullmatch(key) or region.too_long(key):
+                nsn = potential if region.valid(potential) else None
+            else:
+                nsn = key if region.valid(key) else None
+        else:
+            nsn = region.national(key)
+        return "+" + region.cc + nsn if nsn else None
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def fast_path():
+    """Process-wide FastPath for HOT_REGIONS, built on first use."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = FastPath()
+    return _shared
@@ -0,0 +1,222 @@
+"""Streaming number ingestion for XLSX/CSV/TXT contact files.
+
+Everything here is a generator, so a file is read a row (or a CSV chunk)
+at a time and candidates can be fed straight into NumberCleaner.clean()
+without building the whole sheet in memory.
+
+pandas and openpyxl are imported on first use, so plain-text cleaning
+(and `python -m campaign clean`) never pays for them.
+"""
+import re
+from itertools import chain, islice
+
+# Rows per pandas chunk when streaming CSV exports.
+CSV_CHUNK_ROWS = 50_000
+# Column detection: sample this many rows, keep columns where at least
+# PHONE_COLUMN_RATIO of the sampled values look like phone numbers.
+SAMPLE_ROWS = 200
+PHONE_COLUMN_RATIO = 0.5
+
+_PHONE_LIKE = r"\+?\d[\d\s\-\(\)]{6,20}\d"
+_PHONE_PATTERN = f"({_PHONE_LIKE})"
+# used when a text (or cell) has nothing phone-shaped at all
+_DIGITS_PATTERN = r"(\d{6,15})"
+
+
+def extract_numbers_from_text(text):
+    matches = re.findall(_PHONE_PATTERN, text)
+    if not matches:
+        matches = re.findall(_DIGITS_PATTERN, text)
+    return [m.strip() for m in matches]
+
+
+def _cell_text(v):
+    if v is None:
+        return ""
+    if isinstance(v, float):
+        if v != v:  # NaN
+            return ""
+        if v.is_integer():
+            v = int(v)
+    v = str(v).strip()
+    return "" if v == "nan" else v
+
+
+def _iter_frame_cells(df):
+    for row in df.itertuples(index=False, name=None):
+        for v in row:
+            v = _cell_text(v)
+            if v:
+                yield v
+
+
+def detect_phone_columns(df, sample_rows=SAMPLE_ROWS, min_ratio=PHONE_COLUMN_RATIO):
+    """Columns whose sampled values mostly look like phone numbers."""
+    sample = df if len(df) <= sample_rows else df.sample(n=sample_rows, random_state=0)
+    columns = []
+    for col in df.columns:
+        values = sample[col].dropna().astype(str)
+        if values.empty:
+            continue
+        if values.str.contains(_PHONE_LIKE, regex=True).mean() >= min_ratio:
+            columns.append(col)
+    return columns
+
+
+def extract_frame_candidates(df, columns=None):
+    """Phone candidates from a DataFrame using vectorized string ops.
+
+    Candidates come back row-major (like reading the sheet left to right)
+    as the text the user entered, so rejected ones show up unchanged in the
+    removed list. Cells with nothing phone-shaped fall back to bare digit
+    runs, as extract_numbers_from_text() does.
+    """
+    if columns is None:
+        columns = detect_phone_columns(df) or list(df.columns)
+    import pandas as pd
+    parts = []
+    for pos, col in enumerate(columns):
+        values = df[col].dropna().astype(str).str.replace(r"\.0$", "", regex=True)
+        found = values.str.extractall(_PHONE_PATTERN)[0]
+        rest = values.index.difference(found.index.get_level_values(0))
+        if len(rest):
+            found = pd.concat([found, values.loc[rest].str.extractall(_DIGITS_PATTERN)[0]])
+        if found.empty:
+            continue
+        found.index = found.index.set_names(["row", "match"])
+        parts.append(found.str.strip().to_frame("number").reset_index().assign(col=pos))
+    if not parts:
+        return []
+    merged = pd.concat(parts, ignore_index=True)
+    merged = merged.sort_values(["row", "col", "match"], kind="stable")
+    return merged["number"].tolist()
+
+
+def _iter_xlsx_cells(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for row in ws.iter_rows(values_only=True):
+            for v in row:
+                v = _cell_text(v)
+                if v:
+                    yield v
+    finally:
+        wb.close()
+
+
+def iter_cells(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield non-empty cell values (or lines for .txt) from a numbers file."""
+    pl = path.lower()
+    if pl.endswith(".xlsx"):
+        yield from _iter_xlsx_cells(path)
+    elif pl.endswith(".xls"):
+        import pandas as pd
+        # legacy .xls has no streaming reader; it is small by nature
+        yield from _iter_frame_cells(pd.read_excel(path, header=None, dtype=str))
+    elif pl.endswith(".csv"):
+        import pandas as pd
+        with pd.read_csv(path, header=None, dtype=str, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield from _iter_frame_cells(chunk)
+    elif pl.endswith(".txt"):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+
+def iter_candidates(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield phone-number candidates from a file.
+
+    CSV chunks go through the vectorized column extractor (phone columns are
+    detected per chunk, so a sparse first chunk cannot hide them), .txt
+    files through the streaming tokenizer; other formats are scanned cell
+    by cell.
+    """
+    pl = path.lower()
+    if pl.endswith(".txt"):
+        from campaign.tokenizer import iter_tokens
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            yield from iter_tokens(f)
+        return
+    if pl.endswith(".csv"):
+        import pandas as pd
+        with pd.read_csv(path, header=None, dtype=str, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield from extract_frame_candidates(chunk)
+        return
+    for cell in iter_cells(path, chunk_rows):
+        yield from extract_numbers_from_text(cell)
+
+
+def read_numbers_file(path):
+    return list(iter_cells(path))
+
+
+# ---------- rows with extra columns (template fields) ----------
+SPREADSHEET_TYPES = (".xlsx", ".xls", ".csv")
+_PHONE_RE = re.compile(_PHONE_LIKE)
+
+
+def iter_rows(path, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield every row of a spreadsheet as a list of cell strings."""
+    pl = path.lower()
+    if pl.endswith(".xlsx"):
+        from openpyxl import load_workbook
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            for row in wb.worksheets[0].iter_rows(values_only=True):
+                yield [_cell_text(v) for v in row]
+        finally:
+            wb.close()
+    elif pl.endswith(".xls"):
+        import pandas as pd
+        for row in pd.read_excel(path, header=None, dtype=str).itertuples(index=False, name=None):
+            yield [_cell_text(v) for v in row]
+    elif pl.endswith(".csv"):
+        import pandas as pd
+        with pd.read_csv(path, header=None, dtype=str, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                for row in chunk.itertuples(index=False, name=None):
+                    yield [_cell_text(v) for v in row]
+
+
+def field_name(header):
+    """Template field name for a column header: "First Name" -> "first_name"."""
+    return re.sub(r"\W+", "_", header.strip().lower()).strip("_")
+
+
+def read_records(path, sample_rows=SAMPLE_ROWS, min_ratio=PHONE_COLUMN_RATIO):
+    """(field names, iterator of (phone cell, field values)) for a spreadsheet.
+
+    The first row must be a header (no phone-like cells); the phone column is
+    the one whose sampled values most often look like numbers, every other
+    column becomes a field. Returns ([], empty iterator) when the file has
+    no header or no phone column.
+    """
+    rows = iter_rows(path)
+    header = next(rows, None)
+    if not header or any(_PHONE_RE.search(c) for c in header):
+        return [], iter(())
+    sample = list(islice(rows, sample_rows))
+    hits = [0] * len(header)
+    for row in sample:
+        for i, cell in enumerate(row[:len(header)]):
+            if cell and _PHONE_RE.search(cell):
+                hits[i] += 1
+    phone_col = max(range(len(header)), key=hits.__getitem__)
+    if not sample or hits[phone_col] < min_ratio * len(sample):
+        return [], iter(())
+    others = [i for i in range(len(header)) if i != phone_col]
+    fields = [field_name(header[i]) or f"column{i + 1}" for i in others]
+
+    def records():
+        for row in chain(sample, rows):
+            if len(row) < len(header):
+                row = row + [""] * (len(header) - len(row))
+            yield row[phone_col], tuple(row[i] for i in others)
+
+    return fields, records()
@@ -0,0 +1,89 @@
+"""Keyword intent matching for the auto-replier.
+
+Rules live in intents.json (see DEFAULT_RULES_FILE). All keywords of all
+intents are compiled into ONE regex whose alternatives are factored into a
+character trie (shared prefixes are tried once), so a message is scanned
+once no matter how many intents or languages the rule set contains. When
+several intents match, the highest priority wins (e.g. "stop" beats "ok").
+"""
+import json
+import re
+from pathlib import Path
+
+DEFAULT_RULES_FILE = Path(__file__).resolve().parent.parent / "intents.json"
+
+
+class Intent:
+    __slots__ = ("name", "reply", "priority", "keywords")
+
+    def __init__(self, name, reply=None, priority=0, keywords=()):
+        self.name = name
+        self.reply = reply
+        self.priority = priority
+        self.keywords = list(keywords)
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+def _normalize(keyword):
+    return " ".join(keyword.lower().split())
+
+
+def trie_pattern(words):
+    """Regex source matching any of `words`, factored into a prefix trie."""
+    trie = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alts = []
+        for ch in sorted(k for k in node if k):
+            alts.append((r"\s+" if ch == " " else re.escape(ch)) + build(node[ch]))
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    return build(trie)
+
+
+class IntentMatcher:
+    def __init__(self, intents):
+        self.intents = list(intents)
+        self._by_keyword = {}
+        for intent in self.intents:
+            for kw in intent.keywords:
+                kw = _normalize(kw)
+                current = self._by_keyword.get(kw)
+                if current is None or intent.priority > current.priority:
+                    self._by_keyword[kw] = intent
+        words = sorted(self._by_keyword)
+        # (?<!\w)/(?!\w) instead of \b so emoji keywords work too
+        self._regex = re.compile(r"(?<!\w)(" + trie_pattern(words) + r")(?!\w)", re.IGNORECASE) if words else None
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_RULES_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_config(json.load(f))
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(Intent(r["name"], r.get("reply"), r.get("priority", 0), r.get("keywords", ()))
+                   for r in config.get("intents", []))
+
+    def match(self, text):
+        """Best intent for a message, or None."""
+        if self._regex is None or not text:
+            return None
+        best = None
+        for m in self._regex.finditer(text):
+            intent = self._by_keyword.get(_normalize(m.group(1)))
+            if intent is not None and (best is None or intent.priority > best.priority):
+                best = intent
+        return best
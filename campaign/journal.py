@@ -0,0 +1,184 @@
+"""Resumable send journal stored in campaign.db.
+
+Every recipient of a campaign gets a row (queued/sending/sent/failed,
+attempt count, timestamps). State changes are buffered and written in
+batched transactions; the database runs in WAL mode with
+synchronous=NORMAL, so a commit does not fsync and a crashed run loses at
+most the last unflushed batch.
+
+campaign.db holds all runtime state (journal, send log, opt-outs,
+conversations) and is gitignored; users.db is tracked and keeps only the
+login table.
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from campaign.retry import PERMANENT
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_DB = ROOT / "campaign.db"
+FLUSH_EVERY = 50        # buffered state changes per transaction
+FLUSH_INTERVAL = 1.0    # ...or at least this often, in seconds
+
+QUEUED, SENDING, SENT, FAILED = "queued", "sending", "sent", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    id TEXT PRIMARY KEY,
+    message TEXT,
+    total INTEGER,
+    created_at REAL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS send_journal (
+    campaign TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    queued_at REAL,
+    updated_at REAL,
+    sent_at REAL,
+    error TEXT,
+    cause TEXT,
+    PRIMARY KEY (campaign, phone)
+);
+CREATE INDEX IF NOT EXISTS idx_send_journal_state ON send_journal (campaign, state, seq);
+"""
+
+
+# Final failures that resume must not retry: state = 'failed' with one of these causes.
+_FINAL = "state = 'failed' AND cause IN (%s)" % ", ".join("'%s'" % c for c in sorted(PERMANENT))
+
+
+def connect(path=DEFAULT_DB):
+    """WAL connection shared by the runtime stores (journal, send log, opt-outs, ...)."""
+    conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def campaign_id(message, numbers):
+    """Stable id for a message + recipient list, so re-sending it resumes."""
+    h = hashlib.sha1(message.encode("utf-8"))
+    for n in numbers:
+        h.update(b"\0" + str(n).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class SendJournal:
+    def __init__(self, path=DEFAULT_DB, flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.path = str(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._conn = connect(path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._flushed_at = time.time()
+
+    # ---------- campaign setup ----------
+    def start(self, campaign, numbers, message=""):
+        """Register a campaign and queue any recipients not yet journaled."""
+        now = time.time()
+        numbers = list(numbers)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR IGNORE INTO campaigns (id, message, total, created_at) VALUES (?, ?, ?, ?)",
+                (campaign, message, len(numbers), now))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO send_journal (campaign, seq, phone, state, queued_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?)",
+                ((campaign, i, n, now, now) for i, n in enumerate(numbers)))
+            self._conn.execute("COMMIT")
+        return campaign
+
+    def pending(self, campaign):
+        """Recipients still to send, in original order (resume point first).
+
+        Sent rows and permanent failures (invalid number, opted out) are left out.
+        """
+        self.flush()
+        rows = self._conn.execute(
+            f"SELECT phone FROM send_journal WHERE campaign = ? AND state != 'sent' "
+            f"AND NOT ({_FINAL}) ORDER BY seq", (campaign,))
+        return [r[0] for r in rows]
+
+    def message(self, campaign):
+        row = self._conn.execute("SELECT message FROM campaigns WHERE id = ?", (campaign,)).fetchone()
+        return row[0] if row else None
+
+    def latest_unfinished(self):
+        """Newest campaign that still has recipients to send, or None."""
+        self.flush()
+        row = self._conn.execute(
+            "SELECT c.id FROM campaigns c WHERE c.finished_at IS NULL AND EXISTS "
+            "(SELECT 1 FROM send_journal j WHERE j.campaign = c.id AND j.state != 'sent' "
+            f"AND NOT ({_FINAL})) ORDER BY c.created_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def campaigns(self, limit=10):
+        """[(id, total, created_at, finished_at)] newest first."""
+        return self._conn.execute(
+            "SELECT id, total, created_at, finished_at FROM campaigns ORDER BY created_at DESC LIMIT ?",
+            (limit,)).fetchall()
+
+    def summary(self, campaign):
+        self.flush()
+        counts = {QUEUED: 0, SENDING: 0, SENT: 0, FAILED: 0}
+        for state, n in self._conn.execute(
+                "SELECT state, COUNT(*) FROM send_journal WHERE campaign = ? GROUP BY state", (campaign,)):
+            counts[state] = n
+        return counts
+
+    def finish(self, campaign):
+        self.flush()
+        with self._lock:
+            self._conn.execute("UPDATE campaigns SET finished_at = ? WHERE id = ?", (time.time(), campaign))
+
+    # ---------- state changes (buffered) ----------
+    def mark_sending(self, campaign, phone):
+        self._record(SENDING, 1, None, None, None, campaign, phone)
+
+    def mark_sent(self, campaign, phone):
+        self._record(SENT, 0, time.time(), None, None, campaign, phone)
+
+    def mark_retry(self, campaign, phone, error=None):
+        """Failed attempt that will be retried: back to queued, error kept."""
+        self._record(QUEUED, 0, None, str(error) if error is not None else None, None, campaign, phone)
+
+    def mark_failed(self, campaign, phone, error=None, cause=None):
+        """Final failure; a PERMANENT cause keeps the row out of pending()."""
+        self._record(FAILED, 0, None, str(error) if error is not None else None, cause, campaign, phone)
+
+    def _record(self, state, attempt, sent_at, error, cause, campaign, phone):
+        with self._lock:
+            self._buffer.append((state, attempt, time.time(), sent_at, error, cause, campaign, phone))
+            due = (len(self._buffer) >= self.flush_every
+                   or time.time() - self._flushed_at >= self.flush_interval)
+            if due:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._flushed_at = time.time()
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        self._conn.execute("BEGIN")
+        self._conn.executemany(
+            "UPDATE send_journal SET state = ?, attempts = attempts + ?, updated_at = ?, "
+            "sent_at = COALESCE(?, sent_at), error = ?, cause = ? WHERE campaign = ? AND phone = ?", batch)
+        self._conn.execute("COMMIT")
+
+    def close(self):
+        self.flush()
+        self._conn.close()
@@ -0,0 +1,83 @@
+"""Live send analytics: the pywhatkit send log plus the campaign engine.
+
+LogTail maps PyWhatKit_DB.txt and on every refresh() parses only the bytes
+appended since the previous call (regex scanning runs directly on the
+mapping, nothing before the last offset is read again), so a refresh costs
+time proportional to the new data even when the log is hundreds of MB.
+SendEngine never writes that log; its sends are fed in with record() from
+the engine's on_result callback.
+"""
+import mmap
+import os
+import threading
+import time
+from bisect import insort
+from collections import Counter, deque
+
+from campaign.sendlog import DEFAULT_LOG, iter_blocks, normalize_phone
+
+RATE_WINDOW = 10 * 60   # seconds of history behind sends/minute
+
+
+class LogTail:
+    def __init__(self, path=DEFAULT_LOG, rate_window=RATE_WINDOW):
+        self.path = str(path)
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.total = 0
+        self.per_phone = Counter()
+        self.repeated = 0
+        self._recent = deque()
+
+    def refresh(self):
+        """Parse newly appended blocks; returns how many were added."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            with self._lock:
+                self._reset()   # log truncated or replaced
+        if size == self.offset:
+            return 0
+        added = 0
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            end = min(size, len(mm))
+            for block_end, parsed in iter_blocks(mm, self.offset, end):
+                self.offset = block_end
+                if not parsed:
+                    continue
+                phone, sent_at, _ = parsed
+                self.record(phone, sent_at)
+                added += 1
+        return added
+
+    def record(self, phone, sent_at=None):
+        """Count one send that did not go through pywhatkit (SendEngine)."""
+        sent_at = time.time() if sent_at is None else sent_at
+        phone = normalize_phone(phone)
+        with self._lock:
+            self.per_phone[phone] += 1
+            if self.per_phone[phone] == 2:
+                self.repeated += 1
+            if not self._recent or sent_at >= self._recent[-1]:
+                self._recent.append(sent_at)
+            else:
+                insort(self._recent, sent_at)   # the two sources interleave
+            self.total += 1
+
+    def sends_per_minute(self, now=None):
+        now = time.time() if now is None else now
+        cutoff = now - self.rate_window
+        with self._lock:
+            while self._recent and self._recent[0] < cutoff:
+                self._recent.popleft()
+            return len(self._recent) * 60.0 / self.rate_window
+
+    def top_repeated(self, n=5):
+        with self._lock:
+            return [(p, c) for p, c in self.per_phone.most_common(n) if c > 1]
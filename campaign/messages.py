@@ -0,0 +1,116 @@
+"""Message-file extraction (.txt / .docx / .pdf) with an on-disk cache.
+
+Extracted text is cached under CACHE_DIR, keyed by the file's absolute
+path, mtime and size, so re-importing an unchanged template is a single
+small file read. PDFs with at least PDF_PARALLEL_PAGES pages are split
+into page ranges and extracted in worker processes. load_message_async()
+runs all of it off the calling (Tk) thread.
+"""
+import hashlib
+import os
+import threading
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".proitech_campaign", "message_cache")
+CACHE_VERSION = 1           # bump when extraction output changes
+PDF_PARALLEL_PAGES = 16     # smaller PDFs are extracted in-process
+PDF_WORKERS = os.cpu_count() or 1
+MESSAGE_TYPES = (".txt", ".docx", ".pdf")
+
+
+def cache_key(path):
+    st = os.stat(path)
+    raw = f"{CACHE_VERSION}\0{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key, cache_dir):
+    return os.path.join(cache_dir, key + ".txt")
+
+
+def _read_cache(key, cache_dir):
+    try:
+        with open(_cache_path(key, cache_dir), "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_cache(key, text, cache_dir):
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        target = _cache_path(key, cache_dir)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, target)
+    except OSError:
+        pass  # the cache is an optimisation only
+
+
+# ---------- extractors ----------
+def _read_txt(path):
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def _read_docx(path):
+    from docx import Document
+    return "\n".join(p.text for p in Document(path).paragraphs)
+
+
+def _pdf_pages_text(path, start, stop):
+    """Text of pages [start, stop); runs in a worker process for large PDFs."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(path)
+    out = []
+    for i in range(start, stop):
+        t = reader.pages[i].extract_text()
+        if t:
+            out.append(t)
+    return out
+
+
+def _read_pdf(path, workers=PDF_WORKERS):
+    from PyPDF2 import PdfReader
+    pages = len(PdfReader(path).pages)
+    if pages < PDF_PARALLEL_PAGES or workers <= 1:
+        return "\n".join(_pdf_pages_text(path, 0, pages))
+    from concurrent.futures import ProcessPoolExecutor
+    step = -(-pages // workers)
+    ranges = [(s, min(s + step, pages)) for s in range(0, pages, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        parts = pool.map(_pdf_pages_text, [path] * len(ranges), *zip(*ranges))
+        return "\n".join(t for part in parts for t in part)
+
+
+def extract_message(path, use_cache=True, cache_dir=CACHE_DIR):
+    """Plain text of a message file ("" for unsupported types)."""
+    pl = path.lower()
+    if pl.endswith(".txt"):
+        return _read_txt(path)  # already as cheap as the cache
+    if not pl.endswith((".docx", ".pdf")):
+        return ""
+    key = cache_key(path) if use_cache else None
+    if key:
+        text = _read_cache(key, cache_dir)
+        if text is not None:
+            return text
+    text = _read_docx(path) if pl.endswith(".docx") else _read_pdf(path)
+    if key:
+        _write_cache(key, text, cache_dir)
+    return text
+
+
+def load_message_async(path, on_done, use_cache=True):
+    """Extract in a background thread, then call on_done(text, error) from that thread."""
+    def work():
+        try:
+            text = extract_message(path, use_cache)
+        except Exception as e:
+            on_done(None, e)
+            return
+        on_done(text, None)
+
+    t = threading.Thread(target=work, daemon=True)
+    t.start()
+    return t
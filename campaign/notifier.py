@@ -0,0 +1,191 @@
+"""Email progress reports for running campaigns.
+
+Notifier owns one SMTP connection on a background thread. The send loop
+only calls record()/notify(), which put an event on a queue and return;
+the worker folds send results into a digest (every `report_every` sends,
+or after `flush_interval` seconds when failures are waiting) and mails it
+over the open connection, reconnecting when the server has dropped it.
+A message the server rejects is reported, not retried.
+
+For local testing point it at a debug server instead of Gmail, e.g.
+`python -m aiosmtpd -n -l localhost:8025` with host="localhost",
+port=8025, starttls=False and no user/password.
+tests/test_notifier.py runs it against an in-process debug server.
+"""
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+SMTP_TIMEOUT = 30
+REPORT_EVERY = 100      # sends per progress digest
+FLUSH_INTERVAL = 300.0  # max seconds a failure waits before it is reported
+MAX_FAILURES_LISTED = 50
+
+_STOP = object()
+
+
+class Notifier:
+    def __init__(self, user, password, to=None, host=SMTP_HOST, port=SMTP_PORT, starttls=True,
+                 report_every=REPORT_EVERY, flush_interval=FLUSH_INTERVAL, on_error=None):
+        self.user = user
+        self.password = password
+        self.to = to or user
+        self.sender = user or "campaign@localhost"
+        self.host = host
+        self.port = port
+        self.starttls = starttls
+        self.report_every = report_every
+        self.flush_interval = flush_interval
+        self.on_error = on_error
+        self.disabled = False
+        self.emails_sent = 0
+        self._queue = queue.Queue()
+        self._smtp = None
+        self._reset("")
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---------- producer side (any thread, never blocks) ----------
+    def start_campaign(self, name, total):
+        self._queue.put(("start", name, total))
+
+    def record(self, number, ok, error=None):
+        self._queue.put(("result", number, ok, error))
+
+    def notify(self, subject, body):
+        self._queue.put(("mail", subject, body))
+
+    def finish_campaign(self, summary=""):
+        """Final digest for the current campaign (flushes pending results)."""
+        self._queue.put(("finish", summary))
+
+    def close(self, timeout=30):
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ---------- worker ----------
+    def _reset(self, name, total=0):
+        self.campaign = name
+        self.total = total
+        self.sent = self.failed = 0
+        self._batch_sent = 0
+        self._batch_failures = []
+        self._first_failure_at = None
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._first_failure_at is not None:
+                timeout = max(0.0, self._first_failure_at + self.flush_interval - time.time())
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._digest("Failures")
+                continue
+            if event is _STOP:
+                self._disconnect()
+                return
+            kind = event[0]
+            if kind == "start":
+                self._reset(event[1], event[2])
+            elif kind == "result":
+                self._add_result(*event[1:])
+            elif kind == "mail":
+                self._mail(event[1], event[2])
+            elif kind == "finish":
+                self._digest("Finished", event[1])
+
+    def _add_result(self, number, ok, error):
+        if ok:
+            self.sent += 1
+            self._batch_sent += 1
+        else:
+            self.failed += 1
+            self._batch_failures.append((number, error))
+            if self._first_failure_at is None:
+                self._first_failure_at = time.time()
+        if self._batch_sent + len(self._batch_failures) >= self.report_every:
+            self._digest("Progress")
+
+    def _digest(self, kind, summary=""):
+        done = self.sent + self.failed
+        lines = [f"Campaign {self.campaign}: {done}/{self.total} processed • {self.sent} sent • {self.failed} failed"]
+        if summary:
+            lines.append(summary)
+        if self._batch_failures:
+            lines.append("")
+            lines.append(f"Failures since the last report ({len(self._batch_failures)}):")
+            for number, error in self._batch_failures[:MAX_FAILURES_LISTED]:
+                lines.append(f"  {number}: {error}")
+            if len(self._batch_failures) > MAX_FAILURES_LISTED:
+                lines.append(f"  ... and {len(self._batch_failures) - MAX_FAILURES_LISTED} more")
+        self._batch_sent = 0
+        self._batch_failures = []
+        self._first_failure_at = None
+        self._mail(f"{kind}: WhatsApp campaign {done}/{self.total}", "\n".join(lines))
+
+    # ---------- SMTP ----------
+    def _connect(self):
+        smtp = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user and self.password:
+                smtp.login(self.user, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def _disconnect(self, quit=True):
+        """Close the connection; quit=False for one the server already dropped."""
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            if quit:
+                smtp.quit()
+        except Exception:
+            pass
+        finally:
+            smtp.close()
+
+    def _mail(self, subject, body):
+        if self.disabled:
+            return
+        msg = MIMEText(body, "plain", "utf-8")
+        msg["From"] = self.sender
+        msg["To"] = self.to
+        msg["Subject"] = subject
+        for attempt in (1, 2):
+            try:
+                if self._smtp is None:
+                    self._connect()
+                self._smtp.sendmail(self.sender, [self.to], msg.as_string())
+                self.emails_sent += 1
+                return
+            except smtplib.SMTPAuthenticationError as e:
+                # wrong credentials will not fix themselves; stop trying
+                self.disabled = True
+                self._disconnect()
+                self._error(f"SMTP login failed, email reports disabled: {e}")
+                return
+            except (smtplib.SMTPServerDisconnected, OSError) as e:
+                # dropped/idle-timed-out connection: close our end, reconnect once
+                self._disconnect(quit=False)
+                if attempt == 2:
+                    self._error(f"Email report failed: {e}")
+            except smtplib.SMTPException as e:
+                # refused by the server: retrying will not help; start the next
+                # report on a fresh connection
+                self._disconnect()
+                self._error(f"Email report failed: {e}")
+                return
+
+    def _error(self, text):
+        if self.on_error:
+            self.on_error(text)
@@ -0,0 +1,216 @@
+"""Compact sets of E.164 numbers backed by sorted int64 arrays.
+
+"+27793612279" is stored as the integer 27793612279 (E.164 has at most 15
+digits, well inside int64), so a set costs 8 bytes per number instead of
+~70 for a Python string in a list. The array is kept sorted and unique:
+union is a concatenate + stable sort (a linear merge of two sorted runs),
+intersection and difference are vectorized binary searches.
+
+Sets save to a small binary file (header + raw little-endian int64) that
+loads back with one read, or memory-mapped with load(path, mmap=True).
+"""
+import os
+import re
+import struct
+from functools import reduce
+
+import numpy as np
+
+FILE_SUFFIX = ".nset"
+MAGIC = b"NSET"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQ")    # magic, version, count
+_DTYPE = np.dtype("<i8")
+MAX_E164 = 10 ** 15 - 1
+_E164_TEXT = re.compile(r"\+?[1-9][0-9]{0,14}")
+
+
+def _unique_sorted(arr):
+    """Drop repeats from an already sorted array."""
+    if len(arr) < 2:
+        return arr
+    keep = np.empty(len(arr), dtype=bool)
+    keep[0] = True
+    np.not_equal(arr[1:], arr[:-1], out=keep[1:])
+    return arr[keep]
+
+
+def _value(number):
+    """Integer for an E.164 string ("+27...") or int."""
+    if isinstance(number, str) and not _E164_TEXT.fullmatch(number):
+        # int() alone would also take " 27...", "27_82...", "0027..." and non-ASCII digits
+        raise ValueError(number)
+    return int(number)
+
+
+def _all_e164_text(numbers):
+    """_E164_TEXT.fullmatch() over a list of strings at once, on their code points."""
+    text = np.array(numbers, dtype=str)
+    width = text.itemsize // 4
+    if not 0 < width <= 16:
+        return False
+    codes = text.view(np.uint32).reshape(len(numbers), width)
+    plus = codes[:, 0] == ord("+")
+    first = np.where(plus, codes[:, 1] if width > 1 else 0, codes[:, 0])
+    if not ((first >= ord("1")) & (first <= ord("9"))).all():
+        return False
+    rest = codes[:, 1:]
+    # after the first character only digits, then numpy's zero padding
+    if not (((rest >= ord("0")) & (rest <= ord("9"))) | (rest == 0)).all():
+        return False
+    # 16 characters only with a "+"
+    return width < 16 or not codes[~plus, 15].any()
+
+
+def _values(numbers):
+    """int64 array of `numbers` in their given order; ValueError names the first bad one."""
+    if isinstance(numbers, np.ndarray):
+        return numbers.astype(np.int64, copy=True)
+    numbers = numbers if isinstance(numbers, (list, tuple)) else list(numbers)
+    if not numbers:
+        return np.empty(0, dtype=np.int64)
+    try:
+        arr = np.fromiter(map(int, numbers), dtype=np.int64, count=len(numbers))
+        # int() also takes " 27...", "27_82...", "0027..." and non-ASCII digits: one check
+        # over all of them at once (ints are checked as their decimal text)
+        if _all_e164_text(numbers):
+            return arr
+    except (TypeError, ValueError, OverflowError):
+        pass
+    for n in numbers:
+        try:
+            _value(n)
+        except (TypeError, ValueError, OverflowError):
+            raise ValueError(f"Not an E.164 number: {n!r}") from None
+    return np.fromiter(map(_value, numbers), dtype=np.int64, count=len(numbers))
+
+
+def _encode(numbers):
+    """Sorted unique int64 array from E.164 strings ("+27...") or ints."""
+    if isinstance(numbers, NumberSet):
+        return numbers._array
+    arr = _values(numbers)
+    if len(arr) and (arr.min() <= 0 or arr.max() > MAX_E164):
+        raise ValueError("E.164 numbers must have 1 to 15 digits")
+    arr.sort()
+    return _unique_sorted(arr)
+
+
+def _found(values, sorted_arr):
+    """Boolean mask: which of `values` occur in `sorted_arr`."""
+    if not len(sorted_arr):
+        return np.zeros(len(values), dtype=bool)
+    idx = np.searchsorted(sorted_arr, values)
+    np.minimum(idx, len(sorted_arr) - 1, out=idx)
+    return sorted_arr[idx] == values
+
+
+class NumberSet:
+    """Immutable set of E.164 numbers; iterates in ascending numeric order."""
+
+    __slots__ = ("_array",)
+
+    def __init__(self, numbers=()):
+        self._array = _encode(numbers)
+
+    @classmethod
+    def _wrap(cls, arr):
+        s = cls.__new__(cls)
+        s._array = arr
+        return s
+
+    @property
+    def array(self):
+        """The sorted int64 values (read-only view)."""
+        view = self._array.view()
+        view.flags.writeable = False
+        return view
+
+    def __len__(self):
+        return len(self._array)
+
+    def __bool__(self):
+        return len(self._array) > 0
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __contains__(self, number):
+        try:
+            value = _value(number)
+        except (TypeError, ValueError):
+            return False
+        i = np.searchsorted(self._array, value)
+        return i < len(self._array) and self._array[i] == value
+
+    def __eq__(self, other):
+        return isinstance(other, NumberSet) and np.array_equal(self._array, other._array)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"NumberSet({len(self)} numbers)"
+
+    def to_list(self):
+        """E.164 strings, ascending."""
+        return ["+" + str(v) for v in self._array.tolist()]
+
+    def partition(self, numbers):
+        """(in the set, not in it): the items of the list `numbers`, order kept."""
+        mask = _found(_values(numbers), self._array).tolist()
+        inside, outside = [], []
+        for n, hit in zip(numbers, mask):
+            (inside if hit else outside).append(n)
+        return inside, outside
+
+    # ---------- set algebra ----------
+    def union(self, *others):
+        arrays = [self._array] + [_encode(o) for o in others]
+        merged = np.concatenate(arrays)
+        merged.sort(kind="stable")      # timsort: merges the sorted runs
+        return self._wrap(_unique_sorted(merged))
+
+    def intersection(self, *others):
+        def both(a, b):
+            small, large = (a, b) if len(a) <= len(b) else (b, a)
+            return small[_found(small, large)]
+        return self._wrap(reduce(both, (_encode(o) for o in others), self._array))
+
+    def difference(self, *others):
+        arr = self._array
+        for other in others:
+            arr = arr[~_found(arr, _encode(other))]
+        return self._wrap(arr)
+
+    def issubset(self, other):
+        return bool(_found(self._array, _encode(other)).all())
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    # ---------- binary file ----------
+    def save(self, path):
+        """Write atomically to `path` (".nset" by convention)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(self._array)))
+            f.write(self._array.astype(_DTYPE, copy=False).tobytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"{path}: not a number set file")
+            magic, version, count = _HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path}: not a number set file (or a newer version)")
+            if not mmap or not count:
+                arr = np.fromfile(f, dtype=_DTYPE, count=count)
+                if len(arr) != count:
+                    raise ValueError(f"{path}: truncated ({len(arr)} of {count} numbers)")
+                return cls._wrap(arr.astype(np.int64, copy=False))
+        arr = np.memmap(path, dtype=_DTYPE, mode="r", offset=_HEADER.size, shape=(count,))
+        return cls._wrap(arr)
@@ -0,0 +1,161 @@
+"""Failure classification and a delayed retry queue for sends.
+
+classify() sorts a send exception into a cause and decides whether it is
+worth retrying: a number that is not on WhatsApp will never succeed, a
+timed-out chat or a crashed browser tab usually will, and an error nobody
+has classified is not retried (it is more likely a bug than a hiccup). RetryQueue hands out
+fresh recipients and, once their backoff has expired, retries, so failed
+sends are retried in between new ones instead of holding up the queue.
+"""
+import heapq
+import random
+import threading
+import time
+from collections import Counter
+
+# causes
+INVALID_NUMBER = "invalid number"
+CHAT_TIMEOUT = "chat did not open"
+NOT_SENT = "message not sent"
+BROWSER = "browser error"
+NETWORK = "network error"
+OPTED_OUT = "opted out"
+UNKNOWN = "other error"
+
+PERMANENT = frozenset({INVALID_NUMBER, OPTED_OUT})     # never worth another attempt, not even on resume
+TRANSIENT = frozenset({CHAT_TIMEOUT, NOT_SENT, BROWSER, NETWORK})   # retried with backoff
+
+MAX_ATTEMPTS = 3
+BASE_DELAY = 30.0       # seconds before the first retry
+BACKOFF_FACTOR = 2.0
+MAX_DELAY = 600.0
+
+_MESSAGE_CAUSES = (
+    (("not on whatsapp", "invalid phone", "phone number shared via url is invalid"), INVALID_NUMBER),
+    (("chat did not open",), CHAT_TIMEOUT),
+    (("did not leave", "not sent"), NOT_SENT),
+    (("internet", "connection", "network", "resolve host"), NETWORK),
+    (("session", "chrome", "webdriver", "window"), BROWSER),
+)
+
+
+def classify(error):
+    """(cause, transient) for a send exception."""
+    cause = getattr(error, "cause", None)
+    if cause is None:
+        name = type(error).__name__
+        text = str(error).lower()
+        if isinstance(error, (ConnectionError, TimeoutError)) or name in ("URLError", "MaxRetryError"):
+            cause = NETWORK
+        elif name.endswith("TimeoutException"):
+            cause = CHAT_TIMEOUT
+        elif name in ("WebDriverException", "InvalidSessionIdException", "NoSuchWindowException",
+                      "SessionNotCreatedException", "StaleElementReferenceException"):
+            cause = BROWSER
+        else:
+            cause = next((c for keys, c in _MESSAGE_CAUSES if any(k in text for k in keys)), UNKNOWN)
+    return cause, cause in TRANSIENT
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY, factor=BACKOFF_FACTOR,
+                 max_delay=MAX_DELAY, jitter=0.1):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """Wait before attempt number `attempt + 1` (attempt counts from 1)."""
+        d = min(self.max_delay, self.base_delay * self.factor ** (attempt - 1))
+        return d * (1 + random.uniform(-self.jitter, self.jitter)) if self.jitter else d
+
+
+class RetryQueue:
+    """Thread-safe work queue of (item, attempt) with delayed retries.
+
+    get() prefers a retry whose backoff has expired, otherwise the next fresh
+    item, otherwise it sleeps until the earliest retry is due. It returns
+    None once nothing is queued, waiting or in flight (or after stop()).
+    """
+
+    def __init__(self, items=(), policy=None):
+        self.policy = policy or RetryPolicy()
+        self._fresh = list(items)
+        self._fresh.reverse()           # pop() from the end keeps the original order
+        self._waiting = []              # heap of (due, seq, item, attempt)
+        self._seq = 0
+        self._in_flight = 0
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._fresh) + len(self._waiting)
+
+    def get(self):
+        with self._cond:
+            while not self._stopped:
+                now = time.time()
+                if self._waiting and self._waiting[0][0] <= now:
+                    _, _, item, attempt = heapq.heappop(self._waiting)
+                elif self._fresh:
+                    item, attempt = self._fresh.pop(), 1
+                elif self._waiting or self._in_flight:
+                    self._cond.wait(self._waiting[0][0] - now if self._waiting else None)
+                    continue
+                else:
+                    return None
+                self._in_flight += 1
+                return item, attempt
+            return None
+
+    def done(self, item):
+        """The attempt handed out for `item` is finished (sent or given up)."""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def retry(self, item, attempt):
+        """Schedule another attempt; returns the delay, or None when attempts are used up."""
+        with self._cond:
+            self._in_flight -= 1
+            if attempt >= self.policy.max_attempts:
+                self._cond.notify_all()
+                return None
+            delay = self.policy.delay(attempt)
+            self._seq += 1
+            heapq.heappush(self._waiting, (time.time() + delay, self._seq, item, attempt + 1))
+            self._cond.notify_all()
+            return delay
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+
+class FailureReport:
+    """Final failures grouped by cause."""
+
+    def __init__(self):
+        self.by_cause = Counter()
+        self.failed = {}
+        self.retried = 0
+        self._lock = threading.Lock()
+
+    def add(self, number, cause):
+        with self._lock:
+            self.by_cause[cause] += 1
+            self.failed[number] = cause
+
+    def add_retry(self):
+        with self._lock:
+            self.retried += 1
+
+    def summary(self):
+        if not self.by_cause:
+            return f"No failures ({self.retried} retries)."
+        parts = " • ".join(f"{cause}: {n}" for cause, n in self.by_cause.most_common())
+        return f"Failures by cause — {parts} ({self.retried} retries)"
@@ -0,0 +1,240 @@
+"""Send pacing: token bucket with jitter, hourly/daily caps and quiet hours.
+
+RateScheduler hands out send slots. Slots are reserved under a lock, so
+several send sessions can share one scheduler and still respect the global
+rate. Caps count sends per clock hour and per calendar day (local time).
+"""
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst` tokens.
+
+    reserve() never refuses: when the bucket is empty it goes into debt and
+    returns the time at which the reserved token will have been earned.
+    """
+
+    def __init__(self, rate, burst=1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.last = None
+
+    def copy(self):
+        other = TokenBucket(self.rate, self.burst)
+        other.tokens, other.last = self.tokens, self.last
+        return other
+
+    def _refill(self, now):
+        if self.last is None:
+            self.last = now
+        elif now > self.last:
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+    def wait_time(self, now):
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self, now):
+        self._refill(now)
+        at = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        self.tokens -= 1
+        return at
+
+
+class RateScheduler:
+    """Decides when the next message may go out.
+
+    per_minute   sustained send rate
+    burst        sends allowed back to back before the rate applies
+    jitter       extra random delay, 0..jitter seconds, added to every send
+    hourly_cap   max sends per clock hour (None = unlimited)
+    daily_cap    max sends per calendar day (None = unlimited)
+    quiet_hours  (start_hour, end_hour) with no sends, e.g. (21, 7)
+    start_at     epoch seconds before which nothing is sent
+    """
+
+    def __init__(self, per_minute=10.0, burst=1, jitter=0.0, hourly_cap=None, daily_cap=None,
+                 quiet_hours=None, start_at=None):
+        self.bucket = TokenBucket(per_minute / 60.0, burst)
+        self.jitter = max(0.0, float(jitter or 0))
+        self.hourly_cap = hourly_cap or None
+        self.daily_cap = daily_cap or None
+        self.quiet_hours = quiet_hours
+        self.start_at = start_at
+        self._hour_counts = {}
+        self._day_counts = {}
+        self._pruned = None     # (date, hour) the counts were last pruned at
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_delay(cls, delay, **kwargs):
+        """Scheduler matching a fixed 'one message every `delay` seconds' pace."""
+        return cls(per_minute=60.0 / max(delay, 0.1), **kwargs)
+
+    def acquire(self, stop_event=None):
+        """Block until the next reserved slot. Returns False if stop_event fired."""
+        with self._lock:
+            at = self._reserve(time.time())
+        wait = at - time.time() + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if wait <= 0:
+            return not (stop_event and stop_event.is_set())
+        if stop_event is None:
+            time.sleep(wait)
+            return True
+        return not stop_event.wait(wait)
+
+    def eta(self, remaining, now=None):
+        """Seconds until `remaining` more sends are done at the configured pace.
+
+        Worked out per open window (the stretch until the next hour, day or
+        quiet-hours boundary) rather than per send, so it is cheap enough to
+        call from the Tk thread for any list size.
+        """
+        if remaining <= 0:
+            return 0.0
+        now = time.time() if now is None else now
+        with self._lock:
+            bucket = self.bucket.copy()
+            hours = dict(self._hour_counts)
+            days = dict(self._day_counts)
+        rate, burst = bucket.rate, bucket.burst
+        t = max(now, self.start_at or now)
+        bucket._refill(t)
+        # tokens as of `ref`, which is later than t when sends were booked
+        # into the next open window (quiet hours, start_at); negative while
+        # slots past it are already promised
+        tokens, ref = bucket.tokens, max(t, bucket.last)
+        last = t
+        while remaining > 0:
+            opened = self._next_open(t, hours, days)
+            if opened > ref:
+                tokens = min(burst, tokens + (opened - ref) * rate)
+            dt = datetime.fromtimestamp(opened)
+            cap = remaining
+            if self.hourly_cap:
+                cap = min(cap, self.hourly_cap - hours.get((dt.date(), dt.hour), 0))
+            if self.daily_cap:
+                cap = min(cap, self.daily_cap - days.get(dt.date(), 0))
+            # the k-th send of the window goes out at opened + max(0, k - tokens) / rate
+            end = self._window_end(dt)
+            fit = cap if end is None else max(0, math.ceil(tokens + (end - opened) * rate) - 1)
+            n = min(cap, fit)
+            if n:
+                last = opened + max(0.0, n - tokens) / rate
+                self._count(hours, days, dt, n)
+                remaining -= n
+            booked = last if n else opened
+            tokens += (booked - opened) * rate - n
+            earned = booked + max(0.0, 1 - tokens) / rate    # when the next token is there
+            if remaining and n == fit < cap:
+                # as in _reserve: the next send is booked before the boundary
+                # and moved past it, so its token is spent before the refill
+                last = t = ref = self._next_open(earned, hours, days)
+                self._count(hours, days, datetime.fromtimestamp(t), 1)
+                remaining -= 1
+                tokens = min(burst, tokens - 1 + (t - booked) * rate)
+            else:
+                t = ref = earned
+                tokens += (earned - booked) * rate
+        return last - now + self.jitter / 2
+
+    # ---------- internals ----------
+    def _reserve(self, now):
+        self._prune(datetime.fromtimestamp(now))
+        at = self._next_open(max(now, self.start_at or now))
+        slot = self.bucket.reserve(at)
+        if slot > at:
+            # the earned token may land inside quiet hours or a full window
+            slot = self._next_open(slot)
+        dt = datetime.fromtimestamp(slot)
+        hour_key = (dt.date(), dt.hour)
+        self._hour_counts[hour_key] = self._hour_counts.get(hour_key, 0) + 1
+        self._day_counts[dt.date()] = self._day_counts.get(dt.date(), 0) + 1
+        return slot
+
+    def _prune(self, dt):
+        """Drop counts of hours and days before `dt`; no slot can land in them any more."""
+        hour = (dt.date(), dt.hour)
+        if hour == self._pruned:
+            return
+        self._pruned = hour
+        self._hour_counts = {k: n for k, n in self._hour_counts.items() if k >= hour}
+        self._day_counts = {k: n for k, n in self._day_counts.items() if k >= dt.date()}
+
+    def _next_open(self, at, hours=None, days=None):
+        """Earliest time >= at outside quiet hours and under both caps."""
+        hours = self._hour_counts if hours is None else hours
+        days = self._day_counts if days is None else days
+        while True:
+            dt = datetime.fromtimestamp(at)
+            if self._in_quiet(dt.hour):
+                at = self._quiet_end(dt).timestamp()
+                continue
+            if self.hourly_cap and hours.get((dt.date(), dt.hour), 0) >= self.hourly_cap:
+                at = (dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)).timestamp()
+                continue
+            if self.daily_cap and days.get(dt.date(), 0) >= self.daily_cap:
+                at = datetime.combine(dt.date() + timedelta(days=1), datetime.min.time()).timestamp()
+                continue
+            return at
+
+    @staticmethod
+    def _count(hours, days, dt, n):
+        hours[(dt.date(), dt.hour)] = hours.get((dt.date(), dt.hour), 0) + n
+        days[dt.date()] = days.get(dt.date(), 0) + n
+
+    def _window_end(self, dt):
+        """Next boundary after open time `dt` where a cap resets or quiet hours begin (None = never)."""
+        ends = []
+        if self.hourly_cap:
+            ends.append(dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1))
+        if self.daily_cap:
+            ends.append(datetime.combine(dt.date() + timedelta(days=1), datetime.min.time()))
+        if self.quiet_hours and self.quiet_hours[0] != self.quiet_hours[1]:
+            start = dt.replace(hour=self.quiet_hours[0], minute=0, second=0, microsecond=0)
+            ends.append(start if start > dt else start + timedelta(days=1))
+        return min(ends).timestamp() if ends else None
+
+    def _in_quiet(self, hour):
+        if not self.quiet_hours:
+            return False
+        start, end = self.quiet_hours
+        if start == end:
+            return False
+        if start < end:
+            return start <= hour < end
+        return hour >= start or hour < end
+
+    def _quiet_end(self, dt):
+        end = dt.replace(hour=self.quiet_hours[1], minute=0, second=0, microsecond=0)
+        if end <= dt:
+            end += timedelta(days=1)
+        return end
+
+
+def next_occurrence(hh, mm, now=None):
+    """Epoch seconds of the next local hh:mm (today or tomorrow)."""
+    now = datetime.now() if now is None else now
+    at = now.replace(hour=hh, minute=mm, second=0, microsecond=0)
+    if at <= now:
+        at += timedelta(days=1)
+    return at.timestamp()
+
+
+def format_duration(seconds):
+    seconds = int(max(0, seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}h {m:02d}m"
+    if m:
+        return f"{m}m {s:02d}s"
+    return f"{s}s"
@@ -0,0 +1,284 @@
+"""Concurrent send engine on a pool of persistent WhatsApp Web sessions.
+
+Each WebSession keeps one logged-in tab open and opens chats by URL
+(`/send?phone=...&text=...`), so there is no new browser tab per recipient.
+SendEngine runs one worker thread per session; the workers pull recipients
+from a shared queue until it is empty.
+
+The engine can be pointed at fixtures/fake_whatsapp.html (FAKE_WHATSAPP_PAGE)
+to try it without a real WhatsApp account.
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+from campaign.retry import CHAT_TIMEOUT, INVALID_NUMBER, NOT_SENT, OPTED_OUT, FailureReport, RetryQueue, classify
+
+WHATSAPP_SEND_URL = "https://web.whatsapp.com/send"
+FAKE_WHATSAPP_PAGE = Path(__file__).resolve().parent / "fixtures" / "fake_whatsapp.html"
+
+# WhatsApp Web selectors (kept together; they change from time to time)
+SEND_BUTTON_SELECTOR = 'button[aria-label="Send"], span[data-icon="send"]'
+INVALID_SELECTOR = 'div[data-animate-modal-popup="true"]'
+INVALID_OK_SELECTOR = 'div[data-animate-modal-popup="true"] button'
+# selenium's By.CSS_SELECTOR; spelled out so this module imports without selenium
+CSS = "css selector"
+
+LOAD_TIMEOUT_S = 45         # first page load (includes WhatsApp startup)
+CHAT_OPEN_TIMEOUT_S = 20    # opening a chat once the app is loaded
+SEND_TIMEOUT_S = 20         # message leaving the outbox after the send click
+LINK_TIMEOUT_S = 4          # in-app link navigation before falling back to a reload
+MODAL_TIMEOUT_S = 3         # closing the "invalid number" modal before falling back to a reload
+POLL_INTERVAL = 0.1
+
+_CLICK_LINK_JS = """
+const a = document.createElement('a');
+a.href = arguments[0];
+a.style.display = 'none';
+document.body.appendChild(a);
+a.click();
+a.remove();
+"""
+
+
+class SendError(Exception):
+    def __init__(self, message, cause=None):
+        super().__init__(message)
+        self.cause = cause
+
+
+def fake_whatsapp_url():
+    """file:// URL of the bundled fake WhatsApp Web page."""
+    return FAKE_WHATSAPP_PAGE.as_uri()
+
+
+class SessionStats:
+    def __init__(self, name):
+        self.name = name
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.busy = 0.0
+        self.started = None
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def per_minute(self):
+        elapsed = self.elapsed
+        return self.sent * 60.0 / elapsed if elapsed else 0.0
+
+    def as_dict(self):
+        return {"session": self.name, "sent": self.sent, "failed": self.failed, "retried": self.retried,
+                "elapsed": round(self.elapsed, 2), "per_minute": round(self.per_minute, 2)}
+
+
+class WebSession:
+    """One persistent WhatsApp Web tab reused for every recipient."""
+
+    def __init__(self, driver, name="session-1", base_url=WHATSAPP_SEND_URL, link_navigation=True):
+        self.driver = driver
+        self.name = name
+        self.base_url = base_url
+        self.link_navigation = link_navigation
+        self.stats = SessionStats(name)
+        self._loaded = False
+
+    def chat_url(self, number, message):
+        return f"{self.base_url}?phone={str(number).lstrip('+')}&text={quote(message)}"
+
+    def send(self, number, message):
+        url = self.chat_url(number, message)
+        state = None
+        # The "invalid number" modal outlives in-app navigation; one left open
+        # would make every later chat look invalid. With none on screen when
+        # the chat starts loading, a modal seen by _wait_chat is this number's.
+        if self.link_navigation and self._loaded and self._dismiss_invalid():
+            # open the chat inside the already-loaded app, no page reload
+            self.driver.execute_script(_CLICK_LINK_JS, url)
+            state = self._wait_chat(LINK_TIMEOUT_S)
+        if state is None:
+            self.driver.get(url)
+            state = self._wait_chat(CHAT_OPEN_TIMEOUT_S if self._loaded else LOAD_TIMEOUT_S)
+            self._loaded = True
+        if state is None:
+            raise SendError("chat did not open", CHAT_TIMEOUT)
+        if state == "invalid":
+            self._dismiss_invalid()
+            raise SendError("number is not on WhatsApp", INVALID_NUMBER)
+        state.click()
+        self._wait_sent()
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+    def _dismiss_invalid(self):
+        """Click away an open "invalid number" modal; False if it stays open."""
+        deadline = time.time() + MODAL_TIMEOUT_S
+        while self.driver.find_elements(CSS, INVALID_SELECTOR):
+            if time.time() >= deadline:
+                return False
+            for button in self.driver.find_elements(CSS, INVALID_OK_SELECTOR):
+                try:
+                    button.click()
+                except Exception:
+                    pass    # re-rendered under us; the next poll finds the new one
+            time.sleep(POLL_INTERVAL)
+        return True
+
+    def _wait_chat(self, timeout):
+        """Send button element, "invalid", or None on timeout."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.driver.find_elements(CSS, INVALID_SELECTOR):
+                return "invalid"
+            buttons = self.driver.find_elements(CSS, SEND_BUTTON_SELECTOR)
+            if buttons:
+                return buttons[0]
+            time.sleep(POLL_INTERVAL)
+        return None
+
+    def _wait_sent(self, timeout=SEND_TIMEOUT_S):
+        # the send button disappears once the compose box is emptied
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.driver.find_elements(CSS, SEND_BUTTON_SELECTOR):
+                return
+            time.sleep(POLL_INTERVAL)
+        raise SendError("message did not leave the compose box", NOT_SENT)
+
+
+class SendEngine:
+    """Fans recipients out over several WebSessions through a shared queue.
+
+    on_start(session_name, number) is called before every attempt and
+    on_result(session_name, number, ok, error) once per recipient, when it
+    was sent or finally given up on. Transient failures (see
+    campaign.retry.classify) go back on the queue with exponential backoff
+    when `retry` (a RetryPolicy) is given, and on_retry(session_name,
+    number, error, attempt, delay) is called instead of on_result. Pacing
+    comes from `scheduler` (a shared RateScheduler) when given, otherwise
+    from a fixed per-session `delay`. `report` breaks final failures down
+    by cause. Numbers on `suppression` (campaign.suppression) are checked
+    right before their send, so an opt-out that arrives mid-campaign is
+    honoured; they fail with cause OPTED_OUT without touching a session.
+    A callback that raises is reported on stderr and the worker carries on.
+    """
+
+    def __init__(self, sessions, delay=0.0, on_result=None, scheduler=None, on_start=None,
+                 retry=None, on_retry=None, suppression=None):
+        self.sessions = list(sessions)
+        self.delay = delay
+        self.on_result = on_result
+        self.on_start = on_start
+        self.on_retry = on_retry
+        self.scheduler = scheduler
+        self.retry = retry
+        self.suppression = suppression
+        self.report = FailureReport()
+        self._stop = threading.Event()
+        self._queue = RetryQueue()
+
+    def stop(self):
+        self._stop.set()
+        self._queue.stop()
+
+    def run(self, numbers, message):
+        """Send `message` to every number; blocks until the queue is drained.
+
+        `message` is a string or a render(number) callable (see
+        campaign.templates), called just before each send.
+        """
+        self._stop.clear()
+        self._queue = RetryQueue(numbers, self.retry)
+        self.report = FailureReport()
+        for s in self.sessions:
+            s.stats = SessionStats(s.name)
+        threads = [threading.Thread(target=self._worker, args=(s, message), daemon=True)
+                   for s in self.sessions]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return self.stats()
+
+    def stats(self):
+        return [s.stats.as_dict() for s in self.sessions]
+
+    def _worker(self, session, message):
+        render = message if callable(message) else None
+        stats = session.stats
+        stats.started = time.time()
+        stats.finished = None
+        while not self._stop.is_set():
+            job = self._queue.get()
+            if job is None:
+                break
+            num, attempt = job
+            settled = False     # retry() settles the queue itself; anything else ends in done()
+            try:
+                if self.suppression is not None and num in self.suppression:
+                    stats.failed += 1
+                    self.report.add(num, OPTED_OUT)
+                    self._call(self.on_result, session.name, num, False,
+                               SendError("recipient opted out", OPTED_OUT))
+                    continue
+                if self.scheduler is not None and not self.scheduler.acquire(self._stop):
+                    break
+                self._call(self.on_start, session.name, num)
+                t0 = time.time()
+                try:
+                    session.send(num, render(num) if render else message)
+                    stats.sent += 1
+                    ok, err = True, None
+                except Exception as e:
+                    ok, err = False, e
+                stats.busy += time.time() - t0
+                if not ok:
+                    cause, transient = classify(err)
+                    if transient and self.retry:
+                        settled = True
+                        delay = self._queue.retry(num, attempt)  # None once attempts are used up
+                        if delay is not None:
+                            stats.retried += 1
+                            self.report.add_retry()
+                            self._call(self.on_retry, session.name, num, err, attempt, delay)
+                            continue
+                    stats.failed += 1
+                    self.report.add(num, cause)
+                self._call(self.on_result, session.name, num, ok, err)
+            finally:
+                if not settled:
+                    self._queue.done(num)
+            if self.scheduler is None and self.delay and len(self._queue):
+                self._stop.wait(self.delay)
+        stats.finished = time.time()
+
+    def _call(self, callback, *args):
+        """Run a progress callback; an error in it is reported, not fatal to the worker."""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            name = getattr(callback, "__name__", "callback")
+            print(f"SendEngine: {name}{args[:2]} failed: {e!r}", file=sys.stderr, flush=True)
+
+
+def open_sessions(count, driver_factory=None, base_url=WHATSAPP_SEND_URL):
+    """Create `count` sessions; driver_factory(index) defaults to a per-session Chrome profile."""
+    if driver_factory is None:
+        from campaign.browser import session_driver
+        driver_factory = session_driver
+    return [WebSession(driver_factory(i), name=f"session-{i + 1}", base_url=base_url)
+            for i in range(count)]
@@ -0,0 +1,210 @@
+"""Indexed store over pywhatkit's PyWhatKit_DB.txt send log.
+
+pywhatkit appends one "Date / Time / Phone Number / Message / -----" block
+per send. SendLogIndex ingests the file incrementally: it remembers the
+byte offset of the last complete block it parsed, so each ingest() only
+reads what was appended since. Sends go into campaign.db keyed by normalized
+phone and time (message bodies are stored once and referenced by id), so
+per-number history, daily volume and duplicate-send queries are index
+lookups instead of a grep over the whole log.
+
+SendEngine campaigns do not go through pywhatkit, so the recency and
+volume queries (was_contacted, contacted_since, exclude_recent,
+daily_volume, duplicate_sends) also count send_journal rows in state
+'sent'.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from campaign.cleaner import shared_cleaner
+from campaign.journal import DEFAULT_DB, connect
+from campaign.journal import SCHEMA as JOURNAL_SCHEMA
+
+DEFAULT_LOG = Path(__file__).resolve().parent.parent / "PyWhatKit_DB.txt"
+READ_CHUNK = 8 * 1024 * 1024
+RECENT_DAYS = 30
+
+SEPARATOR = re.compile(rb"-{20}\r?\n")
+_BLOCK = re.compile(
+    rb"Date:\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*\r?\n"
+    rb"Time:\s*(\d{1,2}):(\d{1,2})\s*\r?\n"
+    rb"Phone Number:\s*([^\r\n]*)\r?\n"
+    rb"Message:\s?(.*?)\r?\n?$",
+    re.DOTALL)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sendlog_state (
+    path TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sendlog_messages (
+    id INTEGER PRIMARY KEY,
+    hash TEXT UNIQUE NOT NULL,
+    text TEXT
+);
+CREATE TABLE IF NOT EXISTS sendlog (
+    phone TEXT NOT NULL,
+    sent_at INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    message_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sendlog_phone ON sendlog (phone, sent_at);
+CREATE INDEX IF NOT EXISTS idx_sendlog_day ON sendlog (day);
+"""
+
+# Every send, pywhatkit's and journaled campaigns', as (phone, sent_at, day).
+_SENDS = (
+    "SELECT phone, sent_at, day FROM sendlog UNION ALL "
+    "SELECT phone, sent_at, CAST(strftime('%Y%m%d', sent_at, 'unixepoch', 'localtime') AS INTEGER) "
+    "FROM send_journal WHERE state = 'sent' AND sent_at IS NOT NULL")
+
+
+def parse_block(block):
+    """(phone, epoch seconds, message) for one log block, or None."""
+    m = _BLOCK.search(block.strip(b"\r\n") + b"\n")
+    if not m:
+        return None
+    day, month, year, hh, mm, phone, message = m.groups()
+    try:
+        sent = datetime(int(year), int(month), int(day), int(hh), int(mm))
+    except ValueError:
+        return None
+    return phone.decode("utf-8", "replace").strip(), int(sent.timestamp()), message.decode("utf-8", "replace")
+
+
+def iter_blocks(data, start=0, end=None):
+    """Yield (end_offset, parsed) for every complete block in data[start:end].
+
+    `data` may be bytes or an mmap; offsets are absolute positions in it.
+    """
+    end = len(data) if end is None else end
+    for sep in SEPARATOR.finditer(data, start, end):
+        parsed = parse_block(data[start:sep.start()])
+        start = sep.end()
+        yield start, parsed
+
+
+def normalize_phone(raw):
+    """E.164 when the logged number is valid (fixes "+07..." entries), else as logged."""
+    return shared_cleaner().lookup(raw) or raw
+
+
+class SendLogIndex:
+    def __init__(self, db_path=DEFAULT_DB, log_path=DEFAULT_LOG):
+        self.log_path = str(log_path)
+        self._conn = connect(db_path)
+        self._conn.executescript(SCHEMA)
+        self._conn.executescript(JOURNAL_SCHEMA)
+        self._lock = threading.Lock()
+        self._message_ids = {}
+
+    # ---------- ingestion ----------
+    def ingest(self):
+        """Parse whatever was appended to the log since the last call."""
+        with self._lock:
+            return self._ingest_locked()
+
+    def _ingest_locked(self):
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            return 0
+        row = self._conn.execute("SELECT offset, size FROM sendlog_state WHERE path = ?",
+                                 (self.log_path,)).fetchone()
+        offset = row[0] if row else 0
+        if row and size < row[1]:
+            # log was truncated or replaced: rebuild from scratch
+            self._conn.execute("DELETE FROM sendlog")
+            offset = 0
+        added = 0
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            tail = b""
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk:
+                    break
+                data = tail + chunk
+                base = offset
+                rows = []
+                consumed = 0
+                self._conn.execute("BEGIN")
+                for end, parsed in iter_blocks(data):
+                    consumed = end
+                    if parsed:
+                        phone, sent_at, message = parsed
+                        day = int(datetime.fromtimestamp(sent_at).strftime("%Y%m%d"))
+                        rows.append((normalize_phone(phone), sent_at, day, self._message_id(message)))
+                offset = base + consumed
+                tail = data[consumed:]
+                self._conn.executemany(
+                    "INSERT INTO sendlog (phone, sent_at, day, message_id) VALUES (?, ?, ?, ?)", rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sendlog_state (path, offset, size) VALUES (?, ?, ?)",
+                    (self.log_path, offset, size))
+                self._conn.execute("COMMIT")
+                added += len(rows)
+        return added
+
+    def _message_id(self, text):
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        mid = self._message_ids.get(digest)
+        if mid is None:
+            self._conn.execute("INSERT OR IGNORE INTO sendlog_messages (hash, text) VALUES (?, ?)", (digest, text))
+            mid = self._conn.execute("SELECT id FROM sendlog_messages WHERE hash = ?", (digest,)).fetchone()[0]
+            self._message_ids[digest] = mid
+        return mid
+
+    # ---------- queries ----------
+    def history(self, phone):
+        """[(datetime, message)] for one number, oldest first."""
+        rows = self._conn.execute(
+            "SELECT s.sent_at, m.text FROM sendlog s LEFT JOIN sendlog_messages m ON m.id = s.message_id "
+            "WHERE s.phone = ? ORDER BY s.sent_at", (normalize_phone(phone),))
+        return [(datetime.fromtimestamp(ts), text) for ts, text in rows]
+
+    def was_contacted(self, phone, days=RECENT_DAYS):
+        since = int(time.time() - days * 86400)
+        return self._conn.execute(
+            "SELECT 1 FROM sendlog WHERE phone = ?1 AND sent_at >= ?2 UNION ALL "
+            "SELECT 1 FROM send_journal WHERE phone = ?1 AND state = 'sent' AND sent_at >= ?2 LIMIT 1",
+            (normalize_phone(phone), since)).fetchone() is not None
+
+    def contacted_since(self, days=RECENT_DAYS):
+        """Numbers sent to since `days` ago, by pywhatkit or by a journaled campaign."""
+        since = int(time.time() - days * 86400)
+        rows = self._conn.execute(
+            "SELECT phone FROM sendlog WHERE sent_at >= ?1 UNION "
+            "SELECT phone FROM send_journal WHERE state = 'sent' AND sent_at >= ?1", (since,))
+        return {r[0] for r in rows}
+
+    def daily_volume(self, days=None):
+        """[(date, sends)] newest first, optionally limited to the last `days` days."""
+        first = int(datetime.fromtimestamp(time.time() - days * 86400).strftime("%Y%m%d")) if days else 0
+        rows = self._conn.execute(
+            f"SELECT day, COUNT(*) FROM ({_SENDS}) WHERE day >= ? GROUP BY day ORDER BY day DESC", (first,))
+        return [(datetime.strptime(str(day), "%Y%m%d").date(), n) for day, n in rows]
+
+    def duplicate_sends(self, min_count=2, days=None):
+        """[(phone, sends)] for numbers messaged at least `min_count` times."""
+        since = int(time.time() - days * 86400) if days else 0
+        return self._conn.execute(
+            f"SELECT phone, COUNT(*) AS n FROM ({_SENDS}) WHERE sent_at >= ? "
+            "GROUP BY phone HAVING n >= ? ORDER BY n DESC", (since, min_count)).fetchall()
+
+    def exclude_recent(self, numbers, days=RECENT_DAYS):
+        """Split E.164 numbers into (keep, recently_contacted)."""
+        recent = self.contacted_since(days)
+        keep, dropped = [], []
+        for n in numbers:
+            (dropped if n in recent else keep).append(n)
+        return keep, dropped
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,243 @@
+"""Opt-out suppression list ("STOP" replies) stored in campaign.db.
+
+The exact list is a SQLite table keyed by E.164 number. In front of it
+sits a Bloom filter held in memory (and snapshotted to the same database),
+so the common case, a number that never opted out, is answered without a
+query: only Bloom hits are confirmed with a primary-key lookup. Checking a
+100k-recipient list costs one hash per number plus a single batched query
+for the few hits, however many millions of numbers have opted out.
+
+Other processes (the auto-replier) add rows while a GUI is running;
+refresh() picks up rows newer than the last one it has seen, and
+membership checks call it at most every REFRESH_INTERVAL seconds.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from campaign.journal import DEFAULT_DB, connect
+
+DEFAULT_CAPACITY = 10_000       # initial entries; the filter is rebuilt twice as large when full
+ERROR_RATE = 0.01               # Bloom false-positive rate (each one costs a lookup)
+REFRESH_INTERVAL = 5.0          # seconds between checks for rows added elsewhere
+SNAPSHOT_INTERVAL = 30.0        # seconds between Bloom snapshots after adds
+QUERY_CHUNK = 500               # numbers per "IN (...)" confirmation query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS suppression (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone TEXT UNIQUE NOT NULL,
+    added_at REAL,
+    source TEXT,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS suppression_bloom (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    capacity INTEGER NOT NULL,
+    error_rate REAL NOT NULL,
+    last_id INTEGER NOT NULL,
+    bits BLOB NOT NULL
+);
+"""
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (k positions by double hashing)."""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE, bits=None):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        nbytes = (self.size + 7) // 8
+        if bits is not None and len(bits) != nbytes:
+            raise ValueError("Bloom filter size does not match its parameters")
+        self.bits = bytearray(bits) if bits is not None else bytearray(nbytes)
+
+    @staticmethod
+    def _hash(key):
+        # stable across processes (unlike hash()), so snapshots stay valid
+        h = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest(), "little")
+        return h & 0xFFFFFFFFFFFFFFFF, (h >> 64) | 1
+
+    def add(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self.bits, self.size
+        for _ in range(self.hashes):
+            p = h1 % size
+            bits[p >> 3] |= 1 << (p & 7)
+            h1 += h2
+
+    def __contains__(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self.bits, self.size
+        for _ in range(self.hashes):
+            p = h1 % size
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+            h1 += h2
+        return True
+
+
+class SuppressionList:
+    def __init__(self, path=DEFAULT_DB, capacity=DEFAULT_CAPACITY, error_rate=ERROR_RATE,
+                 refresh_interval=REFRESH_INTERVAL, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.path = str(path)
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.snapshot_interval = snapshot_interval
+        self._conn = connect(path)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._snapshot_at = self._refreshed_at = time.time()
+        self._load(capacity)
+
+    # ---------- Bloom filter lifecycle ----------
+    def _load(self, capacity):
+        row = self._conn.execute(
+            "SELECT capacity, error_rate, last_id, bits FROM suppression_bloom WHERE id = 1").fetchone()
+        self._bloom, self._last_id = None, 0
+        self._entries = self._count()
+        if row and row[1] == self.error_rate:
+            try:
+                self._bloom = BloomFilter(row[0], row[1], row[3])
+                self._last_id = row[2]
+            except ValueError:
+                self._bloom = None
+        if self._bloom is None:
+            self._rebuild(max(capacity, 2 * self._entries))
+        else:
+            self._refresh_locked()
+
+    def _count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM suppression").fetchone()[0]
+
+    def _rebuild(self, capacity):
+        bloom = BloomFilter(capacity, self.error_rate)
+        last_id = 0
+        for row_id, phone in self._conn.execute("SELECT id, phone FROM suppression"):
+            bloom.add(phone)
+            last_id = max(last_id, row_id)
+        self._bloom, self._last_id = bloom, last_id
+        self._dirty = True
+        self._snapshot_locked()
+
+    def _refresh_locked(self):
+        self._refreshed_at = time.time()
+        rows = self._conn.execute("SELECT id, phone FROM suppression WHERE id > ? ORDER BY id",
+                                  (self._last_id,)).fetchall()
+        if not rows:
+            return
+        self._entries += len(rows)
+        if self._entries > self._bloom.capacity:
+            self._rebuild(2 * self._entries)
+            return
+        for row_id, phone in rows:
+            self._bloom.add(phone)
+        self._last_id = rows[-1][0]
+        self._dirty = True
+
+    def refresh(self):
+        """Pick up numbers added by other processes (e.g. the auto-replier)."""
+        with self._lock:
+            self._refresh_locked()
+
+    def _maybe_refresh(self):
+        if time.time() - self._refreshed_at >= self.refresh_interval:
+            self.refresh()
+
+    def _snapshot_locked(self):
+        self._snapshot_at = time.time()
+        if not self._dirty:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO suppression_bloom (id, capacity, error_rate, last_id, bits) "
+            "VALUES (1, ?, ?, ?, ?)",
+            (self._bloom.capacity, self._bloom.error_rate, self._last_id, bytes(self._bloom.bits)))
+        self._dirty = False
+
+    def snapshot(self):
+        with self._lock:
+            self._snapshot_locked()
+
+    # ---------- writes ----------
+    def add(self, phone, reason="", source=""):
+        """Suppress one E.164 number; True if it was not suppressed yet."""
+        return self.add_many([phone], reason, source) == 1
+
+    def add_many(self, phones, reason="", source=""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO suppression (phone, added_at, source, reason) VALUES (?, ?, ?, ?)",
+                ((p, now, source, reason) for p in phones))
+            added = self._conn.total_changes - before
+            self._conn.execute("COMMIT")
+            self._refresh_locked()
+            if time.time() - self._snapshot_at >= self.snapshot_interval:
+                self._snapshot_locked()
+        return added
+
+    def remove(self, phone):
+        """Lift a suppression. The Bloom bits stay set; the exact check filters it out."""
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM suppression WHERE phone = ?", (phone,)).rowcount > 0
+            self._entries -= removed
+        return removed
+
+    # ---------- lookups ----------
+    def __len__(self):
+        return self._entries
+
+    def __contains__(self, phone):
+        self._maybe_refresh()
+        if phone not in self._bloom:
+            return False
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM suppression WHERE phone = ?", (phone,)).fetchone() is not None
+
+    def exclude(self, numbers):
+        """(kept, suppressed) for a list of E.164 numbers, order preserved."""
+        self._maybe_refresh()
+        bloom = self._bloom
+        hits = [n for n in numbers if n in bloom]
+        if not hits:
+            return list(numbers), []
+        found = set()
+        with self._lock:
+            for i in range(0, len(hits), QUERY_CHUNK):
+                chunk = hits[i:i + QUERY_CHUNK]
+                found.update(r[0] for r in self._conn.execute(
+                    f"SELECT phone FROM suppression WHERE phone IN ({','.join('?' * len(chunk))})", chunk))
+        if not found:
+            return list(numbers), []
+        return [n for n in numbers if n not in found], [n for n in numbers if n in found]
+
+    def entries(self, limit=None):
+        """[(phone, added_at, source, reason)] newest first."""
+        sql = "SELECT phone, added_at, source, reason FROM suppression ORDER BY id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._conn.execute(sql).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._snapshot_locked()
+            self._conn.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_suppression():
+    """Process-wide suppression list on campaign.db."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SuppressionList()
+        return _shared
@@ -0,0 +1,164 @@
+"""Per-recipient message templates.
+
+    "Hi {name|there}, your {institution} application ..."
+
+{field} is replaced by the recipient's value for that spreadsheet column,
+{field|fallback} uses `fallback` when the value is blank, {phone} is the
+recipient's E.164 number and {{ / }} are literal braces. A message without
+any {word} is sent exactly as written, braces included. A {word} that is
+not a known field is sent as written; unknown_fields() lists those so the
+caller can warn before anything is sent.
+
+A Template is parsed once into a render plan. bind() resolves that plan
+against a FieldTable and returns a callable that builds one recipient's
+text on demand, so the send queue renders messages as it advances instead
+of holding 100k rendered strings. The last few results are cached, so the
+progress preview reuses the text that was just sent.
+"""
+import re
+from functools import lru_cache
+
+from campaign.ingest import read_records
+
+BUILTIN_FIELDS = ("phone",)
+RENDER_CACHE = 64       # recently rendered recipients kept (send, then preview)
+
+_TOKEN = re.compile(r"\{\{|\}\}|\{([A-Za-z_]\w*)(?:\|([^{}]*))?\}")
+
+
+class FieldTable:
+    """Extra columns per recipient: one shared column list, one tuple per number."""
+
+    def __init__(self):
+        self.columns = []
+        self._pos = {}
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, field):
+        return field in self._pos
+
+    def clear(self):
+        self.columns, self._pos, self._rows = [], {}, {}
+
+    def _column(self, field):
+        pos = self._pos.get(field)
+        if pos is None:
+            pos = self._pos[field] = len(self.columns)
+            self.columns.append(field)
+        return pos
+
+    def add_records(self, fields, records, lookup):
+        """Store rows keyed by lookup(phone cell).
+
+        The latest row per number wins for the columns it has, so re-importing
+        a corrected sheet replaces the old values; other columns are kept.
+        """
+        positions = [self._column(f) for f in fields]
+        added = 0
+        for raw, values in records:
+            number = lookup(raw)
+            if number is None:
+                continue
+            row = list(self._rows.get(number, ()))
+            row += [""] * (len(self.columns) - len(row))
+            for pos, value in zip(positions, values):
+                row[pos] = value
+            self._rows[number] = tuple(row)
+            added += 1
+        return added
+
+    def add_file(self, path, lookup):
+        fields, records = read_records(path)
+        return self.add_records(fields, records, lookup) if fields else 0
+
+    def value(self, number, pos):
+        row = self._rows.get(number)
+        return row[pos] if row is not None and pos < len(row) else ""
+
+
+class Template:
+    def __init__(self, text):
+        self.text = text
+        self.plan = []      # literal strings and (field, fallback, token) triples
+        literal = []
+        last = 0
+        for m in _TOKEN.finditer(text):
+            literal.append(text[last:m.start()])
+            last = m.end()
+            token = m.group(0)
+            if token in ("{{", "}}"):
+                literal.append(token[0])
+                continue
+            if literal:
+                self.plan.append("".join(literal))
+                literal = []
+            self.plan.append((m.group(1).lower(), m.group(2), token))
+        literal.append(text[last:])
+        if "".join(literal):
+            self.plan.append("".join(literal))
+        self.fields = list(dict.fromkeys(p[0] for p in self.plan if isinstance(p, tuple)))
+        if not self.fields:
+            # no placeholders: "{{" and "}}" are not escapes here
+            self.plan = [text] if text else []
+
+    @property
+    def is_static(self):
+        return not self.fields
+
+    def unknown_fields(self, table=None):
+        return [f for f in self.fields if f not in BUILTIN_FIELDS and (table is None or f not in table)]
+
+    def unknown_warning(self, table=None):
+        """One-line warning about {words} that will be sent as written, or ""."""
+        unknown = self.unknown_fields(table)
+        if not unknown:
+            return ""
+        available = ", ".join(list(BUILTIN_FIELDS) + (table.columns if table else []))
+        return (f"{', '.join('{' + f + '}' for f in unknown)} will be sent as written "
+                f"(no such column; available fields: {available}). Write {{{{ }}}} for literal braces.")
+
+    def bind(self, table=None):
+        """render(number) -> text; fields without a column stay as written."""
+        unknown = set(self.unknown_fields(table))
+        steps = []
+        for part in self.plan:
+            if isinstance(part, str) or part[0] in unknown:
+                literal = part if isinstance(part, str) else part[2]
+                if steps and steps[-1][0] is not None:
+                    literal = steps.pop()[0] + literal
+                steps.append((literal, None, None))
+            elif part[0] == "phone":
+                steps.append((None, -1, part[1]))
+            else:
+                steps.append((None, table._pos[part[0]], part[1]))
+        if all(literal is not None for literal, _, _ in steps):
+            text = "".join(literal for literal, _, _ in steps)
+            return lambda number: text
+
+        @lru_cache(maxsize=RENDER_CACHE)
+        def render(number):
+            out = []
+            for literal, pos, fallback in steps:
+                if literal is not None:
+                    out.append(literal)
+                    continue
+                value = number if pos < 0 else table.value(number, pos)
+                out.append(value or fallback or "")
+            return "".join(out)
+
+        return render
+
+    def blanks(self, table, numbers):
+        """{field: recipients that would get an empty value} for fields without a fallback."""
+        checks = [(f, table._pos[f]) for f, fallback in
+                  {p[0]: p[1] for p in self.plan if isinstance(p, tuple)}.items()
+                  if not fallback and f in table]
+        counts = {}
+        for number in numbers:
+            for field, pos in checks:
+                if not table.value(number, pos):
+                    counts[field] = counts.get(field, 0) + 1
+        return counts
@@ -0,0 +1,121 @@
+"""Streaming tokenizer for pasted WhatsApp participant dumps.
+
+Copying a group's participant list out of WhatsApp Web gives a blob of
+numbers mixed with names, HTML attributes (class="x1iyjqo2 ..."), "435
+more" markers and repeated runs of the same numbers. iter_tokens() scans
+such text once, a chunk at a time, and yields only the phone-shaped
+tokens; iter_numbers() turns those into unique E.164 numbers through the
+cleaner's cached lookup. Runs of numbers separated by single spaces
+("072 123 4567 082 123 4567") are split back into numbers; a run that
+cannot be split is still yielded, so the cleaner reports it as removed. Neither splits the input into intermediate
+lists, so a file or stdin of any size is processed in constant memory
+(apart from the set of numbers already seen).
+"""
+import re
+
+from campaign.cleaner import shared_cleaner
+
+CHUNK_SIZE = 1 << 16    # characters read per chunk
+MIN_DIGITS = 7
+MAX_DIGITS = 15         # E.164 limit
+
+# A number starts with '+' (even glued to the previous one, as in
+# "...2279+27 65...") or with a digit that is not part of a word such as a
+# CSS class ("x1iyjqo2"). It continues over digit groups joined by one or
+# two separators, but never into a following "435 more" marker. Groups are
+# bounded so one match is at most ~150 characters.
+_NUMBER = re.compile(
+    r"(?:\+|(?<![\w+]))\d{1,15}"
+    r"(?:[ \t\u00a0\-.()/]{1,2}(?!\d+ ?more\b)\d{1,15}){0,7}")
+_NON_DIGIT = re.compile(r"\D")
+_GROUP = re.compile(r"\d+")
+# A match ending closer than this to the end of a chunk may continue in the
+# next one, so it is carried over and rescanned.
+_TAIL = 256
+
+
+def _split(token):
+    """Split a run of more than MAX_DIGITS digits at its separators.
+
+    Tries every way of cutting the digit groups into pieces of MIN..MAX
+    digits and keeps the one with the most valid numbers (then the fewest
+    pieces). A run that cannot be cut that way is returned whole.
+    """
+    groups = [(m.start(), m.end(), len(m.group())) for m in _GROUP.finditer(token)]
+    lookup = shared_cleaner().lookup
+    best = {len(groups): (0, 0, [])}     # first group index -> (valid, -pieces, pieces)
+    for i in range(len(groups) - 1, -1, -1):
+        digits = 0
+        for j in range(i, len(groups)):
+            digits += groups[j][2]
+            if digits > MAX_DIGITS:
+                break
+            if digits < MIN_DIGITS or j + 1 not in best:
+                continue
+            piece = token[0 if i == 0 else groups[i][0]:groups[j][1]]
+            valid, pieces, rest = best[j + 1]
+            option = (valid + (lookup(piece) is not None), pieces - 1, [piece] + rest)
+            if i not in best or option[:2] > best[i][:2]:
+                best[i] = option
+    return best[0][2] if 0 in best else [token]
+
+
+def _tokens(match):
+    """Tokens for one _NUMBER match; runs shorter than MIN_DIGITS are not numbers."""
+    token = match.group()
+    n = len(_NON_DIGIT.sub("", token))
+    if n < MIN_DIGITS:
+        return []
+    if n > MAX_DIGITS:
+        return _split(token)
+    return [token]
+
+
+def tokenize(text):
+    """Phone-number tokens in `text`, in order (duplicates included).
+
+    A run too long to be one number is split into numbers where possible;
+    what cannot be split is kept, for the cleaner to report as removed.
+    """
+    return [t for m in _NUMBER.finditer(text) for t in _tokens(m)]
+
+
+def iter_tokens(source, chunk_size=CHUNK_SIZE):
+    """Yield phone-number tokens from a string or a text stream (file, stdin)."""
+    if isinstance(source, str):
+        yield from tokenize(source)
+        return
+    chunk_size = max(chunk_size, 2 * _TAIL)
+    tail, start = "", 0
+    while True:
+        chunk = source.read(chunk_size)
+        buf = tail + chunk if chunk else tail
+        safe = len(buf) - _TAIL if chunk else len(buf)
+        resume = max(safe, start)
+        for m in _NUMBER.finditer(buf, start):
+            if m.end() > safe:
+                resume = m.start()
+                break
+            yield from _tokens(m)
+        if not chunk:
+            return
+        # keep one character before the resume point for the lookbehind
+        keep = max(resume - 1, 0)
+        tail, start = buf[keep:], resume - keep
+
+
+def iter_numbers(source, cleaner=None, on_invalid=None):
+    """Yield unique E.164 numbers from a string or text stream, first occurrence first.
+
+    Tokens that do not parse as valid numbers are passed to on_invalid(token).
+    """
+    lookup = (cleaner or shared_cleaner()).lookup
+    seen = set()
+    for token in iter_tokens(source):
+        number = lookup(token)
+        if number is None:
+            if on_invalid:
+                on_invalid(token)
+        elif number not in seen:
+            seen.add(number)
+            yield number
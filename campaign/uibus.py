@@ -0,0 +1,97 @@
+"""Thread-safe UI update bus.
+
+Worker threads never touch Tk widgets. They post to a UIBus instead:
+  - log(text)        appended to a queue, flushed in batches
+  - set(key, value)  latest value wins (progress, ETA, preview ...)
+  - call(fn, *args)  run once on the Tk thread (dialogs, follow-ups)
+The Tk thread drains the bus every 1/fps seconds via after(), so a flood of
+sends costs one redraw per frame instead of one per log line, and posting
+never waits on the GUI.
+"""
+import threading
+from collections import deque
+
+UI_FPS = 20
+MAX_LOG_BATCH = 500     # log lines written per frame; the rest wait for the next one
+
+
+class UIBus:
+    def __init__(self, widget, fps=UI_FPS, max_log_batch=MAX_LOG_BATCH):
+        self.widget = widget
+        self.interval = max(1, int(1000 / fps))
+        self.max_log_batch = max_log_batch
+        self._queue = deque()   # ("log", line) / ("call", fn, args), in posting order
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._handlers = {}
+        self._log_handler = None
+        self._job = None
+
+    # ---------- wiring (Tk thread) ----------
+    def on(self, key, handler):
+        """handler(value) runs with the newest value posted for `key`."""
+        self._handlers[key] = handler
+        return self
+
+    def on_log(self, handler):
+        """handler(lines) receives a list of log lines in posting order."""
+        self._log_handler = handler
+        return self
+
+    def start(self):
+        if self._job is None:
+            self._job = self.widget.after(self.interval, self._drain)
+        return self
+
+    def stop(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+
+    # ---------- posting (any thread) ----------
+    def log(self, line):
+        self._queue.append(("log", line))
+
+    def set(self, key, value):
+        with self._lock:
+            self._latest[key] = value
+
+    def call(self, fn, *args):
+        self._queue.append(("call", fn, args))
+
+    # ---------- draining (Tk thread) ----------
+    def _drain(self):
+        try:
+            self.flush()
+        finally:
+            self._job = self.widget.after(self.interval, self._drain)
+
+    def flush(self):
+        """Apply pending updates (log lines capped per frame); Tk thread only."""
+        with self._lock:
+            latest, self._latest = self._latest, {}
+        for key, value in latest.items():
+            handler = self._handlers.get(key)
+            if handler is not None:
+                handler(value)
+        # logs and calls keep their relative order: a "done" dialog never
+        # pops up before the log lines posted ahead of it are on screen
+        batch = []
+        written = 0
+        for _ in range(len(self._queue)):
+            item = self._queue[0]
+            if item[0] == "log":
+                if written + len(batch) >= self.max_log_batch:
+                    break
+                batch.append(self._queue.popleft()[1])
+                continue
+            self._write(batch)
+            written += len(batch)
+            batch = []
+            self._queue.popleft()
+            item[1](*item[2])
+        self._write(batch)
+
+    def _write(self, lines):
+        if lines and self._log_handler is not None:
+            self._log_handler(lines)
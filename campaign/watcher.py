@@ -0,0 +1,254 @@
+"""Event-driven chat watcher for the auto-replier.
+
+A MutationObserver injected into WhatsApp Web queues "unread" and "message"
+events inside the page. Python long-polls that queue with
+execute_async_script: the call returns as soon as an event is pushed, so
+there is no periodic full-DOM scan and replies go out within a round-trip.
+
+Everything runs on one thread (WebDriver is not thread-safe): run() hands
+each batch of page events to the handler in order. reply() only types into
+the chat an event came from: it opens that chat's row when another chat is
+in front and checks the header title before typing and before sending.
+chat_phone() finds the number behind a chat whose title is a contact name:
+from the open chat's message ids when they carry it, else from the contact
+info panel.
+
+fixtures/fake_whatsapp_chats.html simulates incoming messages offline
+(window.simulateIncoming(chat, text), or open it with ?simulate=1).
+"""
+import threading
+import time
+from pathlib import Path
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+
+FAKE_CHATS_PAGE = Path(__file__).resolve().parent / "fixtures" / "fake_whatsapp_chats.html"
+
+SELECTORS = {
+    "unread": 'span[aria-label*="unread message"]',
+    "row": 'div[role="listitem"], div[role="row"]',
+    "rowTitle": "span[title]",
+    "header": "#main header span[title], #main header span[dir='auto']",
+    "incoming": "div.message-in",
+    "text": "span.selectable-text",
+}
+COMPOSE_SELECTOR = 'div[title="Type a message"], footer div[contenteditable="true"]'
+CHAT_HEADER_SELECTOR = "#main header"
+CONTACT_INFO_SELECTOR = '[data-testid="contact-info-drawer"]'
+SEND_BUTTON_SELECTOR = 'button[aria-label="Send"], span[data-icon="send"]'
+POLL_TIMEOUT = 10.0     # seconds a single long-poll may wait for events
+SWITCH_TIMEOUT = 5.0    # seconds for the header to show a chat after clicking its row
+POLL_INTERVAL = 0.1
+
+_OBSERVER_JS = r"""
+(function (sel) {
+  if (window.__waWatch) return;
+  const w = window.__waWatch = {events: [], waiters: [], rows: {}, pending: {}, seen: new Set(), chat: null, next: 1};
+  const push = (ev) => { w.events.push(ev); w.waiters.splice(0).forEach((f) => f()); };
+  const label = (el) => el ? (el.getAttribute('title') || el.textContent || '').trim() : null;
+  const currentChat = () => label(document.querySelector(sel.header));
+  const msgId = (n) => { const el = n.closest('[data-id]') || n.querySelector('[data-id]'); return el ? el.getAttribute('data-id') : null; };
+  const msgText = (n) => { const t = n.querySelectorAll(sel.text); return (t.length ? t[t.length - 1] : n).textContent; };
+  const collect = (n, css, out) => { if (n.matches(css)) out.push(n); n.querySelectorAll(css).forEach((x) => out.push(x)); };
+
+  document.querySelectorAll(sel.incoming).forEach((n) => { const id = msgId(n); if (id) w.seen.add(id); });
+  w.chat = currentChat();
+
+  new MutationObserver((muts) => {
+    const badges = new Map();
+    let incoming = [];
+    for (const m of muts) {
+      if (m.type === 'attributes') {
+        if (m.target.nodeType === 1 && m.target.matches(sel.unread)) badges.set(m.target, true);
+        continue;
+      }
+      m.addedNodes.forEach((n) => {
+        if (n.nodeType !== 1) return;
+        const found = [];
+        collect(n, sel.unread, found);
+        found.forEach((b) => badges.set(b, true));
+        collect(n, sel.incoming, incoming);
+      });
+    }
+    badges.forEach((_, badge) => {
+      const row = badge.closest(sel.row);
+      if (!row) return;
+      const chat = label(row.querySelector(sel.rowTitle));
+      const count = parseInt(((badge.getAttribute('aria-label') || '').match(/\d+/) || ['1'])[0], 10);
+      const key = 'c' + (w.next++);
+      w.rows[key] = row;
+      w.pending[chat] = count;
+      push({type: 'unread', chat: chat, key: key, count: count});
+    });
+    const chat = currentChat();
+    const switched = chat !== w.chat;
+    w.chat = chat;
+    incoming = incoming.filter((n) => { const id = msgId(n); return !id || !w.seen.has(id); });
+    if (!incoming.length) return;
+    incoming.forEach((n) => { const id = msgId(n); if (id) w.seen.add(id); });
+    let fresh = [];
+    if (chat in w.pending) {
+      // chat opened from an unread badge: only the last `count` messages are new
+      fresh = incoming.slice(-Math.max(1, w.pending[chat]));
+      delete w.pending[chat];
+    } else if (!switched) {
+      fresh = incoming;   // live message in the open chat
+    }
+    fresh.forEach((n) => push({type: 'message', chat: chat, id: msgId(n), text: msgText(n), at: Date.now()}));
+  }).observe(document.body, {childList: true, subtree: true, attributes: true, attributeFilter: ['aria-label']});
+
+  w.take = (key) => { const row = w.rows[key]; delete w.rows[key]; return row && row.isConnected ? row : null; };
+})(arguments[0]);
+"""
+
+_WAIT_JS = r"""
+const timeout = arguments[0], done = arguments[arguments.length - 1];
+const w = window.__waWatch;
+if (!w) { done(null); return; }
+if (w.events.length) { done(w.events.splice(0)); return; }
+let finished = false;
+const finish = () => { if (finished) return; finished = true; done(w.events.splice(0)); };
+w.waiters.push(finish);
+setTimeout(finish, timeout);
+"""
+
+_CURRENT_CHAT_JS = """
+const el = document.querySelector(arguments[0].header);
+return el ? (el.getAttribute('title') || el.textContent || '').trim() : null;
+"""
+
+_FIND_ROW_JS = """
+const sel = arguments[0], chat = arguments[1];
+for (const row of document.querySelectorAll(sel.row)) {
+  const t = row.querySelector(sel.rowTitle);
+  if (t && (t.getAttribute('title') || t.textContent || '').trim() === chat) return row;
+}
+return null;
+"""
+
+_MESSAGE_PHONE_JS = r"""
+for (const el of document.querySelectorAll('#main [data-id]')) {
+  const m = /^(?:true|false)_(\d{6,15})@c\.us/.exec(el.getAttribute('data-id') || '');
+  if (m) return '+' + m[1];
+}
+return null;
+"""
+
+_INFO_PHONE_JS = r"""
+const panel = document.querySelector(arguments[0]);
+if (!panel) return null;
+const m = (panel.innerText || panel.textContent || '').match(/\+\d[\d \u00a0()-]{5,}\d/);
+return m ? m[0] : null;
+"""
+
+_INSERT_TEXT_JS = """
+const el = arguments[0];
+el.focus();
+document.execCommand('insertText', false, arguments[1]);
+return el.textContent.length;
+"""
+
+
+class ChatWatcher:
+    """Pushes WhatsApp Web chat events to Python without polling the DOM."""
+
+    def __init__(self, driver, selectors=None, poll_timeout=POLL_TIMEOUT):
+        self.driver = driver
+        self.selectors = dict(SELECTORS, **(selectors or {}))
+        self.poll_timeout = poll_timeout
+        self._stop = threading.Event()
+
+    def install(self):
+        self.driver.execute_script(_OBSERVER_JS, self.selectors)
+
+    def stop(self):
+        self._stop.set()
+
+    def wait_events(self):
+        """Block until the page reports events (or poll_timeout passes)."""
+        batch = self.driver.execute_async_script(_WAIT_JS, int(self.poll_timeout * 1000))
+        if batch is None:
+            # page reloaded and lost the observer
+            self.install()
+            return []
+        return batch
+
+    def run(self, handler):
+        """Feed every event to handler(event) until stop() is called."""
+        self.driver.set_script_timeout(self.poll_timeout + 5)
+        self.install()
+        while not self._stop.is_set():
+            for ev in self.wait_events():
+                handler(ev)
+
+    def open_chat(self, key):
+        """Open the chat row behind an "unread" event."""
+        row = self.driver.execute_script("return window.__waWatch && window.__waWatch.take(arguments[0]);", key)
+        if row is None:
+            return False
+        row.click()
+        return True
+
+    def current_chat(self):
+        """Title in the open chat's header, or None."""
+        return self.driver.execute_script(_CURRENT_CHAT_JS, self.selectors)
+
+    def focus_chat(self, chat, timeout=SWITCH_TIMEOUT):
+        """Bring `chat` to the front; False if its row is missing or it does not open."""
+        if self.current_chat() == chat:
+            return True
+        row = self.driver.execute_script(_FIND_ROW_JS, self.selectors, chat)
+        if row is None:
+            return False
+        row.click()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.current_chat() == chat:
+                return True
+            time.sleep(POLL_INTERVAL)
+        return False
+
+    def chat_phone(self, chat, timeout=SWITCH_TIMEOUT):
+        """Phone number of `chat` as WhatsApp shows it ("+27 82 ..."), or None."""
+        if not chat or not self.focus_chat(chat):
+            return None
+        phone = self.driver.execute_script(_MESSAGE_PHONE_JS)
+        if phone:
+            return phone
+        # saved contact with no number in its message ids: read the contact info panel
+        self.driver.find_element(By.CSS_SELECTOR, CHAT_HEADER_SELECTOR).click()
+        try:
+            deadline = time.time() + timeout
+            while time.time() < deadline:
+                phone = self.driver.execute_script(_INFO_PHONE_JS, CONTACT_INFO_SELECTOR)
+                if phone:
+                    return phone
+                time.sleep(POLL_INTERVAL)
+            return None
+        finally:
+            self.driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+
+    def reply(self, chat, text):
+        """Type `text` into `chat` and send it; False (nothing sent) if the chat is not in front."""
+        if not chat or not self.focus_chat(chat):
+            return False
+        box = self.driver.find_element(By.CSS_SELECTOR, COMPOSE_SELECTOR)
+        box.click()
+        if not self.driver.execute_script(_INSERT_TEXT_JS, box, text):
+            # execCommand unsupported: type it, Shift+Enter keeps line breaks in one message
+            for i, line in enumerate(text.split("\n")):
+                if i:
+                    box.send_keys(Keys.SHIFT, Keys.ENTER)
+                box.send_keys(line)
+        if self.current_chat() != chat:
+            # switched while typing: the text stays behind as that chat's draft
+            return False
+        self.driver.find_element(By.CSS_SELECTOR, SEND_BUTTON_SELECTOR).click()
+        return True
+
+
+def fake_chats_url(simulate=False):
+    """file:// URL of the bundled chat simulator page."""
+    url = FAKE_CHATS_PAGE.as_uri()
+    return url + "?simulate=1" if simulate else url
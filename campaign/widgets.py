@@ -0,0 +1,139 @@
+"""Tk widgets shared by the GUIs."""
+import tkinter as tk
+import tkinter.font as tkfont
+
+FILTER_DELAY_MS = 150
+
+
+class VirtualList(tk.Frame):
+    """Read-only list view that renders only the visible rows.
+
+    The rows live in a plain Python list (set_items keeps a reference, no
+    copy); the Text widget only ever holds one screenful, replaced in a
+    single delete+insert whenever the data, the filter or the scroll
+    position changes. Display cost therefore does not grow with list size.
+    Ctrl+A copies the whole (filtered) list to the clipboard.
+    """
+
+    def __init__(self, master, height=10, searchable=True, font=None, **text_options):
+        bg = text_options.get("bg") or text_options.get("background")
+        super().__init__(master, **({"bg": bg} if bg else {}))
+        self._items = []
+        self._view = self._items
+        self._query = ""
+        self._top = 0
+        self._rows = height
+        self._filter_job = None
+
+        self.search_var = tk.StringVar()
+        self.search = None
+        if searchable:
+            colors = {k: v for k, v in text_options.items() if k in ("bg", "fg", "insertbackground")}
+            self.search = tk.Entry(self, textvariable=self.search_var, **colors)
+            self.search.pack(fill="x", pady=(0, 4))
+            self.search_var.trace_add("write", lambda *_: self._schedule_filter())
+        body = tk.Frame(self)
+        body.pack(fill="both", expand=True)
+        self.scrollbar = tk.Scrollbar(body, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(body, height=height, wrap="none", font=font, state="disabled",
+                            cursor="arrow", **text_options)
+        self.text.pack(side="left", fill="both", expand=True)
+        self._line_height = tkfont.Font(font=self.text.cget("font")).metrics("linespace") or 16
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self._scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self._scroll(3))
+        self.text.bind("<Control-a>", self._copy_all)
+        self.text.bind("<Control-A>", self._copy_all)
+
+    # ---------- data ----------
+    def set_items(self, items):
+        """Replace the backing list (one render, regardless of size)."""
+        self._items = items if isinstance(items, list) else list(items)
+        self._apply_filter(keep_position=False)
+
+    def get_items(self):
+        return self._items
+
+    def visible_items(self):
+        """Items matching the current search, in order."""
+        return self._view
+
+    def __len__(self):
+        return len(self._view)
+
+    def set_colors(self, **colors):
+        """Re-color the list (e.g. after an appearance-mode change)."""
+        bg = colors.get("bg") or colors.get("background")
+        if bg:
+            self.configure(bg=bg)
+        self.text.configure(**colors)
+        if self.search is not None:
+            self.search.configure(**{k: v for k, v in colors.items() if k in ("bg", "fg", "insertbackground")})
+
+    # ---------- scrolling ----------
+    def yview(self, *args):
+        if not args:
+            return self._fractions()
+        if args[0] == "moveto":
+            self._set_top(int(float(args[1]) * len(self._view)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._rows if args[2] == "pages" else 1)
+            self._set_top(self._top + step)
+
+    def _scroll(self, lines):
+        self._set_top(self._top + lines)
+        return "break"
+
+    def _on_wheel(self, event):
+        return self._scroll(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        rows = max(1, event.height // self._line_height)
+        if rows != self._rows:
+            self._rows = rows
+            self._set_top(self._top)
+
+    def _set_top(self, top):
+        top = max(0, min(top, len(self._view) - self._rows))
+        self._top = top
+        self._render()
+
+    def _fractions(self):
+        n = len(self._view)
+        if not n:
+            return 0.0, 1.0
+        return self._top / n, min(1.0, (self._top + self._rows) / n)
+
+    # ---------- rendering ----------
+    def _render(self):
+        chunk = self._view[self._top:self._top + self._rows]
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        if chunk:
+            self.text.insert("1.0", "\n".join(chunk))
+        self.text.configure(state="disabled")
+        self.scrollbar.set(*self._fractions())
+
+    # ---------- search ----------
+    def _schedule_filter(self):
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self, keep_position=False):
+        self._filter_job = None
+        self._query = self.search_var.get().strip().lower()
+        if self._query:
+            q = self._query
+            self._view = [x for x in self._items if q in x.lower()]
+        else:
+            self._view = self._items
+        self._set_top(self._top if keep_position else 0)
+
+    def _copy_all(self, event=None):
+        self.clipboard_clear()
+        self.clipboard_append("\n".join(self._view))
+        return "break"
@@ -1,6 +1,21 @@
 
-
 # 📱 Phone Number Cleaner — converts messy numbers to clean Python list format
+#
+# Reads the files given on the command line, or stdin when piped, or else the
+# paste below. Anything copied from WhatsApp Web works (names, HTML, "435
+# more" markers, repeated numbers): the text is scanned once and each valid
+# number is printed once, in E.164 form.
+#
+#   python "python convert_numbers.py"                       # the paste below
+#   python "python convert_numbers.py" dump.txt --plain > cleaned_numbers.txt
+#   pbpaste | python "python convert_numbers.py"
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from campaign.tokenizer import iter_numbers  # noqa: E402
 
 # Paste your numbers here (comma-separated, any spacing)
 raw_numbers = """
@@ -8,13 +23,53 @@ raw_numbers = """
 
 """
 
-# 🧩 Process: split, clean spaces, wrap in quotes
-numbers = [f'"{n.strip().replace(" ", "")}"' for n in raw_numbers.split(',') if n.strip()]
 
-# 🖨️ Print formatted, 4 per line for readability
-print("✅ Cleaned Phone Numbers:\n")
-for i, num in enumerate(numbers, 1):
-    end_char = ",\n" if i % 4 == 0 else ", "
-    print(f"    {num}", end=end_char)
+def main():
+    ap = argparse.ArgumentParser(description="Turn a pasted participant dump into clean E.164 numbers.")
+    ap.add_argument("files", nargs="*", help='text files to read ("-" for stdin)')
+    ap.add_argument("--region", default="ZA", help="region for numbers without a country code")
+    ap.add_argument("--plain", action="store_true", help="one number per line (for the cleaners / python -m campaign)")
+    args = ap.parse_args()
+
+    from campaign.cleaner import NumberCleaner
+    cleaner = NumberCleaner(default_region=args.region)
+    invalid = []
+
+    def numbers():
+        if args.files:
+            for path in args.files:
+                if path == "-":
+                    yield from iter_numbers(sys.stdin, cleaner, invalid.append)
+                else:
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        yield from iter_numbers(f, cleaner, invalid.append)
+        elif not sys.stdin.isatty():
+            yield from iter_numbers(sys.stdin, cleaner, invalid.append)
+        else:
+            yield from iter_numbers(raw_numbers, cleaner, invalid.append)
+
+    # numbers seen in an earlier file are skipped too
+    seen = set()
+    count = 0
+    if not args.plain:
+        print("✅ Cleaned Phone Numbers:\n")
+    for num in numbers():
+        if num in seen:
+            continue
+        seen.add(num)
+        count += 1
+        if args.plain:
+            print(num)
+        else:
+            # 🖨️ Print formatted, 4 per line for readability
+            print(f'    "{num}"', end=",\n" if count % 4 == 0 else ", ")
+
+    if not args.plain:
+        print(f"\n\n{count} numbers • {len(invalid)} invalid skipped")
+        print("📋 Copy and paste the above list directly into your WhatsApp script.")
+    else:
+        print(f"{count} numbers, {len(invalid)} invalid skipped", file=sys.stderr)
+
 
-print("\n\n📋 Copy and paste the above list directly into your WhatsApp script.")
+if __name__ == "__main__":
+    main()
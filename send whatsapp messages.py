@@ -1,39 +1,32 @@
-import pywhatkit as kit
-import pandas as pd
-import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
-from docx import Document
-from PyPDF2 import PdfReader
 import threading
-import re
-import phonenumbers
 
-cleaned_numbers = []
+from campaign.cleaner import shared_cleaner
+from campaign.ingest import extract_frame_candidates
+from campaign.messages import load_message_async
+from campaign.retry import OPTED_OUT, FailureReport, RetryPolicy, RetryQueue, classify
+from campaign.scheduler import RateScheduler
+from campaign.suppression import shared_suppression
+from campaign.tokenizer import iter_tokens, tokenize
+from campaign.uibus import UIBus
+from campaign.widgets import VirtualList
 
-# ========== Utility Functions ==========
+cleaned_numbers = []
 
-def extract_numbers_from_text(text):
-    """Extract all potential numbers from text."""
-    potential_numbers = re.findall(r"(\+?\d[\d\s\-()]{8,20})", text)
-    return [n.strip() for n in potential_numbers]
+# Pacing for process_sending: 12 messages/min sustained, a little jitter
+SEND_PER_MINUTE = 12
+SEND_JITTER = 2.0
+# Transient failures are retried (with exponential backoff) between fresh sends
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30
 
+# ========== Utility Functions ==========
 
 def clean_numbers(raw_numbers, default_region="ZA"):
-    """Use phonenumbers library to parse and validate international numbers."""
-    clean, removed = [], []
-    for num in raw_numbers:
-        try:
-            parsed = phonenumbers.parse(num, default_region)
-            if phonenumbers.is_valid_number(parsed):
-                e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                if e164 not in clean:
-                    clean.append(e164)
-            else:
-                removed.append(num)
-        except Exception:
-            removed.append(num)
-    return clean, removed
+    """Use the shared cleaning engine to parse, validate and dedupe numbers."""
+    result = shared_cleaner().clean(raw_numbers, default_region)
+    return result.valid, result.removed
 
 
 # ========== File Loading ==========
@@ -46,17 +39,14 @@ def load_numbers_from_file():
 
     raw_numbers = []
     try:
+        import pandas as pd
         if file_path.endswith(".xlsx"):
-            df = pd.read_excel(file_path)
-            raw_text = " ".join(df.astype(str).apply(lambda x: " ".join(x), axis=1))
-            raw_numbers = extract_numbers_from_text(raw_text)
+            raw_numbers = extract_frame_candidates(pd.read_excel(file_path, dtype=str))
         elif file_path.endswith(".csv"):
-            df = pd.read_csv(file_path)
-            raw_text = " ".join(df.astype(str).apply(lambda x: " ".join(x), axis=1))
-            raw_numbers = extract_numbers_from_text(raw_text)
+            raw_numbers = extract_frame_candidates(pd.read_csv(file_path, dtype=str))
         elif file_path.endswith(".txt"):
-            with open(file_path, "r", encoding="utf-8") as f:
-                raw_numbers = extract_numbers_from_text(f.read())
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                raw_numbers = list(iter_tokens(f))
     except Exception as e:
         messagebox.showerror("Error", f"Failed to load numbers: {e}")
         return
@@ -72,7 +62,7 @@ def load_numbers_from_textbox():
         messagebox.showwarning("Warning", "Please type or paste numbers first.")
         return
 
-    raw_numbers = extract_numbers_from_text(raw_input)
+    raw_numbers = tokenize(raw_input)
     clean, removed = clean_numbers(raw_numbers)
     show_clean_numbers(clean, removed)
 
@@ -80,11 +70,8 @@ def load_numbers_from_textbox():
 def show_clean_numbers(clean, removed):
     global cleaned_numbers
     cleaned_numbers = clean
-    clean_box.delete(1.0, tk.END)
-    clean_box.insert(tk.END, "\n".join(clean))
-
-    removed_box.delete(1.0, tk.END)
-    removed_box.insert(tk.END, "\n".join(removed))
+    clean_box.set_items(clean)
+    removed_box.set_items(removed)
 
     messagebox.showinfo("Cleaning Done", f"✅ {len(clean)} valid numbers, ❌ {len(removed)} removed.")
 
@@ -97,21 +84,14 @@ def load_message_from_file():
     if not file_path:
         return
 
-    text = ""
-    try:
-        if file_path.endswith(".txt"):
-            with open(file_path, "r", encoding="utf-8") as f:
-                text = f.read()
-        elif file_path.endswith(".docx"):
-            doc = Document(file_path)
-            text = "\n".join([para.text for para in doc.paragraphs])
-        elif file_path.endswith(".pdf"):
-            reader = PdfReader(file_path)
-            text = "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to load message: {e}")
-        return
+    # parsed in a background thread; the result comes back through the UI bus
+    load_message_async(file_path, lambda text, err: ui.call(show_message, text, err))
+
 
+def show_message(text, err):
+    if err is not None:
+        messagebox.showerror("Error", f"Failed to load message: {err}")
+        return
     message_box.delete(1.0, tk.END)
     message_box.insert(tk.END, text)
 
@@ -136,65 +116,95 @@ def send_messages():
 
 def process_sending(message):
     """Send messages with progress feedback."""
+    import pywhatkit as kit  # opens a browser check on import; only needed when sending
     sent_count = 0
-    for num in cleaned_numbers:
-        try:
-            print(f"Sending to {num}...")
-            kit.sendwhatmsg_instantly(num, message, wait_time=15, tab_close=True)
-            sent_count += 1
-            progress["value"] = sent_count
-            root.update_idletasks()
-            time.sleep(5)
-        except Exception as e:
-            print(f"❌ Failed to send to {num}: {e}")
-            continue
-
-    messagebox.showinfo("Completed", f"✅ Sent {sent_count} message(s) successfully.")
-    send_button.config(state="normal")
+    processed = 0
+    pacer = RateScheduler(per_minute=SEND_PER_MINUTE, jitter=SEND_JITTER)
+    work = RetryQueue(cleaned_numbers, RetryPolicy(RETRY_ATTEMPTS, RETRY_BASE_DELAY))
+    report = FailureReport()
+    suppression = shared_suppression()
+    while (job := work.get()) is not None:
+        num, attempt = job
+        # checked per send, so a STOP that arrives mid-campaign is honoured
+        if num in suppression:
+            work.done(num)
+            report.add(num, OPTED_OUT)
+            print(f"🚫 Skipping {num}: opted out")
+        else:
+            pacer.acquire()
+            try:
+                print(f"Sending to {num}...")
+                kit.sendwhatmsg_instantly(num, message, wait_time=15, tab_close=True)
+                sent_count += 1
+                work.done(num)
+            except Exception as e:
+                cause, transient = classify(e)
+                delay = work.retry(num, attempt) if transient else work.done(num)
+                if delay is not None:
+                    report.add_retry()
+                    print(f"⏳ {num} failed ({cause}), retrying in {delay:.0f}s: {e}")
+                    continue
+                report.add(num, cause)
+                print(f"❌ Failed to send to {num} ({cause}): {e}")
+        processed += 1
+        ui.set("progress", processed)
+
+    # widgets are only touched from the Tk thread, via the UI bus
+    ui.call(messagebox.showinfo, "Completed", f"✅ Sent {sent_count} message(s) successfully.\n{report.summary()}")
+    ui.call(send_button.config, {"state": "normal"})
 
 
 # ========== GUI ==========
 
-root = tk.Tk()
-root.title("🌍 International WhatsApp Bulk Sender")
-root.geometry("950x800")
-root.config(bg="#eef5f9")
+def build_gui():
+    """Create the window; module import stays free of Tk side effects."""
+    global root, numbers_box, clean_box, removed_box, message_box, send_button, progress, ui
+
+    root = tk.Tk()
+    root.title("🌍 International WhatsApp Bulk Sender")
+    root.geometry("950x800")
+    root.config(bg="#eef5f9")
+
+    # ---- Title ----
+    tk.Label(root, text="🌍 WhatsApp Campaign Tool (International Supported)", font=("Arial", 20, "bold"), fg="#007bff", bg="#eef5f9").pack(pady=10)
+
+    # ---- Number Input Section ----
+    tk.Label(root, text="Enter or Paste Numbers Below (or Import from File):", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
+    numbers_box = scrolledtext.ScrolledText(root, width=70, height=8, font=("Arial", 11))
+    numbers_box.pack(pady=5)
 
-# ---- Title ----
-tk.Label(root, text="🌍 WhatsApp Campaign Tool (International Supported)", font=("Arial", 20, "bold"), fg="#007bff", bg="#eef5f9").pack(pady=10)
+    frame_num = tk.Frame(root, bg="#eef5f9")
+    frame_num.pack(pady=5)
+    tk.Button(frame_num, text="📂 Import Numbers", command=load_numbers_from_file, bg="#007bff", fg="white", width=18, height=2).grid(row=0, column=0, padx=10)
+    tk.Button(frame_num, text="🧹 Clean Numbers", command=load_numbers_from_textbox, bg="#17a2b8", fg="white", width=18, height=2).grid(row=0, column=1, padx=10)
 
-# ---- Number Input Section ----
-tk.Label(root, text="Enter or Paste Numbers Below (or Import from File):", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
-numbers_box = scrolledtext.ScrolledText(root, width=70, height=8, font=("Arial", 11))
-numbers_box.pack(pady=5)
+    # ---- Cleaned Numbers Display ----
+    tk.Label(root, text="✅ Valid Numbers", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
+    clean_box = VirtualList(root, width=70, height=6, font=("Arial", 10))
+    clean_box.pack(pady=5)
 
-frame_num = tk.Frame(root, bg="#eef5f9")
-frame_num.pack(pady=5)
-tk.Button(frame_num, text="📂 Import Numbers", command=load_numbers_from_file, bg="#007bff", fg="white", width=18, height=2).grid(row=0, column=0, padx=10)
-tk.Button(frame_num, text="🧹 Clean Numbers", command=load_numbers_from_textbox, bg="#17a2b8", fg="white", width=18, height=2).grid(row=0, column=1, padx=10)
+    tk.Label(root, text="❌ Invalid or Removed Numbers", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
+    removed_box = VirtualList(root, width=70, height=5, font=("Arial", 10), searchable=False)
+    removed_box.pack(pady=5)
 
-# ---- Cleaned Numbers Display ----
-tk.Label(root, text="✅ Valid Numbers", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
-clean_box = scrolledtext.ScrolledText(root, width=70, height=6, font=("Arial", 10))
-clean_box.pack(pady=5)
+    # ---- Message Input ----
+    tk.Label(root, text="💬 Type or Import Your Message Below:", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
+    message_box = scrolledtext.ScrolledText(root, width=80, height=8, font=("Arial", 11))
+    message_box.pack(pady=5)
 
-tk.Label(root, text="❌ Invalid or Removed Numbers", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
-removed_box = scrolledtext.ScrolledText(root, width=70, height=5, font=("Arial", 10))
-removed_box.pack(pady=5)
+    tk.Button(root, text="📄 Import Message File", command=load_message_from_file, bg="#28a745", fg="white", width=20, height=2).pack(pady=5)
 
-# ---- Message Input ----
-tk.Label(root, text="💬 Type or Import Your Message Below:", bg="#eef5f9", font=("Arial", 12, "bold")).pack()
-message_box = scrolledtext.ScrolledText(root, width=80, height=8, font=("Arial", 11))
-message_box.pack(pady=5)
+    # ---- Send Button ----
+    send_button = tk.Button(root, text="🚀 Send Messages", command=send_messages, bg="#dc3545", fg="white", font=("Arial", 14, "bold"), width=20, height=2)
+    send_button.pack(pady=15)
 
-tk.Button(root, text="📄 Import Message File", command=load_message_from_file, bg="#28a745", fg="white", width=20, height=2).pack(pady=5)
+    # ---- Progress Bar ----
+    progress = ttk.Progressbar(root, length=600, mode="determinate")
+    progress.pack(pady=10)
 
-# ---- Send Button ----
-send_button = tk.Button(root, text="🚀 Send Messages", command=send_messages, bg="#dc3545", fg="white", font=("Arial", 14, "bold"), width=20, height=2)
-send_button.pack(pady=15)
+    ui = UIBus(root).on("progress", lambda value: progress.configure(value=value)).start()
 
-# ---- Progress Bar ----
-progress = ttk.Progressbar(root, length=600, mode="determinate")
-progress.pack(pady=10)
 
-root.mainloop()
+if __name__ == "__main__":
+    build_gui()
+    root.mainloop()
@@ -0,0 +1,12 @@
+import pytest
+
+from campaign import suppression
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _scratch_suppression(tmp_path_factory):
+    """shared_cleaner() checks the shared opt-out list; keep it out of the repo's campaign.db."""
+    suppression._shared = suppression.SuppressionList(tmp_path_factory.mktemp("db") / "campaign.db")
+    yield
+    suppression._shared.close()
+    suppression._shared = None
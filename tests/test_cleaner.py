@@ -0,0 +1,107 @@
+"""NumberCleaner against the normalize_and_validate it replaced."""
+import random
+import re
+
+import phonenumbers
+
+from campaign.cleaner import NumberCleaner
+
+SEED = 1
+
+
+def baseline_normalize_and_validate(numbers_list, default_region="ZA"):
+    """whatsapp_cleaner_gui.normalize_and_validate as it was before campaign.cleaner."""
+    valid = []
+    removed = []
+    for raw in numbers_list:
+        s = str(raw).strip()
+        if not s:
+            continue
+        s = s.replace("\u200b", "")
+        try:
+            if s.startswith("+"):
+                parsed = phonenumbers.parse(s, None)
+            else:
+                parsed = phonenumbers.parse(s, default_region)
+            if phonenumbers.is_valid_number(parsed):
+                e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+                if e164 not in valid:
+                    valid.append(e164)
+            else:
+                removed.append(s)
+        except Exception:
+            digits = re.sub(r"\D", "", s)
+            if len(digits) >= 9 and digits.startswith("0"):
+                try:
+                    parsed = phonenumbers.parse(digits, "ZA")
+                    if phonenumbers.is_valid_number(parsed):
+                        e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+                        if e164 not in valid:
+                            valid.append(e164)
+                        continue
+                except Exception:
+                    pass
+            removed.append(s)
+    return valid, removed
+
+
+FIXED = [
+    "+27 79 361 2279", "+27 69 345 8439", "+27 79 361 2279", "0793612279", "27793612279",
+    "+267 74 767 888", "+267 75 129 209", "0027 82 123 4567", "(082) 123-4567", "082.123.4567",
+    "+0722345678", "+27 0 82 123 4567", "0821234567\u200b", "  0821234567  ", "", "   ",
+    "082 123 4567 ext. 12", "+1 202 555 0143", "+44 20 7946 0958", "2025550143",
+    "12345", "abc", "+", "0000000000", "+27 82 123", "08212345678901", "1-800-FLOWERS",
+    "+27 82 123 4567 / 083 765 4321", " +27 82 123 4567",
+]
+
+
+def _random_entries(rng, count):
+    shapes = ("+27 {a} {b} {c}", "0{a}{b}{c}", "27{a}{b}{c}", "0{a} {b} {c}", "({a}) {b}-{c}",
+              "+267 {a} {b} {c}", "00 27 {a} {b} {c}", "+0{a}{b}{c}", "{a}{b}{c}")
+    out = []
+    for _ in range(count):
+        a = str(rng.choice((60, 61, 63, 71, 72, 73, 74, 76, 79, 82, 83, 84, 11, 21, 12, 80, 86)))
+        b = "%03d" % rng.randrange(1000)
+        c = "%04d" % rng.randrange(10000)
+        if rng.random() < 0.1:
+            c = c[:rng.randrange(4)]
+        out.append(rng.choice(shapes).format(a=a, b=b, c=c))
+    return out
+
+
+def _corpus():
+    rng = random.Random(SEED)
+    entries = FIXED + _random_entries(rng, 3000)
+    return entries + rng.sample(entries, 500)      # repeats, as re-imported lists have
+
+
+def test_clean_matches_baseline():
+    entries = _corpus()
+    want_valid, want_removed = baseline_normalize_and_validate(entries)
+    result = NumberCleaner().clean(entries)
+    assert result.valid == want_valid
+    assert result.removed == want_removed
+    kept = sum(1 for e in entries if str(e).strip()) - len(want_removed)
+    assert result.duplicates == kept - len(want_valid)
+
+
+def test_clean_is_stable_on_a_warm_cache():
+    entries = _corpus()
+    cleaner = NumberCleaner()
+    first = cleaner.clean(entries)
+    again = cleaner.clean(entries)
+    assert (again.valid, again.removed, again.duplicates) == (first.valid, first.removed, first.duplicates)
+    assert cleaner.cache.hits >= len(entries)
+
+
+def test_parallel_clean_matches_baseline():
+    entries = _corpus()
+    want = baseline_normalize_and_validate(entries)
+    result = NumberCleaner().clean_parallel(entries, workers=2, chunk_size=500)
+    assert (result.valid, result.removed) == want
+
+
+def test_other_default_region():
+    entries = ["202 555 0143", "(202) 555-0143", "+27 82 123 4567", "082 123 4567", "0821234567"]
+    assert tuple(NumberCleaner(default_region="US").clean(entries)) == \
+        baseline_normalize_and_validate(entries, "US")
@@ -0,0 +1,106 @@
+"""Differential check: campaign.fastpath against phonenumbers.
+
+Numbers for the hot regions are generated in every shape a contact list
+produces ("+27 82...", "27 82...", "082...", "82...", "0027...",
+"+27 0 82...", other countries, wrong lengths, mutated digits) and resolved
+twice: with the prefix-table fast path and with the full phonenumbers
+parse (cleaner.parse_key). Whenever the fast path answers, the answers
+must be identical. The sample is seeded and bounded; set
+FASTPATH_CHECK_COUNT (e.g. 5000000) for a longer run.
+"""
+import os
+import random
+
+import pytest
+
+from campaign import fastpath
+from campaign.cleaner import parse_key
+from campaign.fastpath import HOT_REGIONS, FastPath
+
+SEED = 20240611
+COUNT = int(os.environ.get("FASTPATH_CHECK_COUNT", "20000"))
+OTHER_REGIONS = ("GB", "NA", "US")     # default regions the fast path must not claim
+OTHER_CODES = ("1", "44", "264", "263", "260", "7", "800")
+
+
+def _national(rng, region):
+    """A national number: mostly built on a valid prefix, sometimes random or mutated."""
+    table = region.table
+    if rng.random() < 0.75:
+        length = rng.choice(sorted(table))
+        head, prefixes = rng.choice(table[length])
+        digits = rng.choice(sorted(prefixes)) + "".join(rng.choice("0123456789") for _ in range(length - head))
+    else:
+        length = rng.randint(3, 12)
+        digits = "".join(rng.choice("0123456789") for _ in range(length))
+    roll = rng.random()
+    if roll < 0.05 and len(digits) > 1:
+        digits = digits[:-1]
+    elif roll < 0.10:
+        digits += rng.choice("0123456789")
+    elif roll < 0.15:
+        i = rng.randrange(len(digits))
+        digits = digits[:i] + rng.choice("0123456789") + digits[i + 1:]
+    return digits
+
+
+def _key(rng, region, nsn):
+    cc, prefix = region.cc, region.prefix or "0"
+    return rng.choice((
+        nsn,
+        prefix + nsn,
+        cc + nsn,
+        "+" + cc + nsn,
+        "+" + cc + prefix + nsn,
+        cc + prefix + nsn,
+        "00" + cc + nsn,
+        "+0" + nsn,
+        "+" + rng.choice(OTHER_CODES) + nsn,
+        prefix + prefix + nsn,
+    ))
+
+
+@pytest.fixture(scope="module")
+def fast():
+    return FastPath()
+
+
+def test_hot_regions_have_tables(fast):
+    # on an interpreter whose regex parser the unroller no longer understands
+    # this is where it shows: the fast path would silently answer nothing
+    assert set(fast.regions) == set(HOT_REGIONS)
+
+
+def test_same_answers_as_phonenumbers(fast):
+    rng = random.Random(SEED)
+    regions = [fast.regions[r] for r in sorted(fast.regions)]
+    answered = 0
+    mismatches = []
+    for _ in range(COUNT):
+        region = rng.choice(regions)
+        key = _key(rng, region, _national(rng, region))
+        default = rng.choice(HOT_REGIONS) if rng.random() < 0.9 else rng.choice(OTHER_REGIONS)
+        got = fast.resolve(key, default)
+        if got is not None:
+            answered += 1
+            want = parse_key(key, default)
+            if got != want:
+                mismatches.append((key, default, got, want))
+    assert not mismatches[:20]
+    assert answered > COUNT // 10     # the fast path is actually taken
+
+
+def test_falls_back_without_regex_parser(monkeypatch):
+    monkeypatch.setattr(fastpath, "sre_parse", None)
+    fast = FastPath()
+    assert fast.regions == {}
+    assert fast.resolve("+27821234567", "ZA") is None
+    assert fast.resolve("0821234567", "ZA") is None
+
+
+def test_falls_back_when_unrolling_breaks(monkeypatch):
+    def broken(pattern):
+        raise AttributeError("parser changed")
+
+    monkeypatch.setattr(fastpath, "_unroll", broken)
+    assert FastPath().resolve("0821234567", "ZA") is None
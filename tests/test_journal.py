@@ -0,0 +1,52 @@
+"""Send journal: resume point, retries and permanent failures."""
+import pytest
+
+from campaign.journal import SendJournal, campaign_id
+from campaign.retry import CHAT_TIMEOUT, INVALID_NUMBER, OPTED_OUT
+
+NUMBERS = [f"+2782000000{i}" for i in range(6)]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    j = SendJournal(tmp_path / "campaign.db", flush_every=2)
+    yield j
+    j.close()
+
+
+def test_campaign_id_is_stable():
+    assert campaign_id("hi", NUMBERS) == campaign_id("hi", list(NUMBERS))
+    assert campaign_id("hi", NUMBERS) != campaign_id("hi", NUMBERS[::-1])
+
+
+def test_resume_skips_sent_and_permanent_failures(tmp_path, journal):
+    cid = journal.start(campaign_id("hi", NUMBERS), NUMBERS, "hi")
+    journal.mark_sending(cid, NUMBERS[0])
+    journal.mark_sent(cid, NUMBERS[0])
+    journal.mark_failed(cid, NUMBERS[1], "not on WhatsApp", INVALID_NUMBER)
+    journal.mark_failed(cid, NUMBERS[2], "opted out", OPTED_OUT)
+    journal.mark_failed(cid, NUMBERS[3], "chat did not open", CHAT_TIMEOUT)
+    journal.mark_retry(cid, NUMBERS[4], "chat did not open")
+    journal.close()
+
+    reopened = SendJournal(tmp_path / "campaign.db")
+    try:
+        assert reopened.latest_unfinished() == cid
+        assert reopened.message(cid) == "hi"
+        assert reopened.pending(cid) == NUMBERS[3:]
+        assert reopened.summary(cid) == {"queued": 2, "sending": 0, "sent": 1, "failed": 3}
+        # restarting the same campaign keeps its rows
+        reopened.start(cid, NUMBERS, "hi")
+        assert reopened.pending(cid) == NUMBERS[3:]
+        reopened.finish(cid)
+        assert reopened.latest_unfinished() is None
+    finally:
+        reopened.close()
+
+
+def test_fully_handled_campaign_is_not_resumed(journal):
+    cid = journal.start("c1", NUMBERS[:2])
+    journal.mark_sent(cid, NUMBERS[0])
+    journal.mark_failed(cid, NUMBERS[1], "not on WhatsApp", INVALID_NUMBER)
+    assert journal.pending(cid) == []
+    assert journal.latest_unfinished() is None
@@ -0,0 +1,173 @@
+"""campaign.notifier against an in-process debugging SMTP server.
+
+The server is aiosmtpd when installed, else the stdlib smtpd module
+(Python < 3.12); without either the tests are skipped.
+"""
+import socket
+import threading
+import time
+import warnings
+
+import pytest
+
+from campaign.notifier import Notifier
+
+WAIT = 10.0     # seconds a step may take before it counts as failed
+
+
+class _Mailbox:
+    """Messages and client connections seen by the debug server."""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+        self.reject = False
+        self.lock = threading.Lock()
+
+    def deliver(self, peer, data):
+        with self.lock:
+            self.peers.add(tuple(peer))
+            if self.reject:
+                return "554 rejected by test_notifier"
+            self.messages.append(data)
+            return None
+
+
+class _AiosmtpdServer:
+    def __init__(self, mailbox, port):
+        from aiosmtpd.controller import Controller
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope):
+                return mailbox.deliver(session.peer, envelope.content) or "250 OK"
+
+        self._controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+
+    def start(self):
+        self._controller.start()
+
+    def stop(self):
+        self._controller.stop()
+
+
+class _SmtpdServer:
+    def __init__(self, mailbox, port):
+        import asyncore
+        import smtpd
+
+        class Server(smtpd.SMTPServer):
+            def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+                return mailbox.deliver(peer, data)
+
+        self._asyncore = asyncore
+        self._make = lambda: Server(("127.0.0.1", port), None, decode_data=False)
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        self._make()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while self._running:
+            self._asyncore.loop(timeout=0.05, count=1)
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+        self._asyncore.close_all()     # listening socket and every open channel
+
+
+def _debug_server(mailbox, port):
+    try:
+        return _AiosmtpdServer(mailbox, port)
+    except ImportError:
+        pass
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            return _SmtpdServer(mailbox, port)
+        except ImportError:
+            pytest.skip("needs aiosmtpd or the stdlib smtpd module")
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(condition):
+    deadline = time.time() + WAIT
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def smtp():
+    """(mailbox, port, restart) for a running debug server."""
+    port = _free_port()
+    mailbox = _Mailbox()
+    servers = [_debug_server(mailbox, port)]
+    servers[0].start()
+
+    def restart():
+        servers[0].stop()
+        servers[0] = _debug_server(mailbox, port)
+        servers[0].start()
+
+    yield mailbox, port, restart
+    servers[0].stop()
+
+
+@pytest.fixture
+def notifier(smtp):
+    _, port, _ = smtp
+    errors = []
+    n = Notifier("", "", to="ops@example.com", host="127.0.0.1", port=port, starttls=False,
+                 report_every=2, on_error=errors.append)
+    n.errors = errors
+    yield n
+    n.close()
+
+
+def test_digests_share_one_connection(smtp, notifier):
+    mailbox, _, _ = smtp
+    notifier.start_campaign("check", 4)
+    for i, ok in enumerate((True, False, True, True)):
+        notifier.record(f"+2782000000{i}", ok, None if ok else "invalid number")
+    notifier.finish_campaign("done")
+    # two progress digests and the final one
+    assert _wait_for(lambda: len(mailbox.messages) == 3)
+    assert len(mailbox.peers) == 1
+    assert notifier.errors == []
+    assert notifier.emails_sent == 3
+
+
+def test_rejected_message_is_reported_not_retried(smtp, notifier):
+    mailbox, _, _ = smtp
+    mailbox.reject = True
+    notifier.notify("rejected", "the server refuses this one")
+    assert _wait_for(lambda: len(notifier.errors) == 1)
+    assert mailbox.messages == []
+    mailbox.reject = False
+    notifier.notify("after reject", "sent on a fresh connection")
+    assert _wait_for(lambda: len(mailbox.messages) == 1)
+    assert len(notifier.errors) == 1
+    assert notifier.emails_sent == 1
+
+
+def test_reconnects_after_server_restart(smtp, notifier):
+    mailbox, _, restart = smtp
+    notifier.notify("before restart", "opens the connection")
+    assert _wait_for(lambda: len(mailbox.messages) == 1)
+    restart()
+    notifier.notify("after restart", "server dropped the old connection")
+    assert _wait_for(lambda: len(mailbox.messages) == 2)
+    assert notifier.errors == []
+    assert notifier.emails_sent == 2
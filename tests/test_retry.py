@@ -0,0 +1,83 @@
+"""Failure classification, the retry queue and SendEngine's use of both."""
+import threading
+
+import pytest
+
+from campaign.retry import (BROWSER, CHAT_TIMEOUT, INVALID_NUMBER, NETWORK, NOT_SENT, UNKNOWN,
+                            RetryPolicy, RetryQueue, classify)
+from campaign.sender import SendEngine, SendError
+
+
+class TimeoutException(Exception):      # selenium's, by name
+    pass
+
+
+class WebDriverException(Exception):
+    pass
+
+
+@pytest.mark.parametrize("error, cause, transient", [
+    (SendError("Phone number shared via url is invalid", INVALID_NUMBER), INVALID_NUMBER, False),
+    (Exception("Number is not on WhatsApp"), INVALID_NUMBER, False),
+    (TimeoutException(), CHAT_TIMEOUT, True),
+    (SendError("message did not leave the compose box", NOT_SENT), NOT_SENT, True),
+    (ConnectionResetError(), NETWORK, True),
+    (Exception("Check your internet connection"), NETWORK, True),
+    (WebDriverException("chrome not reachable"), BROWSER, True),
+    (KeyError("render"), UNKNOWN, False),
+])
+def test_classify(error, cause, transient):
+    assert classify(error) == (cause, transient)
+
+
+def test_queue_retries_between_fresh_items():
+    q = RetryQueue(["a", "b"], RetryPolicy(max_attempts=2, base_delay=0, jitter=0))
+    assert q.get() == ("a", 1)
+    assert q.retry("a", 1) == 0
+    assert q.get() == ("a", 2)
+    assert q.retry("a", 2) is None      # attempts used up
+    assert q.get() == ("b", 1)
+    q.done("b")
+    assert q.get() is None
+
+
+class _Session:
+    def __init__(self, name, fail=()):
+        self.name = name
+        self.fail = dict(fail)
+
+    def send(self, number, text):
+        if self.fail.get(number):
+            self.fail[number] -= 1
+            raise SendError("chat did not open", CHAT_TIMEOUT)
+
+
+def _run(engine, numbers):
+    thread = threading.Thread(target=engine.run, args=(numbers, "hi"), daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "SendEngine.run() did not return"
+
+
+def test_engine_retries_transient_failures():
+    results, retries = [], []
+    engine = SendEngine([_Session("s1", {"+27820000001": 1})],
+                        retry=RetryPolicy(base_delay=0, jitter=0),
+                        on_result=lambda s, n, ok, err: results.append((n, ok)),
+                        on_retry=lambda s, n, err, attempt, delay: retries.append((n, attempt)))
+    _run(engine, ["+27820000000", "+27820000001"])
+    assert sorted(results) == [("+27820000000", True), ("+27820000001", True)]
+    assert retries == [("+27820000001", 1)]
+
+
+def test_engine_survives_raising_callbacks(capsys):
+    def boom(*args):
+        raise RuntimeError("window closed")
+
+    numbers = [f"+2782000000{i}" for i in range(6)]
+    engine = SendEngine([_Session("s1", {numbers[2]: 1}), _Session("s2")],
+                        retry=RetryPolicy(base_delay=0, jitter=0),
+                        on_start=boom, on_result=boom, on_retry=boom)
+    _run(engine, numbers)
+    assert sum(s["sent"] for s in engine.stats()) == len(numbers)
+    assert "window closed" in capsys.readouterr().err
@@ -0,0 +1,60 @@
+"""RateScheduler.eta() against the slots _reserve() actually hands out."""
+from datetime import datetime
+
+import pytest
+
+from campaign.scheduler import RateScheduler
+
+NOW = datetime(2026, 3, 2, 20, 40, 15).timestamp()     # a Monday evening
+
+
+def _simulate(scheduler, remaining, now):
+    """Seconds until the last of `remaining` sends, one session asking as soon as it may."""
+    at = now
+    for _ in range(remaining):
+        at = scheduler._reserve(at)
+    return at - now
+
+
+CONFIGS = {
+    "rate only": dict(per_minute=10),
+    "burst": dict(per_minute=6, burst=5),
+    "hourly cap": dict(per_minute=30, hourly_cap=40),
+    "daily cap": dict(per_minute=60, daily_cap=150),
+    "both caps": dict(per_minute=20, burst=3, hourly_cap=25, daily_cap=90),
+    "quiet hours": dict(per_minute=4, quiet_hours=(21, 7)),
+    "caps and quiet hours": dict(per_minute=12, burst=2, hourly_cap=50, daily_cap=200, quiet_hours=(22, 6)),
+    "start later": dict(per_minute=10, start_at=NOW + 5400, quiet_hours=(23, 5)),
+}
+
+
+@pytest.mark.parametrize("config", sorted(CONFIGS))
+@pytest.mark.parametrize("remaining", [1, 7, 60, 333])
+def test_eta_matches_reservations(config, remaining):
+    scheduler = RateScheduler(**CONFIGS[config])
+    eta = scheduler.eta(remaining, now=NOW)
+    assert eta == pytest.approx(_simulate(scheduler, remaining, NOW), abs=1e-6)
+
+
+@pytest.mark.parametrize("config", sorted(CONFIGS))
+def test_eta_after_sends_were_booked(config):
+    # other sessions already reserved slots: eta() must count them against the caps and bucket
+    scheduler = RateScheduler(**CONFIGS[config])
+    booked = NOW
+    for _ in range(45):
+        booked = scheduler._reserve(NOW)
+    eta = scheduler.eta(100, now=NOW)
+    assert eta == pytest.approx(_simulate(scheduler, 100, NOW), abs=1e-6)
+    assert eta >= booked - NOW
+
+
+def test_eta_does_not_reserve():
+    scheduler = RateScheduler(per_minute=10, hourly_cap=5)
+    scheduler.eta(500, now=NOW)
+    assert scheduler._hour_counts == {} and scheduler._day_counts == {}
+    assert scheduler.eta(0, now=NOW) == 0.0
+
+
+def test_jitter_adds_half_its_range():
+    plain = RateScheduler(per_minute=10).eta(20, now=NOW)
+    assert RateScheduler(per_minute=10, jitter=4).eta(20, now=NOW) == pytest.approx(plain + 2)
@@ -0,0 +1,42 @@
+"""Message templates: fields, fallbacks, escapes and static messages."""
+from campaign.templates import FieldTable, Template
+
+NUMBER = "+27821234567"
+
+
+def _table():
+    table = FieldTable()
+    table.add_records(["name", "institution"], [(NUMBER, ("Thandi", "UJ")), ("+27831234567", ("", "Wits"))],
+                      lambda raw: raw)
+    return table
+
+
+def test_fields_and_fallbacks():
+    render = Template("Hi {name|there}, your {Institution} application ({phone})").bind(_table())
+    assert render(NUMBER) == "Hi Thandi, your UJ application (+27821234567)"
+    assert render("+27831234567") == "Hi there, your Wits application (+27831234567)"
+    assert render("+27841234567") == "Hi there, your  application (+27841234567)"
+
+
+def test_unknown_fields_are_sent_as_written():
+    template = Template("Hi {nmae}, {{code}}")
+    assert template.bind(_table())(NUMBER) == "Hi {nmae}, {code}"
+    assert template.unknown_fields(_table()) == ["nmae"]
+    assert "{nmae}" in template.unknown_warning(_table())
+
+
+def test_static_message_is_verbatim():
+    text = "Use {{code}} or }} as is"
+    assert Template(text).is_static
+    assert Template(text).bind(_table())(NUMBER) == text
+
+
+def test_blanks_counts_missing_values():
+    template = Template("Hi {name}, {institution|your school}")
+    assert template.blanks(_table(), [NUMBER, "+27831234567", "+27841234567"]) == {"name": 2}
+
+
+def test_later_import_replaces_values():
+    table = _table()
+    table.add_records(["name"], [(NUMBER, ("Thandiwe",))], lambda raw: raw)
+    assert Template("{name} at {institution}").bind(table)(NUMBER) == "Thandiwe at UJ"
@@ -0,0 +1,71 @@
+"""Streaming tokenizer: chunked reads give the same tokens as one pass."""
+import io
+import random
+
+import pytest
+
+from campaign.tokenizer import iter_numbers, iter_tokens, tokenize
+
+SEED = 7
+
+
+def _dump(rng, count=2000):
+    """A participant dump as copied from WhatsApp Web: numbers, names, markup, markers."""
+    parts = []
+    for _ in range(count):
+        n = f"+27 {rng.choice((60, 63, 71, 72, 73, 76, 79, 82, 83))} {rng.randrange(1000):03d} {rng.randrange(10000):04d}"
+        roll = rng.random()
+        if roll < 0.05:
+            parts.append(f'{rng.randrange(1, 999)} more" class="x1iyjqo2 x6ikm8r _ao3e" style="min-height: 0px;">')
+        elif roll < 0.10:
+            parts.append(rng.choice(("Amahle", "Cebo", "Luyanda", "ProItech", "Office 2")))
+        elif roll < 0.13:
+            parts[-1:] = [(parts[-1] if parts else "") + n]    # glued: "...2279+27 65..."
+            continue
+        elif roll < 0.16:
+            n = f"0{rng.randrange(60, 85)} {rng.randrange(1000):03d} {rng.randrange(10000):04d}"
+        elif roll < 0.18:
+            n = f"0{rng.randrange(10 ** 9):09d} 0{rng.randrange(10 ** 9):09d}"     # two numbers, one space
+        parts.append(n)
+    return ", ".join(parts)
+
+
+@pytest.fixture(scope="module")
+def dump():
+    return _dump(random.Random(SEED))
+
+
+@pytest.mark.parametrize("chunk_size", [512, 513, 777, 4096, 1 << 16])
+def test_streaming_matches_one_shot(dump, chunk_size):
+    assert list(iter_tokens(io.StringIO(dump), chunk_size)) == tokenize(dump)
+
+
+def test_string_source_matches_one_shot(dump):
+    assert list(iter_tokens(dump)) == tokenize(dump)
+
+
+def test_markup_and_markers_are_skipped():
+    text = ('+27 79 361 2279, +27 69 345 8439, 435 more" class="x1iyjqo2 x6ikm8r">Amahle, '
+            'Cebo, +27 65 900 7273+27 68 022 4804')
+    assert tokenize(text) == ["+27 79 361 2279", "+27 69 345 8439", "+27 65 900 7273", "+27 68 022 4804"]
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("0721234567 0821234567", ["0721234567", "0821234567"]),
+    ("072 123 4567 082 123 4567", ["072 123 4567", "082 123 4567"]),
+    ("+27 72 123 4567 +27 82 123 4567", ["+27 72 123 4567", "+27 82 123 4567"]),
+])
+def test_space_joined_numbers_are_split(text, tokens):
+    assert tokenize(text) == tokens
+
+
+def test_unsplittable_run_is_kept_for_removed():
+    # too long for one number and no separator to split at: the caller reports it
+    assert len(tokenize("call 0821234567082123")) == 1
+
+
+def test_iter_numbers_dedupes_and_reports_invalid():
+    invalid = []
+    text = "+27 82 123 4567, 082 123 4567, 0821234567 0831234567, 1234567"
+    assert list(iter_numbers(text, on_invalid=invalid.append)) == ["+27821234567", "+27831234567"]
+    assert invalid
@@ -2,124 +2,72 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
-import threading, time, re, smtplib
-import pandas as pd
-import pywhatkit as kit
-import pyautogui
-import phonenumbers
-from docx import Document
-from PyPDF2 import PdfReader
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import threading, time, os
+from itertools import chain
+
+from campaign.cleaner import NumberCleaner, shared_cleaner
+from campaign.ingest import SPREADSHEET_TYPES, iter_candidates, read_records
+from campaign.journal import SENT, SendJournal, campaign_id
+from campaign.retry import RetryPolicy, classify
+from campaign.scheduler import RateScheduler, format_duration, next_occurrence
+from campaign.sender import SendEngine, open_sessions
+from campaign.templates import FieldTable, Template
+from campaign.tokenizer import tokenize
+from campaign.logtail import LogTail
+from campaign.messages import load_message_async
+from campaign.notifier import Notifier
+from campaign.sendlog import RECENT_DAYS, SendLogIndex
+from campaign.suppression import shared_suppression
+from campaign.uibus import UIBus
+from campaign.widgets import VirtualList
 
 # ---------- CONFIG ----------
 APP_TITLE = "ProItech Campaign Sender — Pro"
 DEFAULT_DELAY = 6
+# Multi-core cleaning (used when the "Multi-core clean" box is ticked)
+CLEAN_WORKERS = os.cpu_count() or 1
+CLEAN_CHUNK_SIZE = 5000
+# Parallel WhatsApp Web sessions for immediate sends (each needs its own logged-in profile)
+SEND_SESSIONS = 1
+# Pacing: the Delay field sets the sustained rate; these shape it
+RATE_BURST = 1            # sends allowed back to back
+RATE_JITTER = 2.0         # random extra delay per send, seconds
+HOURLY_CAP = None         # max sends per clock hour (None = no cap)
+DAILY_CAP = None          # max sends per day (None = no cap)
+QUIET_HOURS = None        # e.g. (21, 7) = no sends between 21:00 and 07:00
+ETA_REFRESH = 2.0         # seconds between ETA recalculations
+DASHBOARD_REFRESH_MS = 5000   # live send-log stats refresh
+UI_FPS = 20                   # worker -> GUI updates applied per second
+LOG_MAX_LINES = 5000          # activity log keeps only the newest lines
+PREVIEW_CHARS = 900           # message preview length
+PREVIEW_DEBOUNCE_MS = 250     # quiet time after the last edit before the preview re-renders
+# Number list colors per appearance mode (plain Tk widgets do not follow the CTk theme)
+LIST_COLORS = {
+    "dark": {"bg": "#1d1e1e", "fg": "#dce4ee", "insertbackground": "#dce4ee"},
+    "light": {"bg": "#f9f9fa", "fg": "#1a1a1a", "insertbackground": "#1a1a1a"},
+}
+LIST_STYLE = {"highlightthickness": 0, "bd": 0}
 # Email placeholder (replace with your Gmail and app password)
 GMAIL_USER = "your_email@gmail.com"
 GMAIL_APP_PASS = "your_app_password"
+# Progress/failure digests by email; for a local debug server use "localhost", 8025, False
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+SMTP_STARTTLS = True
+REPORT_EVERY = 100            # sends per progress email
+# Transient send failures (timeouts, browser hiccups) are retried with exponential backoff
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 30         # seconds before the first retry, doubled each time
+# Audience builder steps, applied top to bottom: union / intersection / difference
+AUDIENCE_OPS = ("Include", "Keep only", "Exclude")
+AUDIENCE_FILE = ".nset"       # saved audiences (compact binary number sets)
 # Theme colors (Green & Black ProItech)
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("green")
 
-# ---------- Utilities ----------
-def extract_numbers_from_text(text):
-    matches = re.findall(r"(\+?\d[\d\s\-\(\)]{6,20}\d)", text)
-    if not matches:
-        matches = re.findall(r"\d{6,15}", text)
-    return [m.strip() for m in matches]
-
-def normalize_and_validate(numbers_list, default_region="ZA"):
-    valid = []
-    removed = []
-    for raw in numbers_list:
-        s = str(raw).strip()
-        if not s:
-            continue
-        s = s.replace("\u200b", "")
-        try:
-            if s.startswith("+"):
-                parsed = phonenumbers.parse(s, None)
-            else:
-                parsed = phonenumbers.parse(s, default_region)
-            if phonenumbers.is_valid_number(parsed):
-                e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                if e164 not in valid:
-                    valid.append(e164)
-            else:
-                removed.append(s)
-        except Exception:
-            digits = re.sub(r"\D", "", s)
-            if len(digits) >= 9 and digits.startswith("0"):
-                try:
-                    parsed = phonenumbers.parse(digits, "ZA")
-                    if phonenumbers.is_valid_number(parsed):
-                        e164 = phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
-                        if e164 not in valid:
-                            valid.append(e164)
-                        continue
-                except Exception:
-                    pass
-            removed.append(s)
-    return valid, removed
-
-def read_numbers_file(path):
-    rows = []
-    pl = path.lower()
-    if pl.endswith((".xlsx", ".xls")):
-        df = pd.read_excel(path, header=None, dtype=str)
-        for _, r in df.iterrows():
-            for v in r.tolist():
-                if v is not None and str(v).strip() and str(v) != 'nan':
-                    rows.append(str(v).strip())
-    elif pl.endswith(".csv"):
-        df = pd.read_csv(path, header=None, dtype=str)
-        for _, r in df.iterrows():
-            for v in r.tolist():
-                if v is not None and str(v).strip() and str(v) != 'nan':
-                    rows.append(str(v).strip())
-    elif pl.endswith(".txt"):
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.strip():
-                    rows.append(line.strip())
-    return rows
-
-def read_message_file(path):
-    pl = path.lower()
-    if pl.endswith(".txt"):
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    if pl.endswith(".docx"):
-        doc = Document(path)
-        return "\n".join([p.text for p in doc.paragraphs])
-    if pl.endswith(".pdf"):
-        rd = PdfReader(path)
-        txt = []
-        for pg in rd.pages:
-            t = pg.extract_text()
-            if t:
-                txt.append(t)
-        return "\n".join(txt)
-    return ""
-
-def send_completion_email(to_email, subject, body):
-    if not GMAIL_USER or not GMAIL_APP_PASS:
-        return False, "No Gmail credentials configured."
-    try:
-        msg = MIMEMultipart()
-        msg['From'] = GMAIL_USER
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'plain'))
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(GMAIL_USER, GMAIL_APP_PASS)
-        server.sendmail(GMAIL_USER, to_email, msg.as_string())
-        server.quit()
-        return True, "Email sent"
-    except Exception as e:
-        return False, str(e)
+def _list_colors():
+    return LIST_COLORS["light" if ctk.get_appearance_mode().lower() == "light" else "dark"]
+
 
 # ---------- App ----------
 class CampaignApp(ctk.CTk):
@@ -131,10 +79,38 @@ class CampaignApp(ctk.CTk):
 
         self.valid_numbers = []
         self.removed_numbers = []
+        self.fields = FieldTable()   # extra spreadsheet columns for {placeholders}
         self.sending = False
+        self.cleaning = False
+        self.send_sessions = []
+        self.journal = None
+        self.notifier = None
+        self.sendlog = None
+        self.log_tail = LogTail()
+        self.failures = 0
+        self.failure_summary = ""
+        self._tail_busy = False
+        self._eta_at = 0.0
+        self._preview_job = None
+        self._last_preview = None
+        self._audience_win = None
+        self.audience_steps = []     # [(op, label, NumberSet)] for the audience builder
+        # numbers that replied STOP (see AUTO_REPLY_MESSAGE.py) are never cleaned in or sent to
+        self.suppression = shared_suppression()
+        self.parallel_cleaner = NumberCleaner(workers=CLEAN_WORKERS, chunk_size=CLEAN_CHUNK_SIZE,
+                                              suppression=self.suppression)
 
         self._build_ui()
-        self.after(300, self._live_preview_loop)
+        # worker threads post here; the Tk thread applies it UI_FPS times a second
+        self.ui = (UIBus(self, fps=UI_FPS)
+                   .on_log(self._write_log)
+                   .on("progress", self.progress.set)
+                   .on("eta", lambda text: self.eta_label.configure(text=text))
+                   .on("preview", self._show_preview)
+                   .start())
+        # preview follows message edits (debounced) instead of polling
+        self.msg_text.bind("<<Modified>>", self._on_message_modified)
+        self.after(1000, self._dashboard_loop)
 
     def _build_ui(self):
         # Header
@@ -178,7 +154,16 @@ class CampaignApp(ctk.CTk):
         nums_btns.pack(fill="x", padx=8, pady=(0,8))
         ctk.CTkButton(nums_btns, text="📂 Import Numbers", command=self._import_numbers, width=180).pack(side="left", padx=(0,8))
         ctk.CTkButton(nums_btns, text="🧹 Clean Numbers", command=self._clean_numbers, width=140).pack(side="left", padx=(0,8))
-        ctk.CTkButton(nums_btns, text="🔁 Re-clean", command=self._reclean, width=110).pack(side="left")
+        ctk.CTkButton(nums_btns, text="🔁 Re-clean", command=self._reclean, width=110).pack(side="left", padx=(0,8))
+        ctk.CTkButton(nums_btns, text="🎯 Audience", command=self._open_audience_builder, width=110).pack(side="left")
+        self.parallel_clean = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(nums_btns, text=f"Multi-core clean ({CLEAN_WORKERS})", variable=self.parallel_clean).pack(side="left", padx=(8,0))
+        self.skip_recent = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(nums_btns, text="Skip contacted in last", variable=self.skip_recent).pack(side="left", padx=(8,4))
+        self.recent_days = ctk.CTkEntry(nums_btns, width=45)
+        self.recent_days.insert(0, str(RECENT_DAYS))
+        self.recent_days.pack(side="left")
+        ctk.CTkLabel(nums_btns, text="days").pack(side="left", padx=(4,0))
 
         counts_frame = ctk.CTkFrame(nums_card, fg_color="transparent")
         counts_frame.pack(fill="x", padx=8, pady=(0,6))
@@ -198,13 +183,13 @@ class CampaignApp(ctk.CTk):
         c_frame = ctk.CTkFrame(lists_frame)
         c_frame.grid(row=0, column=0, sticky="nsew", padx=(6,3), pady=6)
         ctk.CTkLabel(c_frame, text="✅ Cleaned Numbers").pack(anchor="w", padx=6, pady=(6,2))
-        self.tree_clean = ctk.CTkTextbox(c_frame, width=10, height=200)
+        self.tree_clean = VirtualList(c_frame, height=12, **_list_colors(), **LIST_STYLE)
         self.tree_clean.pack(fill="both", expand=True, padx=6, pady=(0,6))
         # removed list
         r_frame = ctk.CTkFrame(lists_frame)
         r_frame.grid(row=0, column=1, sticky="nsew", padx=(3,6), pady=6)
         ctk.CTkLabel(r_frame, text="❌ Removed / Invalid").pack(anchor="w", padx=6, pady=(6,2))
-        self.tree_removed = ctk.CTkTextbox(r_frame, width=10, height=200)
+        self.tree_removed = VirtualList(r_frame, height=12, **_list_colors(), **LIST_STYLE)
         self.tree_removed.pack(fill="both", expand=True, padx=6, pady=(0,6))
 
         # --- Message card (above Activity Log as requested) ---
@@ -250,6 +235,7 @@ class CampaignApp(ctk.CTk):
         send_btn_frame.pack(fill="x", padx=8, pady=(6,6))
         self.send_btn = ctk.CTkButton(send_btn_frame, text="🚀 SEND MESSAGES", width=300, height=48, command=self._confirm_and_send)
         self.send_btn.pack(anchor="center")
+        ctk.CTkButton(send_btn_frame, text="⏯ Resume last campaign", width=200, command=self._resume_campaign).pack(anchor="center", pady=(6,0))
 
         # Progress + ETA
         prog_frame = ctk.CTkFrame(send_card, fg_color="transparent")
@@ -277,6 +263,19 @@ class CampaignApp(ctk.CTk):
         self.stat_removed = ctk.CTkLabel(stats_frame, text="Removed: 0")
         self.stat_removed.pack(side="left", padx=(0,6))
 
+        # Live send stats (from PyWhatKit_DB.txt + this session's failures)
+        dash = ctk.CTkFrame(right_inner, corner_radius=6)
+        dash.pack(fill="x", padx=8, pady=(10,0))
+        ctk.CTkLabel(dash, text="📊 Live send stats", font=("Roboto", 12, "bold")).grid(row=0, column=0, columnspan=2, sticky="w", padx=8, pady=(6,2))
+        self.dash_rate = ctk.CTkLabel(dash, text="Sends/min: 0")
+        self.dash_rate.grid(row=1, column=0, sticky="w", padx=8)
+        self.dash_total = ctk.CTkLabel(dash, text="Sends: 0")
+        self.dash_total.grid(row=1, column=1, sticky="w", padx=8)
+        self.dash_failed = ctk.CTkLabel(dash, text="Failures: 0")
+        self.dash_failed.grid(row=2, column=0, sticky="w", padx=8, pady=(0,6))
+        self.dash_repeat = ctk.CTkLabel(dash, text="Repeated recipients: 0")
+        self.dash_repeat.grid(row=2, column=1, sticky="w", padx=8, pady=(0,6))
+
         # Collapsible Activity Log
         log_header = ctk.CTkFrame(right_inner, fg_color="transparent")
         log_header.pack(fill="x", padx=8, pady=(12,0))
@@ -293,54 +292,343 @@ class CampaignApp(ctk.CTk):
 
     # ---------- Actions ----------
     def _toggle_theme(self):
-        current = ctk.get_appearance_mode()
+        current = ctk.get_appearance_mode().lower()
         ctk.set_appearance_mode("light" if current == "dark" else "dark")
+        lists = [self.tree_clean, self.tree_removed]
+        if self._audience_win is not None and self._audience_win.winfo_exists():
+            lists.append(self.audience_list)
+        for lst in lists:
+            lst.set_colors(**_list_colors())
 
     def _show_help(self):
-        messagebox.showinfo("Help", "1. Paste/import numbers -> 2. Clean -> 3. Type/import message -> 4. Send.\nKeep WhatsApp Web logged in. Use delay >=4s for safer sending.")
+        messagebox.showinfo("Help", "1. Paste/import numbers -> 2. Clean -> 3. Type/import message -> 4. Send.\nKeep WhatsApp Web logged in. Use delay >=4s for safer sending.\nPersonalise with {column} placeholders from the imported spreadsheet's header row, e.g. Hi {name|there}.\nAudience builds one list from several: include, keep only or exclude each imported list, then save it as .nset for instant reload.")
 
     def _import_numbers(self):
-        path = filedialog.askopenfilename(filetypes=[("Number files","*.xlsx *.xls *.csv *.txt")])
+        path = filedialog.askopenfilename(filetypes=[("Number files",f"*.xlsx *.xls *.csv *.txt *{AUDIENCE_FILE}")])
         if not path:
             return
-        rows = read_numbers_file(path)
-        if rows:
-            cur = self.numbers_text.get("1.0", "end").strip()
-            to_add = "\n".join(rows)
-            if cur:
-                self.numbers_text.insert("end", "\n" + to_add)
-            else:
-                self.numbers_text.insert("end", to_add)
-            self._log(f"Imported {len(rows)} rows from file.")
-        else:
-            self._log("No rows found in file.")
+        if path.lower().endswith(AUDIENCE_FILE):
+            self._import_audience(path)
+            return
+        if self.cleaning:
+            self._log("Still cleaning; import again when it finishes.")
+            return
+        self.cleaning = True
+        current = list(self.valid_numbers)
+        self._log(f"Importing {os.path.basename(path)}...")
+
+        def work():
+            # stream the file straight into the cleaner, merged with what is already cleaned
+            seen = [0]
+
+            def counted():
+                for c in iter_candidates(path):
+                    seen[0] += 1
+                    yield c
+
+            try:
+                result = shared_cleaner().clean(chain(current, counted()))
+            except Exception as e:
+                self.ui.call(self._finish_import, path, None, 0, 0)
+                self.ui.call(messagebox.showerror, "Import error", f"Failed to load numbers: {e}")
+                return
+            if seen[0] and path.lower().endswith(SPREADSHEET_TYPES):
+                fields = self._read_fields(path)
+                if fields:
+                    self.ui.call(self._apply_fields, *fields)
+            self.ui.call(self._finish_import, path, result, seen[0], len(current))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _finish_import(self, path, result, seen, before):
+        if result is None or not seen:
+            self.cleaning = False
+            if result is not None:
+                self._log("No rows found in file.")
+            return
+
+        def show(valid, recent):
+            self.cleaning = False
+            self._populate_number_views(valid, self.removed_numbers + result.removed + recent)
+            self._log(f"Imported {seen} candidates from {os.path.basename(path)}: {len(result.valid) - before} new valid • "
+                      f"{len(result.removed)} removed ({result.suppressed} opted out) • {result.duplicates} duplicates collapsed.")
+
+        self._filter_recent(result.valid, show)
+
+    def _read_fields(self, path):
+        """(fields, [(number, values)]) from a spreadsheet, or None; runs on the import worker."""
+        try:
+            fields, records = read_records(path)
+            lookup = shared_cleaner().lookup
+            rows = [(n, values) for n, values in ((lookup(raw), values) for raw, values in records) if n]
+        except Exception as e:
+            self._log(f"[ERR] Could not read template fields -> {e}", level="err")
+            return None
+        return (fields, rows) if fields else None
+
+    def _apply_fields(self, fields, rows):
+        # Tk thread, like every other use of self.fields
+        added = self.fields.add_records(fields, rows, lambda number: number)
+        if added:
+            names = ", ".join("{" + c + "}" for c in self.fields.columns)
+            self._log(f"Template fields for {added} numbers: {names}")
+
+    def _prepare_message(self, message, numbers):
+        """(render, note) for the message template; the note lists fields without data."""
+        template = Template(message)
+        render = template.bind(self.fields)
+        blanks = template.blanks(self.fields, numbers) if template.fields else {}
+        note = "".join(f"\n{n} recipients have no {{{f}}} value" for f, n in blanks.items())
+        warning = template.unknown_warning(self.fields)
+        if warning:
+            note += "\n" + warning
+        return render, note
 
     def _clean_numbers(self):
         raw = self.numbers_text.get("1.0", "end")
-        candidates = extract_numbers_from_text(raw)
+        candidates = tokenize(raw)
         if not candidates:
             messagebox.showwarning("No numbers", "Please paste, type, or import numbers first.")
             return
-        valid, removed = normalize_and_validate(candidates)
-        self._populate_number_views(valid, removed)
-        self._log(f"Cleaned: {len(valid)} valid • {len(removed)} removed.")
+        self._run_clean(candidates, "Cleaned")
 
     def _reclean(self):
-        current = self.tree_clean.get("1.0", "end").strip().splitlines()
-        current = [c.strip() for c in current if c.strip()]
+        current = list(self.valid_numbers)
         if not current:
             messagebox.showwarning("Nothing to re-clean", "Clean list is empty.")
             return
-        valid, removed = normalize_and_validate(current)
-        self._populate_number_views(valid, removed)
-        self._log("Re-clean completed.")
+        self._run_clean(current, "Re-clean completed")
+
+    def _run_clean(self, candidates, label):
+        if self.cleaning:
+            return
+        if not self.parallel_clean.get():
+            result = shared_cleaner().clean(candidates)
+            self._finish_clean(result, label)
+            return
+        self.cleaning = True
+        self._log(f"Cleaning {len(candidates)} entries on {CLEAN_WORKERS} cores...")
+
+        def work():
+            try:
+                result = self.parallel_cleaner.clean(candidates)
+            except Exception as e:
+                err = str(e)
+                self._log(f"[ERR] Multi-core clean failed -> {err}", level="err")
+                result = None
+            self.ui.call(self._finish_clean, result, label)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _finish_clean(self, result, label):
+        if result is None:
+            self.cleaning = False
+            return
+        self.cleaning = True
+
+        def show(valid, recent):
+            self.cleaning = False
+            self._populate_number_views(valid, result.removed + recent)
+            self._log(f"{label}: {len(result.valid)} valid • {len(result.removed)} removed ({result.suppressed} opted out) • "
+                      f"{result.duplicates} duplicates collapsed.")
+
+        self._filter_recent(result.valid, show)
+
+    def _drop_opted_out(self, valid):
+        """For lists that skip the cleaner (saved audiences): remove opted-out numbers."""
+        keep, dropped = self.suppression.exclude(valid)
+        if dropped:
+            self._log(f"Skipped {len(dropped)} numbers that opted out.")
+        return keep, [f"{n} (opted out)" for n in dropped]
+
+    def _filter_recent(self, valid, then):
+        """Drop numbers sent to within the chosen window (if enabled): pywhatkit log and send journal.
+
+        then(keep, dropped) runs on the Tk thread; the log is indexed on a worker
+        thread, as a large PyWhatKit_DB.txt takes a while the first time.
+        """
+        if not self.skip_recent.get():
+            then(valid, [])
+            return
+        try:
+            days = int(self.recent_days.get())
+        except ValueError:
+            days = RECENT_DAYS
+        if self.sendlog is None:
+            self.sendlog = SendLogIndex()
+        sendlog = self.sendlog
+
+        def work():
+            try:
+                added = sendlog.ingest()
+                keep, dropped = sendlog.exclude_recent(valid, days)
+            except Exception as e:
+                self._log(f"[ERR] Send log check failed -> {e}", level="err")
+                added, keep, dropped = 0, valid, []
+            if added:
+                self._log(f"Send log: indexed {added} new entries.")
+            if dropped:
+                self._log(f"Skipped {len(dropped)} numbers contacted in the last {days} days.")
+            self.ui.call(then, keep, [f"{n} (contacted in last {days}d)" for n in dropped])
+
+        threading.Thread(target=work, daemon=True).start()
+
+    # ---------- audiences (numpy-backed number sets, imported on first use) ----------
+    def _import_audience(self, path):
+        from campaign.numberset import NumberSet
+        try:
+            loaded = NumberSet.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Import error", f"Failed to load audience: {e}")
+            return
+        # saved audiences are already clean: merge without re-parsing; the current
+        # list keeps its order and the new numbers follow it
+        current = self.valid_numbers
+        added = (loaded - NumberSet(current)).to_list() if current else loaded.to_list()
+        valid, opted_out = self._drop_opted_out(current + added)
+
+        def show(valid, recent):
+            self._populate_number_views(valid, self.removed_numbers + opted_out + recent)
+            self._log(f"Loaded audience {os.path.basename(path)}: {len(loaded)} numbers ({len(valid)} in list).")
+
+        self._filter_recent(valid, show)
+
+    def _open_audience_builder(self):
+        if self._audience_win is not None and self._audience_win.winfo_exists():
+            self._audience_win.focus()
+            return
+        win = self._audience_win = ctk.CTkToplevel(self)
+        win.title("Audience builder")
+        win.geometry("560x440")
+        ctk.CTkLabel(win, text="Each list is applied in order: Include adds its numbers, Keep only drops "
+                               "numbers not in it, Exclude removes its numbers.",
+                     wraplength=520, justify="left").pack(anchor="w", padx=12, pady=(12,6))
+        top = ctk.CTkFrame(win, fg_color="transparent")
+        top.pack(fill="x", padx=12, pady=(0,6))
+        self.audience_op = ctk.StringVar(value=AUDIENCE_OPS[0])
+        ctk.CTkSegmentedButton(top, values=list(AUDIENCE_OPS), variable=self.audience_op).pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="📂 Add list", width=100, command=self._audience_add_file).pack(side="left", padx=(0,8))
+        ctk.CTkButton(top, text="Current clean list", width=130, command=self._audience_add_current).pack(side="left")
+        self.audience_list = VirtualList(win, height=10, searchable=False, **_list_colors(), **LIST_STYLE)
+        self.audience_list.pack(fill="both", expand=True, padx=12, pady=(0,6))
+        bottom = ctk.CTkFrame(win, fg_color="transparent")
+        bottom.pack(fill="x", padx=12, pady=(0,12))
+        self.audience_total = ctk.CTkLabel(bottom, text="Audience: 0")
+        self.audience_total.pack(side="left")
+        ctk.CTkButton(bottom, text="✅ Use as clean list", width=140, command=self._audience_apply).pack(side="right")
+        ctk.CTkButton(bottom, text="💾 Save", width=70, command=self._audience_save).pack(side="right", padx=(0,8))
+        ctk.CTkButton(bottom, text="Clear", width=60, command=self._audience_clear).pack(side="right", padx=(0,8))
+        ctk.CTkButton(bottom, text="↶ Undo", width=60, command=self._audience_undo).pack(side="right", padx=(0,8))
+        self._audience_refresh()
+
+    def _audience_add_file(self):
+        path = filedialog.askopenfilename(filetypes=[("Number files",f"*.xlsx *.xls *.csv *.txt *{AUDIENCE_FILE}")])
+        if not path:
+            return
+        op = self.audience_op.get()
+        self._log(f"Audience: loading {os.path.basename(path)}...")
+
+        def work():
+            from campaign.numberset import NumberSet
+            try:
+                if path.lower().endswith(AUDIENCE_FILE):
+                    numbers = NumberSet.load(path)
+                else:
+                    numbers = NumberSet(shared_cleaner().clean(iter_candidates(path)).valid)
+            except Exception as e:
+                self._log(f"[ERR] Audience: could not load {os.path.basename(path)} -> {e}", level="err")
+                return
+            self.ui.call(self._audience_add, op, os.path.basename(path), numbers)
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _audience_add_current(self):
+        if not self.valid_numbers:
+            messagebox.showwarning("Nothing to add", "Clean list is empty.")
+            return
+        from campaign.numberset import NumberSet
+        self._audience_add(self.audience_op.get(), "current clean list", NumberSet(self.valid_numbers))
+
+    def _audience_add(self, op, label, numbers):
+        self.audience_steps.append((op, label, numbers))
+        self._audience_refresh()
+
+    def _audience_undo(self):
+        if self.audience_steps:
+            self.audience_steps.pop()
+            self._audience_refresh()
+
+    def _audience_clear(self):
+        self.audience_steps = []
+        self._audience_refresh()
+
+    def _audience(self):
+        from campaign.numberset import NumberSet
+        result = NumberSet()
+        for op, _, numbers in self.audience_steps:
+            if op == "Include":
+                result = result | numbers
+            elif op == "Keep only":
+                result = result & numbers
+            else:
+                result = result - numbers
+        return result
+
+    def _audience_refresh(self):
+        audience = self._audience()
+        if self._audience_win is not None and self._audience_win.winfo_exists():
+            self.audience_list.set_items([f"{i}. {op}: {label} ({len(numbers)})"
+                                          for i, (op, label, numbers) in enumerate(self.audience_steps, 1)])
+            self.audience_total.configure(text=f"Audience: {len(audience)}")
+        return audience
+
+    def _audience_save(self):
+        audience = self._audience()
+        if not audience:
+            messagebox.showwarning("Empty audience", "Add at least one list first.")
+            return
+        path = filedialog.asksaveasfilename(defaultextension=AUDIENCE_FILE,
+                                            filetypes=[("Audience", f"*{AUDIENCE_FILE}")])
+        if not path:
+            return
+        try:
+            audience.save(path)
+        except OSError as e:
+            messagebox.showerror("Save error", f"Could not save audience: {e}")
+            return
+        self._log(f"Audience saved: {len(audience)} numbers -> {os.path.basename(path)}")
+
+    def _audience_apply(self):
+        from campaign.numberset import NumberSet
+        audience = self._audience()
+        if not audience:
+            messagebox.showwarning("Empty audience", "The audience has no numbers; the clean list was left as it is.")
+            return
+        # numbers already in the clean list keep their order, the rest follow
+        kept, dropped = audience.partition(self.valid_numbers)
+        ordered = kept + (audience - NumberSet(kept)).to_list()
+        valid, opted_out = self._drop_opted_out(ordered)
+        left_out = [f"{n} (not in audience)" for n in dropped]
+        steps = " → ".join(f"{op} {label}" for op, label, _ in self.audience_steps) or "empty"
+
+        def show(valid, recent):
+            self._populate_number_views(valid, self.removed_numbers + left_out + opted_out + recent)
+            self._log(f"Audience applied: {len(valid)} numbers ({steps}).")
+
+        self._filter_recent(valid, show)
 
     def _import_message(self):
         path = filedialog.askopenfilename(filetypes=[("Message files","*.txt *.docx *.pdf")])
         if not path:
             return
-        text = read_message_file(path)
-        if text:
+        # docx/pdf parsing runs off the Tk thread (and is cached on disk)
+        self._log(f"Importing message from {os.path.basename(path)}...")
+        load_message_async(path, lambda text, err: self.ui.call(self._message_loaded, text, err))
+
+    def _message_loaded(self, text, err):
+        if err is not None:
+            messagebox.showerror("Import error", f"Failed to load message: {err}")
+        elif text:
             self.msg_text.delete("1.0", "end")
             self.msg_text.insert("1.0", text)
             self._log("Message imported.")
@@ -348,23 +636,17 @@ class CampaignApp(ctk.CTk):
             messagebox.showwarning("Empty", "No text extracted from file.")
 
     def _preview_message(self):
-        txt = self.msg_text.get("1.0", "end").strip()
-        if not txt:
+        preview = self._message_preview()
+        if not preview:
             messagebox.showwarning("No message", "Type or import a message first.")
             return
-        preview = txt if len(txt) < 900 else txt[:900] + "\n\n...[truncated]"
-        self.preview_box.delete("1.0", "end")
-        self.preview_box.insert("1.0", preview)
+        self._show_preview(preview)
         self._log("Message preview updated.")
 
     def _populate_number_views(self, valid, removed):
-        # populate two textboxes
-        self.tree_clean.delete("1.0", "end")
-        self.tree_removed.delete("1.0", "end")
-        for n in valid:
-            self.tree_clean.insert("end", n + "\n")
-        for r in removed:
-            self.tree_removed.insert("end", r + "\n")
+        # one bulk update each; the lists only render the rows in view
+        self.tree_clean.set_items(valid)
+        self.tree_removed.set_items(removed)
         self.valid_numbers = valid
         self.removed_numbers = removed
         tot = len(valid) + len(removed)
@@ -374,8 +656,7 @@ class CampaignApp(ctk.CTk):
         self.stat_valid.configure(text=f"Valid: {len(valid)}")
         self.stat_removed.configure(text=f"Removed: {len(removed)}")
         preview_list = "\n".join(valid[:80]) if valid else "No valid numbers yet."
-        self.preview_box.delete("1.0", "end")
-        self.preview_box.insert("1.0", "Preview (first entries):\n" + preview_list)
+        self._show_preview("Preview (first entries):\n" + preview_list)
 
     def _toggle_log(self):
         if self.log_visible:
@@ -402,6 +683,7 @@ class CampaignApp(ctk.CTk):
             messagebox.showerror("Delay error", "Invalid delay value.")
             return
         mode = self.send_mode.get()
+        start_at = None
         if mode == "schedule":
             try:
                 hh = int(self.hour_spin.get()) % 24
@@ -409,84 +691,213 @@ class CampaignApp(ctk.CTk):
             except Exception:
                 messagebox.showerror("Time error", "Invalid schedule time.")
                 return
-            resp = messagebox.askyesno("Confirm schedule", f"Schedule sending to {total} numbers at {hh:02d}:{mm:02d}?\nDelay: {delay}s")
-            if resp:
-                threading.Thread(target=self._send_messages, args=(self.valid_numbers, message, delay, True, hh, mm), daemon=True).start()
+            start_at = next_occurrence(hh, mm)
+        render, note = self._prepare_message(message, self.valid_numbers)
+        scheduler = self._make_scheduler(delay, start_at)
+        duration = format_duration(scheduler.eta(total))
+        if start_at:
+            when = time.strftime("%H:%M", time.localtime(start_at))
+            resp = messagebox.askyesno("Confirm schedule", f"Schedule sending to {total} numbers at {when}?\nDelay: {delay}s • Estimated duration: {duration}{note}")
         else:
-            resp = messagebox.askyesno("Confirm send", f"Send immediately to {total} numbers?\nDelay: {delay}s")
-            if resp:
-                threading.Thread(target=self._send_messages, args=(self.valid_numbers, message, delay, False, 0, 0), daemon=True).start()
-
-    def _send_messages(self, numbers, message, delay, use_schedule, hh, mm):
+            resp = messagebox.askyesno("Confirm send", f"Send immediately to {total} numbers?\nDelay: {delay}s • Estimated duration: {duration}{note}")
+        if resp:
+            threading.Thread(target=self._send_messages, args=(self.valid_numbers, message, scheduler, None, render), daemon=True).start()
+
+    def _make_scheduler(self, delay, start_at=None):
+        return RateScheduler.from_delay(delay, burst=RATE_BURST, jitter=RATE_JITTER, hourly_cap=HOURLY_CAP,
+                                        daily_cap=DAILY_CAP, quiet_hours=QUIET_HOURS, start_at=start_at)
+
+    def _get_notifier(self):
+        # one SMTP connection for the app's lifetime, used from its own thread
+        if self.notifier is None and GMAIL_USER and GMAIL_APP_PASS:
+            self.notifier = Notifier(GMAIL_USER, GMAIL_APP_PASS, host=SMTP_HOST, port=SMTP_PORT,
+                                     starttls=SMTP_STARTTLS, report_every=REPORT_EVERY,
+                                     on_error=lambda text: self._log(f"[ERR] {text}", level="err"))
+        return self.notifier
+
+    def _get_journal(self):
+        if self.journal is None:
+            self.journal = SendJournal()
+        return self.journal
+
+    def _resume_campaign(self):
+        if self.sending:
+            return
+        journal = self._get_journal()
+        cid = journal.latest_unfinished()
+        if not cid:
+            messagebox.showinfo("Resume", "No unfinished campaign found.")
+            return
+        message = journal.message(cid)
+        pending = journal.pending(cid)
+        try:
+            delay = float(self.delay_spin.get())
+        except Exception:
+            messagebox.showerror("Delay error", "Invalid delay value.")
+            return
+        render, note = self._prepare_message(message, pending)
+        scheduler = self._make_scheduler(delay)
+        done = journal.summary(cid)[SENT]
+        if messagebox.askyesno("Resume campaign", f"Resume campaign {cid}?\n{done} already sent • {len(pending)} remaining\n"
+                                                  f"Estimated duration: {format_duration(scheduler.eta(len(pending)))}{note}"):
+            threading.Thread(target=self._send_messages, args=(pending, message, scheduler, cid, render), daemon=True).start()
+
+    def _send_messages(self, numbers, message, scheduler, campaign=None, render=None):
         if self.sending:
             return
         self.sending = True
+        journal = self._get_journal()
+        if campaign is None:
+            campaign = journal.start(campaign_id(message, numbers), numbers, message)
+            pending = journal.pending(campaign)
+            if len(pending) < len(numbers):
+                self._log(f"Resuming campaign {campaign}: {len(numbers) - len(pending)} already sent, {len(pending)} to go.")
+            numbers = pending
         total = len(numbers)
-        self.progress.set(0.0)
-        self.progress.set(0.0)
-        start = time.time()
-        sent = 0
-        for idx, num in enumerate(numbers, start=1):
-            try:
-                self._log(f"[{idx}/{total}] Sending → {num}")
-                snippet = message if len(message) < 700 else message[:700] + "..."
-                self.preview_box.delete("1.0", "end")
-                self.preview_box.insert("1.0", f"Sending to: {num}\n\n{snippet}")
-                if use_schedule:
-                    scheduled_hour = hh
-                    scheduled_minute = mm + (idx - 1)
-                    scheduled_hour += scheduled_minute // 60
-                    scheduled_minute = scheduled_minute % 60
-                    scheduled_hour = scheduled_hour % 24
-                    kit.sendwhatmsg(num, message, scheduled_hour, scheduled_minute, wait_time=15, tab_close=True)
-                    self._log(f"[SCHEDULED] {num} at {scheduled_hour:02d}:{scheduled_minute:02d}")
-                else:
-                    kit.sendwhatmsg_instantly(num, message, wait_time=10, tab_close=True)
-                    time.sleep(2)
-                    try:
-                        pyautogui.press('enter')
-                    except Exception:
-                        pass
-                    self._log(f"[SENT] {num}")
-                sent += 1
-            except Exception as e:
-                self._log(f"[ERR] {num} -> {e}", level="err")
-            # update progress
-            self.progress.set(idx/total)
-            elapsed = time.time() - start
-            avg = elapsed / idx if idx else 0
-            remaining = int((total - idx) * avg)
-            self.eta_label.configure(text=f"ETA: {remaining}s")
-            if not use_schedule and idx < total:
-                time.sleep(delay)
+        notifier = self._get_notifier()
+        if notifier:
+            notifier.start_campaign(campaign, total)
+        self.ui.set("progress", 0.0)
+        if scheduler.start_at:
+            self._log(f"[SCHEDULED] {total} numbers from {time.strftime('%H:%M', time.localtime(scheduler.start_at))}")
+        try:
+            sent = self._run_engine(numbers, message, scheduler, journal, campaign, render)
+        except Exception as e:
+            self._log(f"[ERR] Could not start send sessions -> {e}", level="err")
+            sent = 0
+            self.failure_summary = ""
+
+        journal.flush()
+        if not journal.pending(campaign):
+            journal.finish(campaign)
         self._log(f"Finished. Sent {sent}/{total}")
-        # send completion email (try)
-        user_email = None
-        # if user logged in / provided email: you can replace below with actual target
-        if GMAIL_USER and GMAIL_APP_PASS:
-            subject = "Campaign Complete"
-            body = f"Your WhatsApp campaign completed. Sent {sent}/{total} messages."
-            ok, msg = send_completion_email(GMAIL_USER, subject, body)
-            self._log(f"Completion email attempt: {msg}")
+        if notifier:
+            notifier.finish_campaign(f"Your WhatsApp campaign completed. Sent {sent}/{total} messages.\n"
+                                     f"{self.failure_summary}")
+            self._log("Completion email queued.")
         self.sending = False
-        messagebox.showinfo("Done", f"Finished. Sent {sent}/{total} messages.")
+        self.ui.call(messagebox.showinfo, "Done", f"Finished. Sent {sent}/{total} messages.\n{self.failure_summary}")
+
+    def _run_engine(self, numbers, message, scheduler, journal, campaign, render=None):
+        total = len(numbers)
+        if not self.send_sessions:
+            self._log(f"Opening {SEND_SESSIONS} WhatsApp Web session(s)...")
+            self.send_sessions = open_sessions(SEND_SESSIONS)
+        lock = threading.Lock()
+        counts = {"done": 0, "sent": 0}
+
+        def on_start(session_name, num):
+            journal.mark_sending(campaign, num)
+
+        def on_retry(session_name, num, err, attempt, delay):
+            journal.mark_retry(campaign, num, err)
+            self._log(f"[RETRY {attempt}/{RETRY_ATTEMPTS - 1} in {delay:.0f}s] {num} -> {err}")
+
+        def on_result(session_name, num, ok, err):
+            cause = None
+            if ok:
+                journal.mark_sent(campaign, num)
+                self.log_tail.record(num)
+            else:
+                cause = classify(err)[0]
+                journal.mark_failed(campaign, num, f"{cause}: {err}", cause)
+            if self.notifier:
+                self.notifier.record(num, ok, err)
+            with lock:
+                counts["done"] += 1
+                counts["sent"] += ok
+                self.failures += not ok
+                idx = counts["done"]
+            if ok:
+                self._log(f"[{idx}/{total}] [SENT] {num} ({session_name})")
+            else:
+                self._log(f"[{idx}/{total}] [ERR] {num} ({cause}) -> {err}", level="err")
+            text = render(num) if render else message
+            snippet = text if len(text) < 700 else text[:700] + "..."
+            self.ui.set("preview", f"Sending to: {num}\n\n{snippet}")
+            self._update_progress(idx, total, scheduler)
+
+        engine = SendEngine(self.send_sessions, on_result=on_result, scheduler=scheduler, on_start=on_start,
+                            retry=RetryPolicy(RETRY_ATTEMPTS, RETRY_BASE_DELAY), on_retry=on_retry,
+                            suppression=self.suppression)
+        for st in engine.run(numbers, render or message):
+            self._log(f"{st['session']}: {st['sent']} sent • {st['failed']} failed • {st['retried']} retried • {st['per_minute']}/min")
+        self.failure_summary = engine.report.summary()
+        self._log(self.failure_summary)
+        return counts["sent"]
+
+    def _update_progress(self, idx, total, scheduler):
+        self.ui.set("progress", idx/total)
+        # ETA from the configured pace; refreshed every ETA_REFRESH seconds, not per send
+        now = time.time()
+        if idx == total or now - self._eta_at >= ETA_REFRESH:
+            self._eta_at = now
+            self.ui.set("eta", f"ETA: {format_duration(scheduler.eta(total - idx))}")
 
     def _log(self, text, level="info"):
+        # safe from any thread: lines are written in batches by _write_log
         ts = time.strftime("%H:%M:%S")
-        self.log_box.insert("end", f"[{ts}] {text}\n")
+        self.ui.log(f"[{ts}] {text}\n")
+
+    def _write_log(self, lines):
+        self.log_box.insert("end", "".join(lines))
+        excess = int(self.log_box.index("end-1c").split(".")[0]) - LOG_MAX_LINES
+        if excess > 0:
+            self.log_box.delete("1.0", f"{excess + 1}.0")
         self.log_box.see("end")
 
-    def _live_preview_loop(self):
-        # update preview frequently (non-blocking)
-        txt = self.msg_text.get("1.0", "end").strip()
-        if txt:
-            preview = txt if len(txt) < 900 else txt[:900] + "\n\n...[truncated]"
-            # only update when changed to reduce flicker
-            cur = self.preview_box.get("1.0", "end").strip()
-            if not cur.startswith("Sending to:") and cur != preview:
-                self.preview_box.delete("1.0", "end")
-                self.preview_box.insert("1.0", preview)
-        self.after(400, self._live_preview_loop)
+    def _show_preview(self, text):
+        if text == self._last_preview:
+            return
+        self._last_preview = text
+        self.preview_box.delete("1.0", "end")
+        self.preview_box.insert("1.0", text)
+
+    def _dashboard_loop(self):
+        # parse only what pywhatkit appended since the last tick, off the Tk thread;
+        # this app's own sends are recorded by the send loop
+        if not self._tail_busy:
+            self._tail_busy = True
+
+            def work():
+                try:
+                    self.log_tail.refresh()
+                except Exception:
+                    pass
+                self.ui.call(self._update_dashboard)
+
+            threading.Thread(target=work, daemon=True).start()
+        self.after(DASHBOARD_REFRESH_MS, self._dashboard_loop)
+
+    def _update_dashboard(self):
+        self._tail_busy = False
+        tail = self.log_tail
+        self.dash_rate.configure(text=f"Sends/min: {tail.sends_per_minute():.1f}")
+        self.dash_total.configure(text=f"Sends: {tail.total}")
+        self.dash_failed.configure(text=f"Failures: {self.failures}")
+        self.dash_repeat.configure(text=f"Repeated recipients: {tail.repeated}")
+
+    def _on_message_modified(self, event=None):
+        self.msg_text.edit_modified(False)   # re-arm <<Modified>> for the next edit
+        if self._preview_job is not None:
+            self.after_cancel(self._preview_job)
+        self._preview_job = self.after(PREVIEW_DEBOUNCE_MS, self._render_live_preview)
+
+    def _render_live_preview(self):
+        self._preview_job = None
+        if self.sending:
+            return   # the preview shows the number being sent to
+        preview = self._message_preview()
+        if preview:
+            self._show_preview(preview)
+
+    def _message_preview(self):
+        # only the first PREVIEW_CHARS are read out of the widget, however long the message
+        limit = f"1.0 + {PREVIEW_CHARS} chars"
+        head = self.msg_text.get("1.0", limit).strip()
+        if head and self.msg_text.compare(limit, "<", "end-1c"):
+            head += "\n\n...[truncated]"
+        return head
 
 # ---------- Run ----------
 if __name__ == "__main__":